@@ -0,0 +1,115 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+
+"""Benchmark CPU time spent turning webhook bodies into payloads.
+
+Compares the previous behaviour (json.loads on every verified request)
+with header-first routing:
+
+- unhandled events (e.g. a large push) are acknowledged without parsing
+- handled events decode only the fields their handler declared
+- full parses use orjson when it is installed
+
+Usage:
+    ./scripts/bench_payload_parsing.py [--commits 2000] [--iterations 200]
+    uv run --with orjson scripts/bench_payload_parsing.py
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from event_router import EventRouter  # noqa: E402
+from payload import orjson, parse_payload, peek_action  # noqa: E402
+
+
+def make_push_payload(commits: int) -> bytes:
+    """Build a push payload shaped like GitHub's, with many commits."""
+    commit = {
+        "id": "6dcb09b5b57875f334f61aebed695e2e4193db5e",
+        "tree_id": "f9d2a07e9488b91af2641b26b9407fe22a451433",
+        "message": "Update README.md with installation instructions " * 4,
+        "timestamp": "2024-01-01T12:00:00Z",
+        "author": {"name": "Mona Octocat", "email": "mona@github.com", "username": "octocat"},
+        "committer": {"name": "Mona Octocat", "email": "mona@github.com", "username": "octocat"},
+        "added": [f"src/module_{i}.py" for i in range(5)],
+        "removed": [],
+        "modified": ["README.md", "pyproject.toml"],
+    }
+    payload = {
+        "ref": "refs/heads/main",
+        "before": "0" * 40,
+        "after": "6dcb09b5b57875f334f61aebed695e2e4193db5e",
+        "repository": {"name": "Hello-World", "full_name": "octocat/Hello-World", "owner": {"login": "octocat"}},
+        "pusher": {"name": "octocat"},
+        "sender": {"login": "octocat"},
+        "commits": [commit] * commits,
+        "head_commit": commit,
+    }
+    return json.dumps(payload).encode()
+
+
+def make_issue_payload(body_size: int) -> bytes:
+    """Build an issues.opened payload with a large issue body and sender."""
+    payload = {
+        "action": "opened",
+        "issue": {"number": 42, "title": "Large issue", "body": "x" * body_size, "user": {"login": "octocat"}},
+        "repository": {"name": "Hello-World", "full_name": "octocat/Hello-World", "owner": {"login": "octocat"}},
+        "sender": {"login": "octocat", "bio": "y" * body_size},
+        "installation": {"id": 1},
+    }
+    return json.dumps(payload).encode()
+
+
+def cpu_per_call(func, iterations: int) -> float:
+    """Return mean CPU microseconds per call."""
+    func()
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=2000, help="Commits in the synthetic push payload")
+    parser.add_argument("--iterations", type=int, default=200, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    router = EventRouter()
+    router.on("issues", "opened", fields=("issue", "repository"))(lambda payload: payload)
+
+    push_body = make_push_payload(args.commits)
+    issue_body = make_issue_payload(len(push_body) // 4)
+
+    def routed(event_type: str, body: bytes, loads):
+        if not router.handles(event_type):
+            return None
+        route = router.resolve(event_type, peek_action(body))
+        return parse_payload(body, route.fields, loads) if route else None
+
+    cases = [
+        ("push (unhandled)", "push", push_body),
+        ("issues.opened (fields)", "issues", issue_body),
+    ]
+
+    print(f"Python {sys.version.split()[0]}, orjson {'available' if orjson else 'not installed'}\n")
+    print(f"{'payload':<24} {'size':>9} {'json.loads':>12} {'orjson':>10} {'routed':>10} {'saved':>8}")
+    for label, event_type, body in cases:
+        baseline = cpu_per_call(lambda: json.loads(body), args.iterations)
+        fast = cpu_per_call(lambda: orjson.loads(body), args.iterations) if orjson else None
+        new = cpu_per_call(lambda: routed(event_type, body, json.loads), args.iterations)
+        saved = 100 * (baseline - new) / baseline
+        fast_text = f"{fast:>8.1f}us" if fast is not None else f"{'-':>10}"
+        print(f"{label:<24} {len(body) // 1024:>7}KB {baseline:>10.1f}us {fast_text} {new:>8.1f}us {saved:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
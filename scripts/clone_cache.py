@@ -0,0 +1,119 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+
+"""Inspect and trim the webhook's clone cache.
+
+Lists cached repositories (least recently used first) with their size on
+disk, shows recent evictions, or evicts down to a quota right away.
+
+Usage:
+    ./scripts/clone_cache.py list
+    ./scripts/clone_cache.py evictions [--limit 20]
+    ./scripts/clone_cache.py evict --max-bytes 50000000000 [--max-repos 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clone_cache import CloneCache  # noqa: E402
+from file_lock import FileLock  # noqa: E402
+
+
+def format_bytes(size: int) -> str:
+    """Render a byte count with a binary unit."""
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TiB"
+
+
+def format_time(timestamp: float) -> str:
+    """Render a Unix timestamp as local date and time."""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def show_entries(cache: CloneCache, as_json: bool) -> None:
+    """Print cached repositories, least recently used first."""
+    entries = cache.entries()
+    if as_json:
+        print(json.dumps([entry.to_dict() for entry in entries], indent=2))
+        return
+    total_bytes, total_repos = cache.totals()
+    print(f"{'repository':<40} {'size':>10} {'last access':>20}")
+    for entry in entries:
+        print(f"{entry.key:<40} {format_bytes(entry.size_bytes):>10} {format_time(entry.last_access):>20}")
+    print(f"\n{total_repos} repositories, {format_bytes(total_bytes)}")
+
+
+def show_evictions(cache: CloneCache, limit: int, as_json: bool) -> None:
+    """Print the most recent evictions, newest first."""
+    evictions = cache.evictions(limit)
+    if as_json:
+        print(json.dumps(evictions, indent=2))
+        return
+    print(f"{'repository':<40} {'size':>10} {'evicted at':>20} {'reason':>8}")
+    for eviction in evictions:
+        print(
+            f"{eviction['repository']:<40} {format_bytes(eviction['size_bytes']):>10} "
+            f"{format_time(eviction['evicted_at']):>20} {eviction['reason']:>8}"
+        )
+
+
+def main() -> None:
+    base_default = os.getenv("CLONE_BASE_DIR", "./repos")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-dir", default=base_default, help="Clone base directory (default: $CLONE_BASE_DIR or ./repos)")
+    parser.add_argument("--index", help="Index database (default: $CLONE_CACHE_INDEX or <base-dir>/.cache-index.db)")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("list", help="List cached repositories, least recently used first")
+    evictions_parser = subcommands.add_parser("evictions", help="Show recent evictions")
+    evictions_parser.add_argument("--limit", type=int, default=20)
+    evict_parser = subcommands.add_parser("evict", help="Evict least recently used repositories down to a quota")
+    evict_parser.add_argument("--max-bytes", type=int, default=0)
+    evict_parser.add_argument("--max-repos", type=int, default=0)
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    index = Path(args.index or os.getenv("CLONE_CACHE_INDEX", "") or base_dir / ".cache-index.db")
+    lock_dir = Path(os.getenv("CLONE_LOCK_DIR", "") or base_dir / ".locks")
+    cache = CloneCache(
+        base_dir,
+        index,
+        max_bytes=getattr(args, "max_bytes", 0),
+        max_repos=getattr(args, "max_repos", 0),
+        lock_for=lambda owner, repo: FileLock(lock_dir / owner / f"{repo}.lock")
+    )
+
+    try:
+        if args.command == "list":
+            show_entries(cache, args.json)
+        elif args.command == "evictions":
+            show_evictions(cache, args.limit, args.json)
+        else:
+            if not args.max_bytes and not args.max_repos:
+                parser.error("evict needs --max-bytes or --max-repos")
+            evicted = cache.enforce()
+            if args.json:
+                print(json.dumps([entry.to_dict() for entry in evicted], indent=2))
+            else:
+                for entry in evicted:
+                    print(f"Evicted {entry.key} ({format_bytes(entry.size_bytes)})")
+                print(f"{len(evicted)} repositories evicted")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -189,7 +189,8 @@ echo -e "${BLUE}Step 3:${NC} Starting webhook server..."
 echo ""
 
 cd "$PROJECT_ROOT"
-uv run src/webhook.py &
+# Human-readable console banner unless a format is configured
+LOG_FORMAT="${LOG_FORMAT:-banner}" uv run src/webhook.py &
 WEBHOOK_PID=$!
 
 # Wait a moment for the server to start
@@ -0,0 +1,229 @@
+"""Disk quota for the clone directory, evicting least recently used repositories.
+
+Every clone, pull or mirror fetch records the repository's size on disk and
+the time it was used in a small SQLite index next to the clones. When the
+total size or number of repositories exceeds the configured quota, the
+least recently used repositories are deleted until it fits again. Evictions
+are kept in the index so they can be listed later (``scripts/clone_cache.py``).
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from file_lock import FileLock
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    key TEXT PRIMARY KEY,
+    paths TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS evictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    evicted_at REAL NOT NULL,
+    reason TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class CacheEntry:
+    """A cached repository and the directories it occupies (relative to the base directory)."""
+
+    key: str
+    paths: list[str]
+    size_bytes: int
+    last_access: float
+    created_at: float
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the entry."""
+        return {
+            "repository": self.key,
+            "paths": self.paths,
+            "size_bytes": self.size_bytes,
+            "last_access": self.last_access,
+            "created_at": self.created_at,
+        }
+
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of the files under a directory, not following symlinks."""
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class CloneCache:
+    """Size and last-access index of cloned repositories with LRU eviction.
+
+    Args:
+        base_dir: The clone base directory
+        index_path: SQLite file holding the index
+        max_bytes: Evict when the cached repositories exceed this many bytes (0 disables)
+        max_repos: Evict when more than this many repositories are cached (0 disables)
+        lock_for: Returns the lock guarding ``(owner, repo)``; repositories whose lock
+            is held elsewhere are never evicted
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        index_path: Path,
+        max_bytes: int = 0,
+        max_repos: int = 0,
+        lock_for: Optional[Callable[[str, str], FileLock]] = None,
+    ):
+        self.base_dir = Path(base_dir)
+        self.index_path = Path(index_path)
+        self.max_bytes = max_bytes
+        self.max_repos = max_repos
+        self.lock_for = lock_for
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def record(self, owner: str, repo_name: str, paths: list[Path]) -> CacheEntry:
+        """Record that a repository was used, measuring its current size.
+
+        Args:
+            owner: Sanitized owner directory name
+            repo_name: Sanitized repository directory name
+            paths: Directories belonging to the repository
+        """
+        now = time.time()
+        existing = [path for path in paths if path.exists()]
+        size = sum(directory_size(path) for path in existing)
+        relative = [str(path.relative_to(self.base_dir)) for path in existing]
+        key = f"{owner}/{repo_name}"
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO repos (key, paths, size_bytes, last_access, created_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET paths = excluded.paths, size_bytes = excluded.size_bytes, "
+                "last_access = excluded.last_access",
+                (key, "\n".join(relative), size, now, now),
+            )
+            row = self._conn.execute("SELECT created_at FROM repos WHERE key = ?", (key,)).fetchone()
+        return CacheEntry(key, relative, size, now, row[0])
+
+    def touch(self, owner: str, repo_name: str) -> bool:
+        """Record that a repository was used without measuring it again.
+
+        For uses that leave the repository unchanged on disk, e.g. a clone job
+        that found it already cloned.
+
+        Returns:
+            False if the repository is not in the index, so it has to be recorded instead
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE repos SET last_access = ? WHERE key = ?", (time.time(), f"{owner}/{repo_name}")
+            )
+        return cursor.rowcount > 0
+
+    def enforce(self, keep: Optional[str] = None) -> list[CacheEntry]:
+        """Evict least recently used repositories until the quota is met.
+
+        Args:
+            keep: Repository key (``owner/repo``) that must not be evicted, e.g. the one just cloned
+
+        Returns:
+            The evicted entries
+        """
+        evicted = []
+        skipped = {keep} if keep else set()
+        while self._over_quota():
+            entry = self._least_recent(skipped)
+            if entry is None:
+                break
+            if self._evict(entry, "quota"):
+                evicted.append(entry)
+            else:
+                skipped.add(entry.key)
+        return evicted
+
+    def entries(self) -> list[CacheEntry]:
+        """Return all cached repositories, least recently used first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, paths, size_bytes, last_access, created_at FROM repos ORDER BY last_access"
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def evictions(self, limit: int = 50) -> list[dict]:
+        """Return the most recent evictions, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, size_bytes, last_access, evicted_at, reason FROM evictions ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {"repository": key, "size_bytes": size, "last_access": last_access, "evicted_at": evicted_at, "reason": reason}
+            for key, size, last_access, evicted_at, reason in rows
+        ]
+
+    def totals(self) -> tuple[int, int]:
+        """Return the cached ``(bytes, repositories)``."""
+        with self._lock:
+            size, count = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0), COUNT(*) FROM repos").fetchone()
+        return size, count
+
+    def close(self) -> None:
+        """Close the index database."""
+        with self._lock:
+            self._conn.close()
+
+    def _over_quota(self) -> bool:
+        size, count = self.totals()
+        return (self.max_bytes > 0 and size > self.max_bytes) or (self.max_repos > 0 and count > self.max_repos)
+
+    def _least_recent(self, skipped: set[str]) -> Optional[CacheEntry]:
+        for entry in self.entries():
+            if entry.key not in skipped:
+                return entry
+        return None
+
+    def _evict(self, entry: CacheEntry, reason: str) -> bool:
+        owner, _, repo_name = entry.key.partition("/")
+        lock = self.lock_for(owner, repo_name) if self.lock_for else None
+        # A repository being cloned or checked out right now is in use, not stale
+        if lock and not lock.acquire(blocking=False):
+            return False
+        try:
+            for path in entry.paths:
+                shutil.rmtree(self.base_dir / path, ignore_errors=True)
+            with self._lock:
+                self._conn.execute("DELETE FROM repos WHERE key = ?", (entry.key,))
+                self._conn.execute(
+                    "INSERT INTO evictions (key, size_bytes, last_access, evicted_at, reason) VALUES (?, ?, ?, ?, ?)",
+                    (entry.key, entry.size_bytes, entry.last_access, time.time(), reason),
+                )
+        finally:
+            if lock:
+                lock.release()
+        return True
+
+    @staticmethod
+    def _entry(row: tuple) -> CacheEntry:
+        key, paths, size, last_access, created_at = row
+        return CacheEntry(key, paths.split("\n") if paths else [], size, last_access, created_at)
@@ -0,0 +1,241 @@
+"""Bounded worker pool for repository clone jobs.
+
+Cloning and pulling shell out to ``gh``/``git`` and can take minutes. Waiting
+for them inline would hold up the webhook response, so the webhook submits
+them here instead and answers immediately with a job id. The clone function
+is a coroutine function that runs on the event loop (its git commands are
+asyncio subprocesses), so a clone in progress ties up no thread.
+
+Jobs for the same repository are coalesced: while a clone or pull is in
+flight, further jobs for that repository wait for it and share its result,
+and a successful result is reused for ``freshness_seconds`` afterwards.
+"""
+
+import asyncio
+import inspect
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+
+@dataclass
+class CloneJob:
+    """State of a single clone/pull job.
+
+    ``origin`` records how the result was obtained: ``executed`` when this job
+    ran git itself, ``coalesced`` when it joined an in-flight job for the same
+    repository, and ``cached`` when it reused a fresh earlier result.
+    """
+
+    job_id: str
+    full_name: str
+    status: str = "queued"
+    origin: str = "executed"
+    result: Optional[dict] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False, compare=False)
+
+    async def wait(self) -> dict:
+        """Wait until the job has finished and return its result."""
+        await self.done.wait()
+        return self.result
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the job."""
+        return {
+            "job_id": self.job_id,
+            "repository": self.full_name,
+            "status": self.status,
+            "origin": self.origin,
+            "result": self.result,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+@dataclass
+class _Flight:
+    """A clone/pull in progress for one repository, shared by every waiting job."""
+
+    jobs: list[CloneJob]
+    task: Optional[asyncio.Task] = None
+
+
+class ClonePool:
+    """Runs clone jobs with bounded concurrency and remembers their results.
+
+    Args:
+        clone_func: Coroutine function called as ``clone_func(full_name, owner, repo_name)``
+        max_workers: Maximum number of clones running at the same time
+        max_jobs: Number of finished jobs kept for status lookups
+        freshness_seconds: How long a successful result is reused for the same
+            repository without running git again (0 disables reuse)
+        on_complete: Optional callback invoked with each finished job
+        on_update: Optional callback invoked whenever a job is queued or changes status
+
+    Raises:
+        TypeError: If clone_func is not a coroutine function
+    """
+
+    def __init__(
+        self,
+        clone_func: Callable[[str, str, str], Awaitable[dict]],
+        max_workers: int = 2,
+        max_jobs: int = 1000,
+        freshness_seconds: float = 0,
+        on_complete: Optional[Callable[[CloneJob], None]] = None,
+        on_update: Optional[Callable[[CloneJob], None]] = None,
+    ):
+        if not inspect.iscoroutinefunction(clone_func):
+            raise TypeError("clone_func must be a coroutine function")
+        self.clone_func = clone_func
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.freshness_seconds = freshness_seconds
+        self.on_complete = on_complete
+        self.on_update = on_update
+        self._slots = asyncio.Semaphore(max_workers)
+        self._jobs: OrderedDict[str, CloneJob] = OrderedDict()
+        self._flights: dict[str, _Flight] = {}
+        self._recent: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def submit(self, full_name: str, owner: str, repo_name: str) -> CloneJob:
+        """Queue a clone job. Must be called from within the running event loop.
+
+        Jobs are keyed on ``owner/repo_name``, which maps one-to-one onto the
+        clone target path.
+
+        Returns:
+            The queued job; its status is updated in place as the job progresses
+        """
+        job = CloneJob(job_id=uuid.uuid4().hex, full_name=full_name)
+        self._remember(job)
+        key = f"{owner}/{repo_name}"
+
+        fresh = self._fresh_result(key)
+        if fresh is not None:
+            job.origin = "cached"
+            job.started_at = job.created_at
+            self._finish([job], fresh)
+            return job
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            job.origin = "coalesced"
+            if flight.jobs[0].status == "running":
+                job.status = "running"
+                job.started_at = time.time()
+            flight.jobs.append(job)
+            self._updated(job)
+            return job
+
+        self._updated(job)
+        flight = _Flight(jobs=[job])
+        self._flights[key] = flight
+        flight.task = asyncio.get_running_loop().create_task(
+            self._run(key, flight, full_name, owner, repo_name)
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[CloneJob]:
+        """Look up a job by id, or None if it is unknown or has been forgotten."""
+        return self._jobs.get(job_id)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct repositories with a clone or pull queued or running."""
+        return len(self._flights)
+
+    @property
+    def running(self) -> int:
+        """Number of clones or pulls currently occupying a worker slot."""
+        return sum(1 for flight in list(self._flights.values()) if flight.jobs[0].status == "running")
+
+    async def drain(self) -> None:
+        """Wait for every queued and running job to finish."""
+        tasks = [flight.task for flight in self._flights.values() if flight.task]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers.
+
+        Args:
+            wait: Leave queued and running clones alone (call ``drain`` to wait for
+                them); otherwise they are cancelled, which kills their git processes
+        """
+        if not wait:
+            for flight in list(self._flights.values()):
+                if flight.task:
+                    flight.task.cancel()
+
+    async def _run(self, key: str, flight: _Flight, full_name: str, owner: str, repo_name: str) -> None:
+        # Reported to waiting jobs if this task is cancelled
+        result = {"status": "error", "message": "Clone job cancelled"}
+        try:
+            async with self._slots:
+                self._mark_running(flight)
+                result = await self.clone_func(full_name, owner, repo_name)
+        except Exception as e:
+            result = {"status": "error", "message": f"Clone job failed: {e}"}
+        finally:
+            del self._flights[key]
+            if result.get("status") != "error" and self.freshness_seconds > 0:
+                self._recent[key] = (time.monotonic(), result)
+                self._recent.move_to_end(key)
+                self._prune_recent()
+            self._finish(flight.jobs, result)
+
+    def _mark_running(self, flight: _Flight) -> None:
+        started_at = time.time()
+        for job in list(flight.jobs):
+            job.status = "running"
+            job.started_at = started_at
+            self._updated(job)
+
+    def _finish(self, jobs: list[CloneJob], result: dict) -> None:
+        finished_at = time.time()
+        for job in jobs:
+            job.result = result
+            job.status = "done"
+            job.finished_at = finished_at
+            job.done.set()
+            self._updated(job)
+            if self.on_complete:
+                self.on_complete(job)
+
+    def _updated(self, job: CloneJob) -> None:
+        if self.on_update:
+            self.on_update(job)
+
+    def _fresh_result(self, key: str) -> Optional[dict]:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        recorded_at, result = entry
+        if time.monotonic() - recorded_at > self.freshness_seconds:
+            del self._recent[key]
+            return None
+        return result
+
+    def _prune_recent(self) -> None:
+        cutoff = time.monotonic() - self.freshness_seconds
+        while self._recent:
+            key, (recorded_at, _) = next(iter(self._recent.items()))
+            if recorded_at >= cutoff and len(self._recent) <= self.max_jobs:
+                break
+            del self._recent[key]
+
+    def _remember(self, job: CloneJob) -> None:
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status != "done":
+                # Never forget a job that is still pending
+                break
+            del self._jobs[oldest_id]
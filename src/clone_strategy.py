@@ -0,0 +1,136 @@
+"""How much of a repository to fetch when cloning it.
+
+A full clone of a large monorepo can take minutes and gigabytes. A
+CloneStrategy describes a cheaper clone, expressed as git options:
+
+- ``depth``: shallow clone with only the last N commits
+- ``filter``: partial clone, e.g. ``blob:none`` (blobless) or ``tree:0`` (treeless)
+- ``sparse_paths``: check out only these directories
+- ``reference``: borrow objects from a local repository or shared object store
+
+A global strategy comes from the environment, and a JSON file can override it
+for individual repositories or owners::
+
+    {
+        "octo-org/monorepo": {"depth": 1, "filter": "blob:none", "sparse_paths": ["services/api"]},
+        "octo-org/*": {"filter": "tree:0"}
+    }
+"""
+
+import json
+import re
+from dataclasses import dataclass, field, fields, replace
+from pathlib import Path
+from typing import Optional
+
+
+FILTER_PATTERN = re.compile(r"^(blob:none|tree:0|blob:limit=\d+[kmg]?)$")
+
+
+@dataclass(frozen=True)
+class CloneStrategy:
+    """Options controlling how a repository is cloned."""
+
+    depth: int = 0
+    filter: str = ""
+    sparse_paths: tuple[str, ...] = field(default_factory=tuple)
+    reference: str = ""
+
+    def __post_init__(self):
+        if self.depth < 0:
+            raise ValueError(f"Clone depth must not be negative: {self.depth}")
+        if self.filter and not FILTER_PATTERN.match(self.filter):
+            raise ValueError(f"Unsupported clone filter: {self.filter}")
+        for path in self.sparse_paths:
+            if not path or path.startswith("-") or ".." in Path(path).parts:
+                raise ValueError(f"Invalid sparse checkout path: {path}")
+
+    @property
+    def is_full(self) -> bool:
+        """Whether this is a plain full clone."""
+        return self == CloneStrategy()
+
+    def clone_args(self) -> list[str]:
+        """Return the git clone options for this strategy."""
+        args = []
+        if self.depth:
+            args.append(f"--depth={self.depth}")
+        if self.filter:
+            args.append(f"--filter={self.filter}")
+        if self.sparse_paths:
+            args.append("--sparse")
+        if self.reference:
+            # Falls back to a normal clone if the object store is missing
+            args += ["--reference-if-able", self.reference]
+        return args
+
+    def fetch_args(self) -> list[str]:
+        """Return the git fetch/pull options that keep an existing clone within this strategy.
+
+        A partial clone records its filter in the repository config, so only
+        the depth has to be repeated.
+        """
+        return [f"--depth={self.depth}"] if self.depth else []
+
+    def merged(self, overrides: dict) -> "CloneStrategy":
+        """Return a copy with the given fields replaced.
+
+        Raises:
+            ValueError: If a field is unknown or a value is invalid
+        """
+        known = {f.name for f in fields(self)}
+        unknown = set(overrides) - known
+        if unknown:
+            raise ValueError(f"Unknown clone strategy options: {', '.join(sorted(unknown))}")
+        values = dict(overrides)
+        if "sparse_paths" in values:
+            values["sparse_paths"] = parse_paths(values["sparse_paths"])
+        if "depth" in values:
+            values["depth"] = int(values["depth"])
+        return replace(self, **values)
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the strategy."""
+        return {
+            "depth": self.depth,
+            "filter": self.filter,
+            "sparse_paths": list(self.sparse_paths),
+            "reference": self.reference,
+        }
+
+
+def parse_paths(value) -> tuple[str, ...]:
+    """Normalise sparse paths given as a list or a comma-separated string."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(path.strip().strip("/") for path in value if path.strip())
+
+
+class CloneStrategies:
+    """Resolves the clone strategy for each repository.
+
+    Args:
+        default: Strategy used for repositories without an override
+        overrides: Mapping of ``owner/repo`` or ``owner/*`` to strategy options
+    """
+
+    def __init__(self, default: Optional[CloneStrategy] = None, overrides: Optional[dict] = None):
+        self.default = default or CloneStrategy()
+        self._overrides = {key: self.default.merged(options) for key, options in (overrides or {}).items()}
+
+    @classmethod
+    def from_file(cls, path: Path, default: Optional[CloneStrategy] = None) -> "CloneStrategies":
+        """Load per-repository overrides from a JSON file.
+
+        Raises:
+            ValueError: If the file is not a JSON object of option objects
+        """
+        data = json.loads(Path(path).read_text())
+        if not isinstance(data, dict) or not all(isinstance(options, dict) for options in data.values()):
+            raise ValueError(f"Clone strategies file must map repositories to option objects: {path}")
+        return cls(default, data)
+
+    def for_repository(self, full_name: str) -> CloneStrategy:
+        """Return the strategy for ``owner/repo``: an exact override, then the owner's, then the default."""
+        owner = full_name.split("/", 1)[0]
+        return self._overrides.get(full_name) or self._overrides.get(f"{owner}/*") or self.default
@@ -0,0 +1,159 @@
+"""Cache of recently seen ``X-GitHub-Delivery`` ids.
+
+GitHub redelivers a webhook when it does not get a timely response, and a
+delivery can also be redelivered by hand. Each delivery keeps its original
+``X-GitHub-Delivery`` id, so remembering recent ids lets the server answer
+duplicates cheaply instead of processing (and cloning) them again.
+
+Entries are evicted when the cache exceeds ``max_entries`` (least recently
+seen first) or when they are older than ``max_age_seconds``. If a path is
+given, ids are also written to a small SQLite database and reloaded on
+startup so duplicates are still recognised after a restart.
+
+With ``shared=True`` the database is the source of truth: every check is a
+single atomic upsert, so several worker processes using the same file agree
+on which of them saw a delivery first.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class DeliveryDedupCache:
+    """Bounded LRU + TTL set of delivery ids.
+
+    Args:
+        max_entries: Maximum number of ids remembered
+        max_age_seconds: Ids older than this are forgotten
+        path: Optional SQLite file used to persist ids across restarts
+        shared: Check every id against the database so processes sharing the file
+            see each other's deliveries (requires ``path``)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_age_seconds: float = 86400,
+        path: Optional[Path] = None,
+        shared: bool = False,
+    ):
+        if shared and not path:
+            raise ValueError("A shared delivery cache needs a database path")
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.path = Path(path) if path else None
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.path:
+            self._open()
+
+    def check_and_add(self, delivery_id: str) -> bool:
+        """Record a delivery id.
+
+        Returns:
+            True if the id was already seen (a duplicate), False if it is new
+        """
+        now = time.time()
+        with self._lock:
+            if self.shared:
+                return self._check_shared(delivery_id, now)
+
+            seen_at = self._seen.get(delivery_id)
+            if seen_at is not None and now - seen_at <= self.max_age_seconds:
+                self._seen.move_to_end(delivery_id)
+                self.hits += 1
+                return True
+
+            self.misses += 1
+            self._seen[delivery_id] = now
+            self._seen.move_to_end(delivery_id)
+            self._evict(now)
+            if self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO deliveries (delivery_id, seen_at) VALUES (?, ?)",
+                    (delivery_id, now),
+                )
+            return False
+
+    def forget(self, delivery_id: str) -> None:
+        """Remove an id, e.g. when processing failed and a redelivery should be accepted."""
+        with self._lock:
+            self._seen.pop(delivery_id, None)
+            if self._conn:
+                self._conn.execute("DELETE FROM deliveries WHERE delivery_id = ?", (delivery_id,))
+
+    def stats(self) -> dict:
+        """Return counters describing cache effectiveness."""
+        return {
+            "size": len(self._seen),
+            "duplicates": self.hits,
+            "unique": self.misses,
+            "evictions": self.evictions,
+            "persistent": self.path is not None,
+            "shared": self.shared,
+        }
+
+    def close(self) -> None:
+        """Close the persistence database, if any."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def _check_shared(self, delivery_id: str, now: float) -> bool:
+        # Inserts a new id or refreshes an expired one; a fresh existing id leaves no row changed
+        cursor = self._conn.execute(
+            "INSERT INTO deliveries (delivery_id, seen_at) VALUES (?, ?) "
+            "ON CONFLICT (delivery_id) DO UPDATE SET seen_at = excluded.seen_at "
+            "WHERE deliveries.seen_at < ?",
+            (delivery_id, now, now - self.max_age_seconds),
+        )
+        if cursor.rowcount == 0:
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        self._seen[delivery_id] = now
+        self._seen.move_to_end(delivery_id)
+        self._evict(now)
+        return False
+
+    def _evict(self, now: float) -> None:
+        expired_ids = []
+        while self._seen:
+            delivery_id, seen_at = next(iter(self._seen.items()))
+            if len(self._seen) <= self.max_entries and now - seen_at <= self.max_age_seconds:
+                break
+            del self._seen[delivery_id]
+            expired_ids.append((delivery_id,))
+        if expired_ids:
+            self.evictions += len(expired_ids)
+            if self._conn:
+                self._conn.executemany("DELETE FROM deliveries WHERE delivery_id = ?", expired_ids)
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS deliveries (delivery_id TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        cutoff = time.time() - self.max_age_seconds
+        self._conn.execute("DELETE FROM deliveries WHERE seen_at < ?", (cutoff,))
+        rows = self._conn.execute(
+            "SELECT delivery_id, seen_at FROM deliveries ORDER BY seen_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for delivery_id, seen_at in reversed(rows):
+            self._seen[delivery_id] = seen_at
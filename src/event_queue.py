@@ -0,0 +1,256 @@
+"""Durable on-disk queue for verified webhook deliveries.
+
+Deliveries are appended to a SQLite database in WAL mode and acknowledged to
+GitHub as soon as the insert commits. A consumer then works through pending
+events in order and marks each one done only after it has been processed,
+so a crash or restart replays anything that was not finished (at-least-once).
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from file_lock import FileLock
+
+logger = logging.getLogger("ghook.queue")
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    delivery_id TEXT,
+    event_type TEXT,
+    body BLOB NOT NULL,
+    received_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    processed_at REAL
+);
+CREATE INDEX IF NOT EXISTS events_status_seq ON events (status, seq);
+"""
+
+
+@dataclass
+class QueuedEvent:
+    """A delivery read back from the queue."""
+
+    seq: int
+    delivery_id: Optional[str]
+    event_type: Optional[str]
+    body: bytes
+    received_at: float
+    attempts: int
+
+
+class EventQueue:
+    """Append-only SQLite queue of webhook deliveries.
+
+    Args:
+        path: Location of the SQLite database file
+        max_attempts: Failed events are retried until they reach this many attempts
+    """
+
+    def __init__(self, path: Path, max_attempts: int = 5):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+
+    def append(self, delivery_id: Optional[str], event_type: Optional[str], body: bytes) -> int:
+        """Durably store a delivery.
+
+        Returns:
+            The sequence number assigned to the event
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO events (delivery_id, event_type, body, received_at) VALUES (?, ?, ?, ?)",
+                (delivery_id, event_type, body, time.time()),
+            )
+            return cursor.lastrowid
+
+    def pending(self, limit: int = 100) -> list[QueuedEvent]:
+        """Return the oldest unprocessed events in arrival order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, delivery_id, event_type, body, received_at, attempts "
+                "FROM events WHERE status = 'pending' ORDER BY seq LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [QueuedEvent(*row) for row in rows]
+
+    def ack(self, seq: int) -> None:
+        """Mark an event as processed (the consumer's checkpoint)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE events SET status = 'done', processed_at = ? WHERE seq = ?",
+                (time.time(), seq),
+            )
+
+    def fail(self, seq: int, error: str, permanent: bool = False) -> bool:
+        """Record a processing failure.
+
+        The event stays pending for another attempt unless the failure is
+        permanent or it has used up ``max_attempts``.
+
+        Returns:
+            True if the event will be retried, False if it was given up on
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM events WHERE seq = ?", (seq,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            retry = not permanent and attempts < self.max_attempts
+            self._conn.execute(
+                "UPDATE events SET attempts = ?, last_error = ?, status = ?, processed_at = ? WHERE seq = ?",
+                (attempts, error, "pending" if retry else "failed", None if retry else time.time(), seq),
+            )
+        return retry
+
+    def depth(self) -> int:
+        """Number of events waiting to be processed."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events WHERE status = 'pending'").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Count events by status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM events GROUP BY status").fetchall()
+        counts = {"pending": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Delete processed events older than the retention window.
+
+        Returns:
+            Number of events deleted
+        """
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM events WHERE status = 'done' AND processed_at < ?", (cutoff,)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class PermanentEventError(Exception):
+    """Raised by an event handler when retrying the event cannot succeed."""
+
+
+class QueueConsumer:
+    """Drains an EventQueue in the background, one event at a time.
+
+    Each event is acknowledged only after ``handler`` returns, which is the
+    consumer's checkpoint. Events whose handler raises are retried on a later
+    pass until the queue's ``max_attempts`` is reached; handlers raise
+    PermanentEventError to give up on an event immediately.
+
+    Args:
+        queue: The queue to drain
+        handler: Coroutine function called with each QueuedEvent
+        poll_interval: Seconds to sleep between passes when nothing wakes the consumer
+        retention_seconds: How long processed events are kept before being purged
+        lock_path: Optional lock file; when several processes share the queue, only
+            the one holding this lock drains it and the others keep trying to take over
+    """
+
+    def __init__(
+        self,
+        queue: EventQueue,
+        handler: Callable[[QueuedEvent], Awaitable[None]],
+        poll_interval: float = 1.0,
+        retention_seconds: float = 86400,
+        lock_path: Optional[Path] = None,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.processing: Optional[int] = None
+        self._lock = FileLock(lock_path) if lock_path else None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start draining on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def notify(self) -> None:
+        """Wake the consumer because a new event was appended."""
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Stop after the event currently being processed is checkpointed."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+        if self._lock:
+            self._lock.release()
+
+    @property
+    def active(self) -> bool:
+        """Whether this consumer is the one draining the queue."""
+        return self._lock is None or self._lock.held
+
+    async def _run(self) -> None:
+        last_purge = 0.0
+        while not self._stopping:
+            self._wakeup.clear()
+            if self._lock and not self._lock.acquire(blocking=False):
+                await self._sleep()
+                continue
+
+            for event in await asyncio.to_thread(self.queue.pending):
+                if self._stopping:
+                    break
+                await self._process(event)
+
+            if time.monotonic() - last_purge > 3600:
+                await asyncio.to_thread(self.queue.purge, self.retention_seconds)
+                last_purge = time.monotonic()
+
+            await self._sleep()
+
+    async def _sleep(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _process(self, event: QueuedEvent) -> None:
+        self.processing = event.seq
+        try:
+            await self.handler(event)
+        except PermanentEventError as e:
+            await asyncio.to_thread(self.queue.fail, event.seq, str(e), True)
+            logger.error(
+                "Event %s (%s) dropped: %s", event.seq, event.event_type, e,
+                extra={"fields": {"seq": event.seq, "event": event.event_type, "delivery_id": event.delivery_id}}
+            )
+        except Exception as e:
+            retry = await asyncio.to_thread(self.queue.fail, event.seq, str(e))
+            logger.warning(
+                "Event %s (%s) failed: %s%s", event.seq, event.event_type, e, " - will retry" if retry else "",
+                extra={"fields": {"seq": event.seq, "event": event.event_type, "delivery_id": event.delivery_id, "retry": retry}}
+            )
+        else:
+            await asyncio.to_thread(self.queue.ack, event.seq)
+        finally:
+            self.processing = None
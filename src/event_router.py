@@ -0,0 +1,101 @@
+"""Registry mapping GitHub ``(event, action)`` pairs to handler functions.
+
+Handlers register with a decorator and declare how they run:
+
+    router = EventRouter()
+
+    @router.on("issues", "opened")
+    def handle_issue_opened(payload: dict) -> dict:
+        ...
+
+    @router.on("push", mode="background", fields=("ref", "repository"))
+    async def handle_push(payload: dict) -> None:
+        ...
+
+``inline`` handlers run inside the request and their return value is the
+response body. ``background`` handlers run after the webhook has answered
+``202 Accepted``. A handler registered without an action receives every
+action of its event that has no more specific handler. Handlers that only
+need a few top-level fields list them in ``fields`` and receive a payload
+containing just those fields, decoded without parsing the rest of the body.
+"""
+
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+
+
+MODES = ("inline", "background")
+
+
+@dataclass(frozen=True)
+class Route:
+    """A registered handler and how it should be run."""
+
+    event: str
+    action: Optional[str]
+    handler: Callable[[dict], Any]
+    mode: str = "inline"
+    fields: Optional[Tuple[str, ...]] = None
+
+    async def call(self, payload: dict) -> Any:
+        """Invoke the handler, awaiting it if it is a coroutine function."""
+        result = self.handler(payload)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+class EventRouter:
+    """O(1) lookup of handlers by ``(event, action)``."""
+
+    def __init__(self):
+        self._routes: dict[tuple[str, Optional[str]], Route] = {}
+        self._events: set[str] = set()
+
+    def on(
+        self,
+        event: str,
+        action: Optional[str] = None,
+        mode: str = "inline",
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Callable:
+        """Decorator registering a handler for an event and optional action.
+
+        Args:
+            event: The X-GitHub-Event value, e.g. "issues"
+            action: The payload's "action", or None to match any action
+            mode: "inline" or "background"
+            fields: Top-level payload fields the handler reads, or None for the full payload
+
+        Raises:
+            ValueError: If the mode is unknown or the pair is already registered
+        """
+        if mode not in MODES:
+            raise ValueError(f"Invalid handler mode: {mode}")
+
+        def decorator(handler: Callable[[dict], Any]) -> Callable[[dict], Any]:
+            key = (event, action)
+            if key in self._routes:
+                raise ValueError(f"Handler already registered for {event}.{action or '*'}")
+            route_fields = tuple(dict.fromkeys(("action",) + tuple(fields))) if fields else None
+            self._routes[key] = Route(event=event, action=action, handler=handler, mode=mode, fields=route_fields)
+            self._events.add(event)
+            return handler
+
+        return decorator
+
+    def handles(self, event: Optional[str]) -> bool:
+        """Check whether any handler is registered for an event type.
+
+        Used to skip parsing payloads of events nobody handles.
+        """
+        return event in self._events
+
+    def resolve(self, event: Optional[str], action: Optional[str]) -> Optional[Route]:
+        """Find the handler for an event and action, falling back to the event's catch-all."""
+        return self._routes.get((event, action)) or self._routes.get((event, None))
+
+    def routes(self) -> list[Route]:
+        """Return every registered route."""
+        return list(self._routes.values())
@@ -0,0 +1,236 @@
+"""Background refresh of cached repositories.
+
+Instead of pulling a repository when an event for it arrives, the scheduler
+fetches repositories that receive events on a timer, so the clone is usually
+current by the time the next event needs it. The interval adapts to each
+repository's activity: it is half the (smoothed) gap between its events,
+clamped to ``[min_interval, max_interval]``. Repositories that have not had
+an event for ``idle_after`` seconds are dropped from the schedule.
+
+Every interval is randomly stretched or shrunk by up to ``jitter`` so that
+repositories do not fall into lock-step, and at most ``max_concurrency``
+fetches run at once.
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+logger = logging.getLogger("ghook.fetch")
+
+# Weight of the newest gap in the smoothed gap between events
+GAP_SMOOTHING = 0.3
+
+
+@dataclass
+class RepoSchedule:
+    """Refresh state of one repository."""
+
+    full_name: str
+    owner: str
+    repo_name: str
+    last_event: float
+    next_due: float
+    mean_gap: Optional[float] = None
+    fetching: bool = False
+    last_fetch: Optional[float] = None
+    last_status: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the schedule."""
+        return {
+            "repository": self.full_name,
+            "last_event": self.last_event,
+            "mean_gap": self.mean_gap,
+            "next_due": self.next_due,
+            "last_fetch": self.last_fetch,
+            "last_status": self.last_status,
+        }
+
+
+class FetchScheduler:
+    """Keeps recently active repositories fresh in the background.
+
+    Args:
+        refresh: Coroutine function, or blocking function run on a worker thread,
+            called as ``refresh(full_name, owner, repo_name)``; returns a result dict
+            whose ``status`` is "error", "skipped" or anything else for a successful fetch
+        max_concurrency: Maximum fetches running at the same time
+        min_interval: Shortest time between fetches of one repository
+        max_interval: Longest time between fetches of an active repository
+        jitter: Fraction by which each interval is randomly varied
+        idle_after: Seconds without events after which a repository is no longer refreshed
+        last_fetched: Optional ``last_fetched(owner, repo_name)`` returning when the
+            repository was last fetched by anyone (e.g. another worker process), so
+            recently fetched repositories are skipped
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[str, str, str], dict],
+        max_concurrency: int = 2,
+        min_interval: float = 60,
+        max_interval: float = 3600,
+        jitter: float = 0.2,
+        idle_after: float = 86400,
+        last_fetched: Optional[Callable[[str, str], Optional[float]]] = None,
+    ):
+        self.refresh = refresh
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.idle_after = idle_after
+        self.last_fetched = last_fetched
+        self.fetches = 0
+        self.skipped = 0
+        self.failures = 0
+        self._schedules: dict[str, RepoSchedule] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._fetches: set[asyncio.Task] = set()
+
+    def record_event(self, full_name: str, owner: str, repo_name: str) -> None:
+        """Note that an event arrived for a repository, adding it to the schedule if needed.
+
+        Must be called from the event loop.
+        """
+        now = time.time()
+        key = f"{owner}/{repo_name}"
+        schedule = self._schedules.get(key)
+        if schedule is None:
+            self._schedules[key] = RepoSchedule(
+                full_name=full_name,
+                owner=owner,
+                repo_name=repo_name,
+                last_event=now,
+                next_due=now + self._jittered(self.max_interval),
+            )
+            return
+
+        gap = now - schedule.last_event
+        schedule.mean_gap = gap if schedule.mean_gap is None else (
+            GAP_SMOOTHING * gap + (1 - GAP_SMOOTHING) * schedule.mean_gap
+        )
+        schedule.last_event = now
+        # A repository that just became busier should not wait out its old, longer interval
+        schedule.next_due = min(schedule.next_due, now + self._jittered(self.interval(schedule)))
+        if self._wakeup:
+            self._wakeup.set()
+
+    def interval(self, schedule: RepoSchedule) -> float:
+        """Seconds between fetches for a repository, before jitter."""
+        if schedule.mean_gap is None:
+            return self.max_interval
+        return min(self.max_interval, max(self.min_interval, schedule.mean_gap / 2))
+
+    def fetch_interval(self, owner: str, repo_name: str) -> float:
+        """Seconds between fetches for a repository, or ``min_interval`` if it is not scheduled."""
+        schedule = self._schedules.get(f"{owner}/{repo_name}")
+        return self.interval(schedule) if schedule else self.min_interval
+
+    def start(self) -> None:
+        """Start the scheduler on the running event loop."""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop scheduling and wait for running fetches to finish."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._fetches:
+            await asyncio.gather(*self._fetches, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Return counters and the current schedule."""
+        return {
+            "repositories": len(self._schedules),
+            "running": sum(1 for schedule in self._schedules.values() if schedule.fetching),
+            "fetches": self.fetches,
+            "skipped": self.skipped,
+            "failures": self.failures,
+        }
+
+    def schedules(self) -> list[RepoSchedule]:
+        """Return every scheduled repository, soonest first."""
+        return sorted(self._schedules.values(), key=lambda schedule: schedule.next_due)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            self._drop_idle(now)
+
+            next_due = None
+            for schedule in list(self._schedules.values()):
+                if schedule.fetching:
+                    continue
+                if schedule.next_due <= now:
+                    schedule.fetching = True
+                    task = asyncio.get_running_loop().create_task(self._fetch(schedule))
+                    self._fetches.add(task)
+                    task.add_done_callback(self._fetches.discard)
+                elif next_due is None or schedule.next_due < next_due:
+                    next_due = schedule.next_due
+
+            timeout = self.max_interval if next_due is None else max(0.0, next_due - now)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fetch(self, schedule: RepoSchedule) -> None:
+        try:
+            async with self._semaphore:
+                interval = self.interval(schedule)
+                fetched_at = self.last_fetched(schedule.owner, schedule.repo_name) if self.last_fetched else None
+                if fetched_at is not None and time.time() - fetched_at < interval / 2:
+                    # Someone else (another worker, or an event) fetched it recently
+                    self.skipped += 1
+                    return
+
+                try:
+                    if inspect.iscoroutinefunction(self.refresh):
+                        result = await self.refresh(schedule.full_name, schedule.owner, schedule.repo_name)
+                    else:
+                        result = await asyncio.to_thread(self.refresh, schedule.full_name, schedule.owner, schedule.repo_name)
+                except Exception as e:
+                    result = {"status": "error", "message": str(e)}
+
+                schedule.last_fetch = time.time()
+                schedule.last_status = result.get("status")
+                if schedule.last_status == "skipped":
+                    self.skipped += 1
+                elif schedule.last_status == "error":
+                    self.failures += 1
+                    logger.warning(
+                        "Background fetch of %s failed: %s", schedule.full_name, result.get("message"),
+                        extra={"fields": {"event": "fetch", "repository": schedule.full_name}}
+                    )
+                else:
+                    self.fetches += 1
+        finally:
+            schedule.fetching = False
+            schedule.next_due = time.time() + self._jittered(self.interval(schedule))
+            if self._wakeup:
+                self._wakeup.set()
+
+    def _drop_idle(self, now: float) -> None:
+        for key, schedule in list(self._schedules.items()):
+            if not schedule.fetching and now - schedule.last_event > self.idle_after:
+                del self._schedules[key]
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
@@ -0,0 +1,95 @@
+"""Advisory file locks shared between webhook worker processes.
+
+When the server runs several worker processes, each has its own clone pool
+and queue consumer. A lock file per repository (and one for the queue
+consumer) lets the workers agree on who does the work without a separate
+coordination service. Locks are ``flock`` based, so they are released by the
+kernel if the holding process dies.
+"""
+
+import asyncio
+import fcntl
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class FileLock:
+    """Exclusive lock on a file, held across processes and threads.
+
+    Args:
+        path: Lock file location; parent directories are created as needed
+        poll_interval: Seconds between attempts while waiting for the lock
+    """
+
+    def __init__(self, path: Path, poll_interval: float = 0.1):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this instance currently holds the lock."""
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """Take the lock.
+
+        Args:
+            blocking: Wait for the lock instead of failing immediately
+            timeout: Maximum seconds to wait when blocking (None waits forever)
+
+        Returns:
+            True if the lock is now held, False if it could not be taken
+        """
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                    os.close(fd)
+                    return False
+                time.sleep(self.poll_interval)
+                continue
+            self._fd = fd
+            return True
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """Take the lock, polling on the event loop instead of blocking a thread.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if the lock is now held, False if it could not be taken in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.acquire(blocking=False):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self.poll_interval)
+        return True
+
+    def release(self) -> None:
+        """Release the lock if it is held."""
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        if not self.acquire():
+            raise TimeoutError(f"Could not lock {self.path}")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
@@ -0,0 +1,240 @@
+"""Minimal Prometheus-style metrics for the webhook server.
+
+Metrics are registered once at import time and updated on the request path
+with plain attribute arithmetic. Label values are stored as the raw objects
+the caller passes (header strings, status code ints), and are only turned
+into exposition text when ``/metrics`` is scraped, so recording a sample
+allocates nothing beyond the first use of a label combination.
+
+Values that already live elsewhere (queue depth, in-flight clones) are
+exposed through callbacks evaluated at scrape time.
+
+When several worker processes serve one port, each registry is given a
+constant ``pid`` label and the families collected from every worker are
+merged with ``render_families`` so one scrape covers all of them.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, *extra: str) -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    parts.extend(label for label in extra if label)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric(ABC):
+    kind = ""
+    # Pre-formatted labels added to every sample, set by the registry
+    const_labels = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        """Return the child for a label combination, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the per-label-combination child holding the values."""
+
+    def collect(self) -> tuple:
+        """Return the metric family as ``(name, documentation, kind, sample lines)``."""
+        return (self.name, self.documentation, self.kind, self._render_samples())
+
+    def render(self) -> list[str]:
+        return _render_family(*self.collect())
+
+    @abstractmethod
+    def _render_samples(self) -> list[str]:
+        """Render the sample lines for every child."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment the unlabelled counter."""
+        self._default.inc(amount)
+
+    def _render_samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values, self.const_labels)} {_format_number(child.value)}"
+            for values, child in list(self._children.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record a value on the unlabelled histogram."""
+        self._default.observe(value)
+
+    def _render_samples(self) -> list[str]:
+        lines = []
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, self.const_labels, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, values, self.const_labels)
+            lines.append(f"{self.name}_sum{labels} {_format_number(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class CallbackMetric:
+    """A gauge or counter whose value is read from a callback at scrape time.
+
+    The callback returns a number, or None to omit the sample.
+    """
+
+    const_labels = ""
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Optional[float]], kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.kind = kind
+
+    def collect(self) -> Optional[tuple]:
+        """Return the metric family, or None when the callback has no value."""
+        value = self.callback()
+        if value is None:
+            return None
+        sample = f"{self.name}{_format_labels((), (), self.const_labels)} {_format_number(value)}"
+        return (self.name, self.documentation, self.kind, [sample])
+
+    def render(self) -> list[str]:
+        family = self.collect()
+        return _render_family(*family) if family else []
+
+
+def _render_family(name: str, documentation: str, kind: str, samples: list[str]) -> list[str]:
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", *samples]
+
+
+def render_families(families: Iterable) -> str:
+    """Render collected metric families, merging families of the same name.
+
+    Families collected from several registries (one per worker process) are
+    written under a single HELP/TYPE header, in the order each name was first seen.
+    """
+    merged: dict[str, tuple] = {}
+    for name, documentation, kind, samples in families:
+        if name in merged:
+            merged[name][3].extend(samples)
+        else:
+            merged[name] = (name, documentation, kind, list(samples))
+    lines = []
+    for family in merged.values():
+        lines.extend(_render_family(*family))
+    return "\n".join(lines) + "\n"
+
+
+class Registry:
+    """Collection of metrics rendered together in the text exposition format.
+
+    Args:
+        const_labels: Labels added to every sample, e.g. ``{"pid": os.getpid()}``
+    """
+
+    def __init__(self, const_labels: Optional[dict] = None):
+        self._metrics: list = []
+        labels = const_labels or {}
+        self.const_labels = _format_labels(tuple(labels), tuple(labels.values()))[1:-1]
+
+    def register(self, metric):
+        """Add a metric and return it."""
+        metric.const_labels = self.const_labels
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, callback: Callable[[], Optional[float]], kind: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, callback, kind))
+
+    def collect(self) -> list[tuple]:
+        """Return every metric family with a value, ready for ``render_families``."""
+        return [family for family in (metric.collect() for metric in self._metrics) if family]
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        return render_families(self.collect())
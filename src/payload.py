@@ -0,0 +1,125 @@
+"""Cheap access to webhook payloads without always parsing the whole body.
+
+Push and workflow_run payloads can be hundreds of KB, and most of that is
+irrelevant to a handler. This module lets the webhook:
+
+- read the ``action`` without parsing the body when it is the first key, as
+  GitHub currently sends it (other orders fall back to a field scan)
+- decode only the top-level fields a handler declared, stopping as soon as
+  they have all been seen
+- use orjson for full parses when it is installed
+"""
+
+import json
+import re
+from typing import Any, Callable, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional faster backend
+    orjson = None
+
+
+# Returned by peek_action() when the action cannot be determined cheaply
+UNKNOWN = object()
+
+_ACTION_PREFIX = re.compile(rb'\A\s*\{\s*"action"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def select_backend(name: str = "auto") -> tuple[str, Callable[[bytes], Any]]:
+    """Pick the JSON decoder used for full payload parses.
+
+    Args:
+        name: "auto" (orjson if installed), "orjson" or "json"
+
+    Returns:
+        Tuple of the backend name and its loads function
+
+    Raises:
+        ValueError: If the backend is unknown or orjson was requested but is not installed
+    """
+    if name == "auto":
+        name = "orjson" if orjson else "json"
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("orjson JSON backend requested but orjson is not installed")
+        return "orjson", orjson.loads
+    if name == "json":
+        return "json", json.loads
+    raise ValueError(f"Unknown JSON backend: {name}")
+
+
+def peek_action(body: bytes) -> Any:
+    """Read the payload's top-level "action" without parsing the body.
+
+    Returns:
+        The action string, None if the payload has no top-level action (e.g.
+        push), or UNKNOWN if the body does not start like a JSON object
+
+    Raises:
+        json.JSONDecodeError: If another key comes first and the body is not a JSON object
+    """
+    match = _ACTION_PREFIX.match(body, 0, 512)
+    if match:
+        return json.loads(b'"' + match.group(1) + b'"')
+    if re.match(rb'\A\s*\{\s*"(?!action")', body[:512]):
+        # Key order is not part of GitHub's contract: look for the action among the top-level fields
+        return extract_fields(body, ("action",)).get("action")
+    return UNKNOWN
+
+
+def extract_fields(body: bytes, fields: Iterable[str]) -> dict:
+    """Decode only the requested top-level fields of a JSON object.
+
+    Values are decoded one at a time and scanning stops once every requested
+    field has been found, so large trailing fields (commits, workflow logs)
+    are never materialised. Fields absent from the payload are omitted. The
+    remainder of the body is not validated; use this only after the
+    signature has been verified.
+
+    Raises:
+        json.JSONDecodeError: If the body is not a JSON object
+    """
+    text = body.decode("utf-8") if isinstance(body, (bytes, bytearray)) else body
+    wanted = set(fields)
+    result: dict = {}
+
+    idx = _WHITESPACE.match(text, 0).end()
+    if text[idx:idx + 1] != "{":
+        raise json.JSONDecodeError("Expecting object", text, idx)
+    idx = _WHITESPACE.match(text, idx + 1).end()
+    if text[idx:idx + 1] == "}":
+        return result
+
+    while wanted:
+        key, idx = _decoder.raw_decode(text, idx)
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", text, idx)
+        idx = _WHITESPACE.match(text, idx).end()
+        if text[idx:idx + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, idx)
+        idx = _WHITESPACE.match(text, idx + 1).end()
+
+        value, idx = _decoder.raw_decode(text, idx)
+        if key in wanted:
+            result[key] = value
+            wanted.discard(key)
+
+        idx = _WHITESPACE.match(text, idx).end()
+        delimiter = text[idx:idx + 1]
+        if delimiter == "}":
+            break
+        if delimiter != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, idx)
+        idx = _WHITESPACE.match(text, idx + 1).end()
+
+    return result
+
+
+def parse_payload(body: bytes, fields: Optional[Iterable[str]], loads: Callable[[bytes], Any] = json.loads) -> dict:
+    """Parse a payload, extracting only ``fields`` when a handler declared them."""
+    if fields:
+        return extract_fields(body, fields)
+    return loads(body)
@@ -0,0 +1,174 @@
+"""Bare mirror per repository with cheap per-issue worktrees.
+
+A single working copy per repository cannot be shared by concurrent issues:
+each one would pull, check out or edit files under the others. Instead, each
+repository gets one bare mirror that is kept current with ``git fetch``, and
+every issue (or workflow) gets its own ``git worktree`` checked out from it.
+Worktrees share the mirror's object store, so creating one costs a checkout
+rather than a clone.
+
+Layout under the base directory::
+
+    owner/repo.git          bare mirror
+    owner/repo/issue-42     worktree for issue #42
+
+Worktrees that have not been used for a while are removed on demand by
+``gc`` (called whenever a mirror is synced).
+"""
+
+import shutil
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from clone_strategy import CloneStrategy
+from runner import CommandRunner
+
+
+# Branches are mirrored onto local branch names; worktrees are always detached,
+# so fetch never refuses to update a branch that is checked out
+MIRROR_REFSPEC = "+refs/heads/*:refs/heads/*"
+
+
+def gh_clone_command(full_name: str, target: Path, git_args: list[str]) -> list[str]:
+    """Build the ``gh repo clone`` command, passing git options after ``--``."""
+    return ["gh", "repo", "clone", full_name, str(target), "--", *git_args]
+
+
+class GitError(Exception):
+    """Raised when a git command exits with an error."""
+
+
+class RepoMirrors:
+    """Manages bare mirrors and their worktrees under a base directory.
+
+    Args:
+        base_dir: Root directory (the clone base directory)
+        clone_command: Builds the command that creates a mirror, called as
+            ``clone_command(full_name, target, git_args)``
+        timeout: Seconds allowed for each git command
+        runner: Runs the git commands (default: a plain CommandRunner)
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        clone_command: Callable[[str, Path, list[str]], list[str]] = gh_clone_command,
+        timeout: float = 120,
+        runner: Optional[CommandRunner] = None,
+    ):
+        self.base_dir = Path(base_dir)
+        self.clone_command = clone_command
+        self.timeout = timeout
+        self.runner = runner or CommandRunner()
+
+    def mirror_path(self, owner: str, repo_name: str) -> Path:
+        """Location of a repository's bare mirror."""
+        return self.base_dir / owner / f"{repo_name}.git"
+
+    def worktree_path(self, owner: str, repo_name: str, name: str) -> Path:
+        """Location of a named worktree of a repository."""
+        return self.base_dir / owner / repo_name / name
+
+    async def sync(self, full_name: str, owner: str, repo_name: str, strategy: Optional[CloneStrategy] = None) -> dict:
+        """Create the mirror if it is missing, otherwise fetch into it.
+
+        Args:
+            full_name: The full repository name (e.g., "owner/repo")
+            owner: Sanitized owner directory name
+            repo_name: Sanitized repository directory name
+            strategy: Depth, filter and reference options for the mirror
+
+        Returns:
+            Dict with status "cloned" or "updated" and the mirror path, or an error
+        """
+        strategy = strategy or CloneStrategy()
+        mirror = self.mirror_path(owner, repo_name)
+        exists = (mirror / "HEAD").exists()
+        try:
+            if exists:
+                await self._git(mirror, "fetch", "--prune", *strategy.fetch_args(), "origin")
+                status = "updated"
+            else:
+                mirror.parent.mkdir(parents=True, exist_ok=True)
+                # Sparse paths apply to worktrees, not to the bare mirror
+                clone_args = ["--bare", *(arg for arg in strategy.clone_args() if arg != "--sparse")]
+                await self._run(self.clone_command(full_name, mirror, clone_args))
+                await self._git(mirror, "config", "remote.origin.fetch", MIRROR_REFSPEC)
+                status = "cloned"
+        except GitError as e:
+            return {"status": "error", "message": f"Mirror {'fetch' if exists else 'clone'} failed: {e}"}
+        return {"status": status, "path": str(mirror)}
+
+    async def add_worktree(
+        self,
+        owner: str,
+        repo_name: str,
+        name: str,
+        ref: str = "HEAD",
+        sparse_paths: tuple[str, ...] = (),
+    ) -> Path:
+        """Check out a detached worktree of the mirror, reusing it if it already exists.
+
+        Raises:
+            GitError: If the worktree cannot be created
+        """
+        mirror = self.mirror_path(owner, repo_name)
+        path = self.worktree_path(owner, repo_name, name)
+        if (path / ".git").exists():
+            path.touch()
+            return path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await self._git(mirror, "worktree", "prune")
+        if sparse_paths:
+            await self._git(mirror, "worktree", "add", "--detach", "--no-checkout", str(path), ref)
+            await self._git(path, "sparse-checkout", "set", "--", *sparse_paths)
+            await self._git(path, "checkout", "--detach")
+        else:
+            await self._git(mirror, "worktree", "add", "--detach", str(path), ref)
+        return path
+
+    async def remove_worktree(self, owner: str, repo_name: str, name: str) -> None:
+        """Delete a worktree and its administrative files in the mirror."""
+        mirror = self.mirror_path(owner, repo_name)
+        path = self.worktree_path(owner, repo_name, name)
+        try:
+            await self._git(mirror, "worktree", "remove", "--force", str(path))
+        except GitError:
+            # Fall back for worktrees whose directory was partly deleted
+            shutil.rmtree(path, ignore_errors=True)
+            await self._git(mirror, "worktree", "prune")
+
+    def worktrees(self, owner: str, repo_name: str) -> list[Path]:
+        """Return the worktree directories of a repository."""
+        root = self.base_dir / owner / repo_name
+        if not root.is_dir():
+            return []
+        return sorted(path for path in root.iterdir() if (path / ".git").is_file())
+
+    async def gc(self, owner: str, repo_name: str, max_age_seconds: float) -> list[str]:
+        """Remove worktrees that were not created or reused within ``max_age_seconds``.
+
+        Returns:
+            Names of the removed worktrees
+        """
+        cutoff = time.time() - max_age_seconds
+        removed = []
+        for path in self.worktrees(owner, repo_name):
+            if path.stat().st_mtime < cutoff:
+                await self.remove_worktree(owner, repo_name, path.name)
+                removed.append(path.name)
+        return removed
+
+    async def _git(self, repo: Path, *args: str) -> str:
+        return await self._run(["git", "-C", str(repo), *args])
+
+    async def _run(self, command: list[str]) -> str:
+        try:
+            result = await self.runner.run(command, timeout=self.timeout)
+        except OSError as e:
+            raise GitError(str(e))
+        if not result.ok:
+            raise GitError(result.error_message())
+        return result.stdout
@@ -0,0 +1,361 @@
+"""Asynchronous child processes with timeouts, output caps and timing.
+
+The webhook server shells out to ``gh`` and ``git`` and the SDLC tool to
+``copilot``; all of these can run for minutes. ``run_command`` starts them with
+``asyncio.create_subprocess_exec`` so waiting on a child blocks neither a
+thread nor the event loop. It also:
+
+- kills the child's whole process group on timeout or cancellation, since
+  ``gh`` and ``copilot`` start children of their own
+- reads stdout and stderr incrementally as they are written, optionally
+  passing each chunk to a callback, and keeps at most ``max_output_bytes`` of
+  each stream (the start and the end; the middle is dropped)
+- records when each command started and how long it took and, on request,
+  the CPU time and peak memory of the command and the processes it waited for
+
+Resource usage comes from ``wait4``, which needs the parent of the command:
+with ``measure=True`` the command is started through this module run as a
+script, which runs it, waits for it and reports its usage over a pipe.
+"""
+
+import asyncio
+import codecs
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+
+# Output kept per stream by default
+DEFAULT_MAX_OUTPUT_BYTES = 1024 * 1024
+
+# Seconds a child gets to exit after SIGTERM before it is sent SIGKILL
+KILL_GRACE_SECONDS = 5.0
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class OutputBuffer:
+    """Captures a stream within a byte cap, keeping its first and last bytes.
+
+    Args:
+        limit: Maximum bytes kept (0 keeps everything)
+    """
+
+    def __init__(self, limit: int = DEFAULT_MAX_OUTPUT_BYTES):
+        self.limit = limit
+        self.total = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+
+    def append(self, data: bytes) -> None:
+        """Add bytes read from the stream."""
+        self.total += len(data)
+        if self.limit <= 0:
+            self._head += data
+            return
+        head_room = self.limit // 2 - len(self._head)
+        if head_room > 0:
+            self._head += data[:head_room]
+            data = data[head_room:]
+        if data:
+            self._tail += data
+            excess = len(self._tail) - (self.limit - self.limit // 2)
+            if excess > 0:
+                del self._tail[:excess]
+
+    @property
+    def dropped(self) -> int:
+        """Bytes of the stream that were not kept."""
+        return self.total - len(self._head) - len(self._tail)
+
+    def text(self) -> str:
+        """Decode the kept output, marking where bytes were dropped."""
+        if not self.dropped:
+            return (self._head + self._tail).decode("utf-8", errors="replace")
+        return (
+            self._head.decode("utf-8", errors="replace")
+            + f"\n... [{self.dropped} bytes omitted] ...\n"
+            + self._tail.decode("utf-8", errors="replace")
+        )
+
+
+@dataclass
+class ResourceUsage:
+    """CPU time and peak memory of a command, including the children it waited for."""
+
+    cpu_user: float
+    cpu_system: float
+    max_rss_kb: int
+
+    @property
+    def cpu_time(self) -> float:
+        """User plus system CPU seconds."""
+        return self.cpu_user + self.cpu_system
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the usage."""
+        return {
+            "cpu_user": round(self.cpu_user, 3),
+            "cpu_system": round(self.cpu_system, 3),
+            "max_rss_kb": self.max_rss_kb,
+        }
+
+
+@dataclass
+class CommandResult:
+    """Outcome and timing of one command."""
+
+    command: list[str]
+    returncode: Optional[int]
+    stdout: str = ""
+    stderr: str = ""
+    started_at: float = 0.0
+    duration: float = 0.0
+    timed_out: bool = False
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    usage: Optional[ResourceUsage] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the command exited with status 0 within its timeout."""
+        return self.returncode == 0 and not self.timed_out
+
+    def error_message(self) -> str:
+        """Describe why the command failed, preferring its own error output."""
+        if self.timed_out:
+            return f"{self.command[0]} timed out after {self.duration:.0f}s"
+        return self.stderr.strip() or f"{self.command[0]} exited with {self.returncode}"
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable timing record, without the captured output."""
+        return {
+            "program": Path(self.command[0]).name,
+            "returncode": self.returncode,
+            "started_at": self.started_at,
+            "duration": round(self.duration, 3),
+            "timed_out": self.timed_out,
+            "stdout_bytes": self.stdout_bytes,
+            "stderr_bytes": self.stderr_bytes,
+            **({"usage": self.usage.to_dict()} if self.usage else {}),
+        }
+
+
+async def run_command(
+    command: list[str],
+    timeout: Optional[float] = None,
+    cwd: Optional[Union[str, Path]] = None,
+    env: Optional[dict] = None,
+    max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+    on_stdout: Optional[Callable[[str], None]] = None,
+    on_stderr: Optional[Callable[[str], None]] = None,
+    kill_grace: float = KILL_GRACE_SECONDS,
+    measure: bool = False,
+) -> CommandResult:
+    """Run a command to completion without blocking the event loop.
+
+    Args:
+        command: Program and arguments
+        timeout: Seconds before the command's process group is killed (None waits forever)
+        cwd: Working directory for the command
+        env: Environment for the command (default: inherited)
+        max_output_bytes: Bytes of stdout and of stderr kept in the result (0 keeps everything)
+        on_stdout: Called with each decoded chunk of stdout as it arrives
+        on_stderr: Called with each decoded chunk of stderr as it arrives
+        kill_grace: Seconds between SIGTERM and SIGKILL when the command is stopped
+        measure: Record the command's CPU time and peak RSS in ``usage``
+
+    Returns:
+        The command's result; a timeout is reported as ``timed_out`` rather than raised
+
+    Raises:
+        OSError: If the program cannot be started (e.g. FileNotFoundError)
+        asyncio.CancelledError: If the caller is cancelled; the command is killed first
+    """
+    started_at = time.time()
+    start = time.monotonic()
+    report_fd = write_fd = None
+    argv = list(command)
+    if measure:
+        report_fd, write_fd = os.pipe()
+        argv = [sys.executable, str(Path(__file__).resolve()), str(write_fd), *command]
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            # Own process group, so the command and everything it starts can be killed together
+            start_new_session=True,
+            pass_fds=(write_fd,) if measure else (),
+        )
+    except BaseException:
+        if measure:
+            os.close(report_fd)
+        raise
+    finally:
+        if measure:
+            os.close(write_fd)
+    stdout = OutputBuffer(max_output_bytes)
+    stderr = OutputBuffer(max_output_bytes)
+
+    async def communicate() -> int:
+        await asyncio.gather(
+            _pump(process.stdout, stdout, on_stdout),
+            _pump(process.stderr, stderr, on_stderr),
+        )
+        return await process.wait()
+
+    timed_out = False
+    try:
+        returncode = await asyncio.wait_for(communicate(), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        await _terminate(process, kill_grace)
+        returncode = process.returncode
+    except asyncio.CancelledError:
+        await _terminate(process, kill_grace)
+        if measure:
+            os.close(report_fd)
+        raise
+
+    usage = None
+    if measure:
+        report = await _read_report(report_fd)
+        if "errno" in report:
+            raise OSError(report["errno"], report["strerror"], command[0])
+        if "returncode" in report:
+            returncode = report["returncode"]
+            usage = ResourceUsage(report["cpu_user"], report["cpu_system"], report["max_rss_kb"])
+
+    return CommandResult(
+        command=list(command),
+        returncode=returncode,
+        stdout=stdout.text(),
+        stderr=stderr.text(),
+        started_at=started_at,
+        duration=time.monotonic() - start,
+        timed_out=timed_out,
+        stdout_bytes=stdout.total,
+        stderr_bytes=stderr.total,
+        usage=usage,
+    )
+
+
+class CommandRunner:
+    """Runs commands with shared defaults and keeps timing records of recent ones.
+
+    Args:
+        timeout: Default timeout for commands that do not pass their own
+        max_output_bytes: Default bytes kept per stream
+        history: Number of timing records kept in ``records``
+        on_finish: Called with every finished command's result
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        history: int = 100,
+        on_finish: Optional[Callable[[CommandResult], None]] = None,
+    ):
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.on_finish = on_finish
+        self.records: deque[dict] = deque(maxlen=history)
+
+    async def run(self, command: list[str], **options) -> CommandResult:
+        """Run a command; options are passed to ``run_command``."""
+        options.setdefault("timeout", self.timeout)
+        options.setdefault("max_output_bytes", self.max_output_bytes)
+        result = await run_command(command, **options)
+        self.records.append(result.to_dict())
+        if self.on_finish:
+            self.on_finish(result)
+        return result
+
+
+async def _pump(stream: asyncio.StreamReader, buffer: OutputBuffer, callback: Optional[Callable[[str], None]]) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while chunk := await stream.read(READ_CHUNK_BYTES):
+        buffer.append(chunk)
+        if callback:
+            text = decoder.decode(chunk)
+            if text:
+                callback(text)
+    if callback:
+        text = decoder.decode(b"", final=True)
+        if text:
+            callback(text)
+
+
+async def _terminate(process: asyncio.subprocess.Process, grace: float) -> None:
+    if process.returncode is not None:
+        # The command itself exited, but something it started still holds its output open
+        _signal_group(process, signal.SIGKILL)
+        return
+    _signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), grace)
+    except asyncio.TimeoutError:
+        _signal_group(process, signal.SIGKILL)
+        await process.wait()
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+async def _read_report(fd: int) -> dict:
+    # The wrapper has exited, so the pipe holds its whole report (or nothing if it was killed);
+    # it is still read through the event loop so no read ever blocks it
+    reader = asyncio.StreamReader()
+    transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, "rb", buffering=0)
+    )
+    try:
+        data = await reader.read()
+    finally:
+        transport.close()
+    try:
+        return json.loads(data) if data else {}
+    except ValueError:
+        return {}
+
+
+def _measure(report_fd: int, command: list[str]) -> int:
+    """Run a command, wait for it with wait4 and write its exit status and usage to report_fd."""
+    with os.fdopen(report_fd, "w") as report:
+        try:
+            child = subprocess.Popen(command)
+        except OSError as e:
+            json.dump({"errno": e.errno, "strerror": e.strerror}, report)
+            return 127
+        # Stopping the group signals the command directly; the wrapper only has to outlive it
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        _, status, rusage = os.wait4(child.pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+        json.dump({
+            "returncode": returncode,
+            "cpu_user": rusage.ru_utime,
+            "cpu_system": rusage.ru_stime,
+            # Kilobytes on Linux
+            "max_rss_kb": rusage.ru_maxrss,
+        }, report)
+    return returncode if returncode >= 0 else 128 - returncode
+
+
+if __name__ == "__main__":
+    sys.exit(_measure(int(sys.argv[1]), sys.argv[2:]))
@@ -0,0 +1,158 @@
+"""Keyring of webhook secrets for verifying deliveries during secret rotation.
+
+While a new webhook secret is rolled out across many repositories, some
+hooks still sign with the old secret. The keyring holds every active secret
+and tries the most recently matched one first, so the common case costs a
+single HMAC. Each key counts its matches, which shows when an old secret
+has stopped being used and can be retired.
+
+Secrets come from environment values and, optionally, a file with one secret
+per line (blank lines and ``#`` comments are ignored). The file is re-read
+when its modification time changes, so secrets can be added or retired
+without restarting the server.
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class SigningKey:
+    """A webhook secret and its usage counters.
+
+    ``key_id`` is a short fingerprint of the secret that is safe to display.
+    """
+
+    key_id: str
+    secret: bytes
+    source: str
+    hits: int = 0
+    last_matched_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the key without the secret."""
+        return {
+            "key_id": self.key_id,
+            "source": self.source,
+            "hits": self.hits,
+            "last_matched_at": self.last_matched_at,
+        }
+
+
+def fingerprint(secret: bytes) -> str:
+    """Return a short, non-reversible identifier for a secret."""
+    return hashlib.sha256(secret).hexdigest()[:12]
+
+
+class WebhookKeyring:
+    """Active webhook secrets, ordered most recently matched first.
+
+    Args:
+        env_secrets: Secrets from environment variables, in preference order
+        secrets_file: Optional file with one secret per line
+        reload_interval: Minimum seconds between checks of the file's modification time
+    """
+
+    def __init__(self, env_secrets: list[str], secrets_file: Optional[Path] = None, reload_interval: float = 5.0):
+        self.env_secrets = [secret for secret in env_secrets if secret]
+        self.secrets_file = Path(secrets_file) if secrets_file else None
+        self.reload_interval = reload_interval
+        self._keys: list[SigningKey] = []
+        self._file_mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> None:
+        """Rebuild the keyring from the environment and the secrets file.
+
+        Hit counters and the preference order survive for secrets that are
+        still present.
+
+        Raises:
+            ValueError: If no secrets are configured at all
+        """
+        entries = [(secret.encode(), "env") for secret in self.env_secrets]
+        if self.secrets_file and self.secrets_file.exists():
+            self._file_mtime = self.secrets_file.stat().st_mtime
+            for line in self.secrets_file.read_text().splitlines():
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    entries.append((line.encode(), "file"))
+
+        with self._lock:
+            existing = {key.key_id: key for key in self._keys}
+            fresh: dict[str, SigningKey] = {}
+            for secret, source in entries:
+                key_id = fingerprint(secret)
+                if key_id not in fresh:
+                    fresh[key_id] = existing.get(key_id) or SigningKey(key_id=key_id, secret=secret, source=source)
+
+            if not fresh:
+                raise ValueError("No webhook secrets configured")
+
+            # Keep the current preference order, then append new keys
+            ordered = [key for key in self._keys if key.key_id in fresh]
+            ordered += [key for key_id, key in fresh.items() if key_id not in existing]
+            self._keys = ordered
+
+    def maybe_reload(self) -> None:
+        """Re-read the secrets file if it changed, checking at most every reload_interval."""
+        if not self.secrets_file:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = self.secrets_file.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._file_mtime:
+            try:
+                self.reload()
+            except ValueError:
+                # Never end up with an empty keyring; keep the previous keys
+                pass
+            self._file_mtime = mtime
+
+    def preferred(self) -> SigningKey:
+        """Return the key to try first (the most recently matched)."""
+        return self._keys[0]
+
+    def match(self, body: bytes, signature: str, skip: Optional[SigningKey] = None) -> Optional[SigningKey]:
+        """Find the key whose HMAC-SHA256 of ``body`` equals ``signature``.
+
+        Args:
+            body: The raw payload
+            signature: Hex digest from the X-Hub-Signature-256 header
+            skip: A key already checked by the caller
+
+        Returns:
+            The matching key, or None
+        """
+        for key in list(self._keys):
+            if key is skip:
+                continue
+            expected = hmac.new(key.secret, msg=body, digestmod=hashlib.sha256).hexdigest()
+            if hmac.compare_digest(expected, signature):
+                return key
+        return None
+
+    def record_hit(self, key: SigningKey) -> None:
+        """Count a successful match and make the key the first one tried."""
+        with self._lock:
+            key.hits += 1
+            key.last_matched_at = time.time()
+            if self._keys and self._keys[0] is not key and key in self._keys:
+                self._keys.remove(key)
+                self._keys.insert(0, key)
+
+    def stats(self) -> list[dict]:
+        """Return per-key usage counters in preference order."""
+        return [key.to_dict() for key in self._keys]
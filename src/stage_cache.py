@@ -0,0 +1,109 @@
+"""Content-addressed cache of SDLC stage results.
+
+A stage whose result depends only on known inputs (its prompt, the model,
+the prompt files it references and the repository tree) can be skipped when
+the same inputs come up again. ``cache_key`` hashes those inputs; each entry
+is one JSON file named after its key. Reading an entry refreshes its
+modification time, and when the cache grows past ``max_bytes`` the least
+recently used entries are deleted.
+
+Entries are written to a temporary file and renamed into place, so readers
+never see a partial entry and several workflows can share one cache.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+
+# Default size bound of the cache directory
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+def cache_key(**parts) -> str:
+    """Hash named inputs into a cache key; the order of the arguments does not matter."""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory ($XDG_CACHE_HOME/ghook/sdlc or ~/.cache/ghook/sdlc)."""
+    base = os.getenv("XDG_CACHE_HOME", "") or Path.home() / ".cache"
+    return Path(base) / "ghook" / "sdlc"
+
+
+class StageCache:
+    """Size-bounded cache of stage results on disk.
+
+    Args:
+        directory: Where entries are stored (created if missing)
+        max_bytes: Total size of entries above which the least recently used are evicted
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the entry stored under key, or None; a hit counts as a use for eviction."""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        """Store an entry under key, then evict down to max_bytes."""
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, path)
+        self.evict(keep=key)
+
+    def size(self) -> int:
+        """Total bytes of the stored entries."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Optional[str] = None) -> list[str]:
+        """Delete least recently used entries until the cache fits in max_bytes.
+
+        Args:
+            keep: Key that is never evicted (the entry just stored)
+
+        Returns:
+            Keys of the evicted entries
+        """
+        entries = sorted(self._entries(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path.stem == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                # Another workflow sharing the cache evicted it first
+                pass
+            total -= size
+            evicted.append(path.stem)
+        return evicted
+
+    def _entries(self) -> list[tuple[Path, int, float]]:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
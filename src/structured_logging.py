@@ -0,0 +1,248 @@
+"""Structured, non-blocking logging for the webhook server.
+
+Log calls on the request path only put the record on a bounded in-memory
+queue; a background QueueListener thread formats and writes it to stdout.
+Records carry structured fields (``extra={"fields": {...}}``, or the
+``log_event`` helper) that are rendered either as one JSON object per line
+or as the human-readable console banner.
+
+Large string fields (issue bodies, clone errors) are truncated when
+formatted, and high-volume events can be sampled by event name so that most
+of their records are dropped before they are queued.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from typing import Optional
+
+
+LOGGER_NAME = "ghook"
+
+
+def log_event(logger: logging.Logger, message: str, level: int = logging.INFO, **fields) -> None:
+    """Log a message with structured fields."""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"fields": fields})
+
+
+def truncate(value: str, limit: int) -> str:
+    """Shorten a string to ``limit`` characters, noting how much was dropped."""
+    if limit <= 0 or len(value) <= limit:
+        return value
+    return f"{value[:limit]}…[truncated {len(value) - limit} chars]"
+
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    """Parse ``"push=0.1,workflow_run=0.01"`` into a mapping of event to keep rate.
+
+    Raises:
+        ValueError: If an entry is malformed or a rate is outside 0..1
+    """
+    rates = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        event, separator, rate = entry.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid sample rate entry: {entry}")
+        value = float(rate)
+        if not 0 <= value <= 1:
+            raise ValueError(f"Sample rate for {event} must be between 0 and 1: {value}")
+        rates[event.strip()] = value
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of records for configured events.
+
+    The event is read from the record's ``event`` field; records without one,
+    and warnings or errors, are always kept.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.rates or record.levelno >= logging.WARNING:
+            return True
+        fields = getattr(record, "fields", None)
+        rate = self.rates.get(fields.get("event")) if fields else None
+        return rate is None or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects with truncated string fields."""
+
+    def __init__(self, max_field_chars: int = 2000):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in (getattr(record, "fields", None) or {}).items():
+            entry[key] = truncate(value, self.max_field_chars) if isinstance(value, str) else value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class BannerFormatter(logging.Formatter):
+    """Renders records as the webhook's human-readable console output."""
+
+    def __init__(self, max_field_chars: int = 2000):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None) or {}
+        kind = fields.get("kind")
+        if kind == "issue_opened":
+            return self._format_issue(fields)
+        if kind == "clone_result":
+            return self._format_clone(fields)
+
+        line = record.getMessage()
+        if record.levelno >= logging.ERROR:
+            line = f"❌ {line}"
+        elif record.levelno >= logging.WARNING:
+            line = f"⚠️  {line}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+    def _format_issue(self, fields: dict) -> str:
+        body = truncate(str(fields.get("issue_body") or "No description provided"), self.max_field_chars)
+        lines = [
+            "",
+            "=" * 60,
+            "🎉 NEW ISSUE CREATED!",
+            "=" * 60,
+            f"Repository:  {fields.get('repository')}",
+            f"Owner:       {fields.get('owner')}",
+            f"Private:     {fields.get('private')}",
+            f"Repo URL:    {fields.get('repo_url')}",
+            "",
+            "Issue Details:",
+            f"Title:       {fields.get('title')}",
+            f"Number:      #{fields.get('number')}",
+            f"Author:      {fields.get('author')}",
+            f"State:       {fields.get('state')}",
+            f"URL:         {fields.get('issue_url')}",
+            f"Created at:  {fields.get('created_at')}",
+            "",
+            f"Body:\n{body}",
+        ]
+        if fields.get("clone_job_id"):
+            lines += ["", f"Repository Clone: queued as job {fields['clone_job_id']}"]
+        lines += ["=" * 60, ""]
+        return "\n".join(lines)
+
+    def _format_clone(self, fields: dict) -> str:
+        status = fields.get("status")
+        header = f"\nRepository Clone ({fields.get('repository')}, job {fields.get('job_id')}, {fields.get('origin')}):"
+        if status == "cloned":
+            detail = f"✅ Cloned successfully to: {fields.get('path')}"
+        elif status == "exists":
+            detail = f"ℹ️  Repository already exists at: {fields.get('path')}"
+        elif status == "updated":
+            detail = f"🔄 Updated existing repository at: {fields.get('path')}"
+        else:
+            detail = f"❌ Clone failed: {truncate(str(fields.get('message')), self.max_field_chars)}"
+        return f"{header}\n{detail}"
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks or formats on the caller's thread.
+
+    Formatting is left to the listener thread, and records are dropped (and
+    counted) instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingPipeline:
+    """Owns the queue handler and the background listener thread."""
+
+    def __init__(self, handler: DroppingQueueHandler, listener: logging.handlers.QueueListener):
+        self.handler = handler
+        self.listener = listener
+
+    @property
+    def dropped(self) -> int:
+        """Records dropped because the queue was full."""
+        return self.handler.dropped
+
+    def stop(self) -> None:
+        """Flush queued records and stop the listener thread."""
+        self.listener.stop()
+
+
+def setup_logging(
+    log_format: str = "json",
+    level: str = "INFO",
+    max_field_chars: int = 2000,
+    sample_rates: Optional[dict[str, float]] = None,
+    queue_size: int = 10000,
+    stream=None,
+) -> LoggingPipeline:
+    """Route the ``ghook`` logger through a bounded queue to a background writer.
+
+    Args:
+        log_format: "json" for one JSON object per line, "banner" for the console banner
+        level: Minimum log level name
+        max_field_chars: String fields longer than this are truncated (0 disables)
+        sample_rates: Fraction of records to keep per event name
+        queue_size: Maximum records waiting to be written before new ones are dropped
+        stream: Output stream (default: stdout)
+
+    Returns:
+        The running pipeline; call stop() on shutdown to flush it
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if log_format == "json":
+        formatter = JsonFormatter(max_field_chars)
+    elif log_format == "banner":
+        formatter = BannerFormatter(max_field_chars)
+    else:
+        raise ValueError(f"Unknown log format: {log_format}")
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(formatter)
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level.upper())
+    logger.handlers = [handler]
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    listener.start()
+    return LoggingPipeline(handler, listener)
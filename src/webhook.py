@@ -8,51 +8,308 @@
 # ]
 # ///
 
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import BackgroundTasks, FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse, Response
 import uvicorn
+import argparse
+import asyncio
 import hmac
 import hashlib
-import json
+import logging
 import os
-import subprocess
 import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
+from clone_cache import CloneCache
+from clone_pool import CloneJob, ClonePool
+from clone_strategy import CloneStrategies, CloneStrategy, parse_paths
+from repo_mirror import GitError, RepoMirrors
+from runner import CommandResult, CommandRunner
+from delivery_dedup import DeliveryDedupCache
+from event_router import EventRouter, Route
+from fetch_scheduler import FetchScheduler
+from file_lock import FileLock
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Registry, render_families
+from payload import UNKNOWN, parse_payload, peek_action, select_backend
+from signing import WebhookKeyring
+from structured_logging import log_event, parse_sample_rates, setup_logging
+from event_queue import EventQueue, PermanentEventError, QueueConsumer, QueuedEvent
+from worker_state import WorkerState
+
 # Load environment variables from .env file
 load_dotenv()
 
-app = FastAPI()
-
-# GitHub webhook secret from environment
-WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
-if not WEBHOOK_SECRET:
+# GitHub webhook secrets from environment; extra secrets allow rotation
+WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+WEBHOOK_SECRETS = [secret.strip() for secret in os.getenv("GITHUB_WEBHOOK_SECRETS", "").split(",")]
+WEBHOOK_SECRETS_FILE = os.getenv("GITHUB_WEBHOOK_SECRETS_FILE", "")
+WEBHOOK_SECRETS_RELOAD_SECONDS = float(os.getenv("GITHUB_WEBHOOK_SECRETS_RELOAD_SECONDS", "5"))
+if not WEBHOOK_SECRET and not WEBHOOK_SECRETS_FILE and not any(WEBHOOK_SECRETS):
     raise ValueError("GITHUB_WEBHOOK_SECRET environment variable is not set. Please create a .env file with this variable.")
 
+# HMAC keys are encoded once when loaded rather than per request
+keyring = WebhookKeyring(
+    [WEBHOOK_SECRET] + WEBHOOK_SECRETS,
+    secrets_file=Path(WEBHOOK_SECRETS_FILE) if WEBHOOK_SECRETS_FILE else None,
+    reload_interval=WEBHOOK_SECRETS_RELOAD_SECONDS
+)
+
+# Server configuration; several workers share dedup and clone state through local files
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "1"))
+
+
+def shared_path(variable: str, default: str, workers: int) -> str:
+    """Return the path of a database shared by worker processes.
+    
+    Args:
+        variable: Environment variable that overrides the path
+        default: Path used when there is more than one worker
+        workers: Number of worker processes
+        
+    Returns:
+        The configured path, the default with several workers, or "" (not shared)
+    """
+    return os.getenv(variable, "") or (default if workers > 1 else "")
+
+
+# Largest accepted request body; GitHub caps webhook payloads at 25 MB
+WEBHOOK_MAX_BODY_BYTES = int(os.getenv("WEBHOOK_MAX_BODY_BYTES", str(25 * 1024 * 1024)))
+
 # Repository cloning configuration
 CLONE_REPOS = os.getenv("CLONE_REPOS", "false").lower() == "true"
 CLONE_BASE_DIR = Path(os.getenv("CLONE_BASE_DIR", "./repos"))
 CLONE_UPDATE_EXISTING = os.getenv("CLONE_UPDATE_EXISTING", "false").lower() == "true"
+# "checkout" keeps one working copy per repository; "mirror" keeps a bare mirror
+# per repository plus a worktree per issue
+CLONE_LAYOUT = os.getenv("CLONE_LAYOUT", "checkout")
+if CLONE_LAYOUT not in ("checkout", "mirror"):
+    raise ValueError(f"CLONE_LAYOUT must be 'checkout' or 'mirror', not {CLONE_LAYOUT!r}")
+CLONE_WORKTREE_MAX_AGE_SECONDS = float(os.getenv("CLONE_WORKTREE_MAX_AGE_SECONDS", str(7 * 86400)))
+CLONE_MAX_WORKERS = int(os.getenv("CLONE_MAX_WORKERS", "2"))
+CLONE_FRESHNESS_SECONDS = float(os.getenv("CLONE_FRESHNESS_SECONDS", "30"))
+GH_CLI_CHECK_TTL_SECONDS = float(os.getenv("GH_CLI_CHECK_TTL_SECONDS", "300"))
+# Clone strategy applied to every repository unless CLONE_STRATEGIES_FILE overrides it
+CLONE_DEPTH = int(os.getenv("CLONE_DEPTH", "0"))
+CLONE_FILTER = os.getenv("CLONE_FILTER", "")
+CLONE_SPARSE_PATHS = parse_paths(os.getenv("CLONE_SPARSE_PATHS", ""))
+CLONE_REFERENCE = os.getenv("CLONE_REFERENCE", "")
+CLONE_STRATEGIES_FILE = os.getenv("CLONE_STRATEGIES_FILE", "")
+# Background fetch scheduler; keeps repositories with recent events fresh so the
+# clone job for an event does not have to pull
+FETCH_SCHEDULER_ENABLED = os.getenv("FETCH_SCHEDULER_ENABLED", "false").lower() == "true"
+FETCH_MIN_INTERVAL_SECONDS = float(os.getenv("FETCH_MIN_INTERVAL_SECONDS", "60"))
+FETCH_MAX_INTERVAL_SECONDS = float(os.getenv("FETCH_MAX_INTERVAL_SECONDS", "3600"))
+FETCH_JITTER = float(os.getenv("FETCH_JITTER", "0.2"))
+FETCH_MAX_CONCURRENCY = int(os.getenv("FETCH_MAX_CONCURRENCY", "2"))
+FETCH_IDLE_SECONDS = float(os.getenv("FETCH_IDLE_SECONDS", "86400"))
+
+# Disk quota for CLONE_BASE_DIR; least recently used repositories are evicted (0 disables a limit)
+CLONE_CACHE_MAX_BYTES = int(os.getenv("CLONE_CACHE_MAX_BYTES", "0"))
+CLONE_CACHE_MAX_REPOS = int(os.getenv("CLONE_CACHE_MAX_REPOS", "0"))
+CLONE_CACHE_INDEX = Path(os.getenv("CLONE_CACHE_INDEX", "") or CLONE_BASE_DIR / ".cache-index.db")
+CLONE_LOCK_DIR = Path(os.getenv("CLONE_LOCK_DIR", "") or CLONE_BASE_DIR / ".locks")
+CLONE_LOCK_TIMEOUT_SECONDS = float(os.getenv("CLONE_LOCK_TIMEOUT_SECONDS", "600"))
+CLONE_DRAIN_TIMEOUT_SECONDS = float(os.getenv("CLONE_DRAIN_TIMEOUT_SECONDS", "30"))
+
+# Durable event queue configuration
+EVENT_QUEUE_ENABLED = os.getenv("EVENT_QUEUE_ENABLED", "false").lower() == "true"
+EVENT_QUEUE_PATH = Path(os.getenv("EVENT_QUEUE_PATH", "./data/events.db"))
+EVENT_QUEUE_MAX_ATTEMPTS = int(os.getenv("EVENT_QUEUE_MAX_ATTEMPTS", "5"))
+EVENT_QUEUE_RETENTION_SECONDS = float(os.getenv("EVENT_QUEUE_RETENTION_SECONDS", "86400"))
+
+# Structured logging configuration
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))
+LOG_SAMPLE_RATES = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+logger = logging.getLogger("ghook.webhook")
 
+# Full payload parses use orjson when installed unless overridden
+JSON_BACKEND, json_loads = select_backend(os.getenv("WEBHOOK_JSON_BACKEND", "auto"))
 
-def is_gh_cli_available() -> bool:
+# Delivery deduplication configuration
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "10000"))
+DEDUP_MAX_AGE_SECONDS = float(os.getenv("DEDUP_MAX_AGE_SECONDS", "86400"))
+# Workers can only see each other's delivery ids through a shared database
+DEDUP_PATH = shared_path("DEDUP_PATH", "./data/deliveries.db", WEBHOOK_WORKERS)
+
+# Clone jobs, metrics and health of each worker are shared through a database so
+# any worker can answer /clone/{job_id}, /metrics and /health for all of them
+WORKER_STATE_PATH = shared_path("WORKER_STATE_PATH", "./data/workers.db", WEBHOOK_WORKERS)
+WORKER_STATE_INTERVAL_SECONDS = float(os.getenv("WORKER_STATE_INTERVAL_SECONDS", "5"))
+
+worker_state = WorkerState(
+    Path(WORKER_STATE_PATH),
+    max_age_seconds=3 * WORKER_STATE_INTERVAL_SECONDS
+) if WORKER_STATE_PATH else None
+# Clone job writes run in order on a single thread, off the event loop
+worker_state_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="worker-state") if worker_state else None
+
+# Prometheus metrics; label children used on the request path are created once here.
+# Each worker labels its samples with its pid so /metrics can report them side by side.
+metrics = Registry(const_labels={"pid": os.getpid()} if WEBHOOK_WORKERS > 1 else None)
+webhook_requests = metrics.counter(
+    "ghook_webhook_requests_total",
+    "Webhook deliveries by event, action and HTTP status.",
+    ("event", "action", "status")
+)
+signature_failures = metrics.counter(
+    "ghook_signature_failures_total",
+    "Deliveries rejected for a missing, malformed or mismatched signature.",
+    ("reason",)
+)
+phase_duration = metrics.histogram(
+    "ghook_phase_duration_seconds",
+    "Time spent in each phase of handling a delivery.",
+    ("phase",)
+)
+clone_results = metrics.counter(
+    "ghook_clone_results_total",
+    "Finished clone jobs by outcome.",
+    ("status",)
+)
+clone_cache_evictions = metrics.counter(
+    "ghook_clone_cache_evictions_total",
+    "Repositories deleted from the clone directory to stay within its quota."
+)
+command_duration = metrics.histogram(
+    "ghook_command_duration_seconds",
+    "Time taken by gh and git commands.",
+    ("program",)
+)
+command_timeouts = metrics.counter(
+    "ghook_command_timeouts_total",
+    "gh and git commands killed after their timeout.",
+    ("program",)
+)
+MALFORMED_SIGNATURES = signature_failures.labels("malformed")
+MISMATCHED_SIGNATURES = signature_failures.labels("mismatch")
+VERIFY_SECONDS = phase_duration.labels("verify")
+PARSE_SECONDS = phase_duration.labels("parse")
+HANDLER_SECONDS = phase_duration.labels("handler")
+CLONE_SECONDS = phase_duration.labels("clone")
+for clone_status in ("cloned", "exists", "updated", "error"):
+    clone_results.labels(clone_status)
+
+
+def observe_command(result: CommandResult) -> None:
+    """Record the duration of a finished gh or git command, and log it if it timed out."""
+    program = Path(result.command[0]).name
+    command_duration.labels(program).observe(result.duration)
+    if result.timed_out:
+        command_timeouts.labels(program).inc()
+        log_event(
+            logger,
+            "command timed out",
+            level=logging.WARNING,
+            event="command",
+            program=program,
+            duration=round(result.duration, 3)
+        )
+
+
+# Runs every gh/git command on the event loop; no thread waits on a child process
+command_runner = CommandRunner(on_finish=observe_command)
+
+
+async def is_gh_cli_available() -> bool:
     """Check if the gh CLI is installed and available.
     
     Returns:
         True if gh CLI is available, False otherwise
     """
     try:
-        result = subprocess.run(
-            ["gh", "--version"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return result.returncode == 0
-    except (subprocess.SubprocessError, FileNotFoundError):
+        result = await command_runner.run(["gh", "--version"], timeout=5)
+        return result.ok
+    except OSError:
         return False
 
 
+class GhCliStatus:
+    """Caches the result of is_gh_cli_available() for a limited time.
+    
+    Once the cached value is older than the TTL it is still returned, but a
+    background task re-probes gh so callers never wait on the subprocess
+    after the first check.
+    """
+    
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.available: Optional[bool] = None
+        self.checked_at: Optional[float] = None
+        self._checked_monotonic = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    async def refresh(self) -> bool:
+        """Probe gh and update the cache.
+        
+        Returns:
+            True if gh CLI is available, False otherwise
+        """
+        available = await is_gh_cli_available()
+        self.available = available
+        self.checked_at = time.time()
+        self._checked_monotonic = time.monotonic()
+        return available
+    
+    async def is_available(self) -> bool:
+        """Return the cached availability, probing only if gh was never checked.
+        
+        Returns:
+            True if gh CLI is available, False otherwise
+        """
+        if self.available is None:
+            return await self.refresh()
+        if self.is_stale():
+            self.refresh_in_background()
+        return self.available
+    
+    def is_stale(self) -> bool:
+        """Check whether the cached value is older than the TTL."""
+        return time.monotonic() - self._checked_monotonic > self.ttl_seconds
+    
+    def refresh_in_background(self) -> None:
+        """Start a re-probe on the running event loop unless one is already running."""
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.get_running_loop().create_task(self.refresh())
+    
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the cached probe."""
+        return {
+            "available": self.available,
+            "checked_at": self.checked_at,
+            "stale": self.available is None or self.is_stale(),
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+gh_cli_status = GhCliStatus(GH_CLI_CHECK_TTL_SECONDS)
+
+
+default_clone_strategy = CloneStrategy(
+    depth=CLONE_DEPTH,
+    filter=CLONE_FILTER,
+    sparse_paths=CLONE_SPARSE_PATHS,
+    reference=CLONE_REFERENCE
+)
+clone_strategies = (
+    CloneStrategies.from_file(Path(CLONE_STRATEGIES_FILE), default_clone_strategy)
+    if CLONE_STRATEGIES_FILE
+    else CloneStrategies(default_clone_strategy)
+)
+repo_mirrors = RepoMirrors(CLONE_BASE_DIR, runner=command_runner)
+
+
 def sanitize_path_component(component: str) -> str:
     """Sanitize a path component to prevent path traversal attacks.
     
@@ -79,7 +336,7 @@ def sanitize_path_component(component: str) -> str:
     return component
 
 
-def clone_repository(full_name: str, owner: str, repo_name: str) -> dict:
+async def clone_repository(full_name: str, owner: str, repo_name: str) -> dict:
     """Clone a GitHub repository using the gh CLI.
     
     Args:
@@ -97,171 +354,889 @@ def clone_repository(full_name: str, owner: str, repo_name: str) -> dict:
     except ValueError as e:
         return {"status": "error", "message": f"Invalid repository path: {e}"}
     
-    # Check if gh CLI is available
-    if not is_gh_cli_available():
+    # Check if gh CLI is available (cached, see GhCliStatus)
+    if not await gh_cli_status.is_available():
         return {"status": "error", "message": "gh CLI is not installed or not available"}
     
     # Build target path
     target_path = CLONE_BASE_DIR / safe_owner / safe_repo
+    strategy = clone_strategies.for_repository(f"{safe_owner}/{safe_repo}")
+    
+    # Serialise work on the same repository across worker processes; a worker
+    # that waited finds the repository already cloned
+    lock = repository_lock(safe_owner, safe_repo)
+    if not await lock.acquire_async(timeout=CLONE_LOCK_TIMEOUT_SECONDS):
+        return {"status": "error", "message": f"Timed out waiting for another worker to finish with {full_name}"}
+    try:
+        # Repositories kept fresh by the fetch scheduler are not fetched again here
+        fresh = fetched_recently(safe_owner, safe_repo)
+        if CLONE_LAYOUT == "mirror":
+            mirror_path = repo_mirrors.mirror_path(safe_owner, safe_repo)
+            if fresh:
+                result = {"status": "exists", "path": str(mirror_path)}
+            else:
+                result = await repo_mirrors.sync(full_name, safe_owner, safe_repo, strategy)
+            if result["status"] != "error":
+                await repo_mirrors.gc(safe_owner, safe_repo, CLONE_WORKTREE_MAX_AGE_SECONDS)
+        else:
+            result = await clone_or_update(full_name, target_path, strategy, update=CLONE_UPDATE_EXISTING and not fresh)
+        if result["status"] != "error":
+            await asyncio.to_thread(track_disk_usage, safe_owner, safe_repo, measure=result["status"] in ("cloned", "updated"))
+        return result
+    finally:
+        lock.release()
+
+
+def track_disk_usage(safe_owner: str, safe_repo: str, measure: bool = True) -> None:
+    """Record a repository's use in the clone cache index and evict others if over quota.
+    
+    Must be called while holding the repository's lock.
     
+    Args:
+        safe_owner: Sanitized owner directory name
+        safe_repo: Sanitized repository directory name
+        measure: Walk the repository to update its size; without it only the
+            last access time is bumped, unless the repository is not indexed yet
+    """
+    if clone_cache is None:
+        return
+    if not measure and clone_cache.touch(safe_owner, safe_repo):
+        # Same size as last recorded, so the quota cannot have been crossed
+        return
+    if CLONE_LAYOUT == "mirror":
+        paths = [repo_mirrors.mirror_path(safe_owner, safe_repo), CLONE_BASE_DIR / safe_owner / safe_repo]
+    else:
+        paths = [CLONE_BASE_DIR / safe_owner / safe_repo]
+    clone_cache.record(safe_owner, safe_repo, paths)
+    for entry in clone_cache.enforce(keep=f"{safe_owner}/{safe_repo}"):
+        clone_cache_evictions.inc()
+        log_event(
+            logger,
+            "evicted cached repository",
+            event="clone_cache",
+            repository=entry.key,
+            size_bytes=entry.size_bytes,
+            last_access=entry.last_access
+        )
+
+
+def repository_git_dir(safe_owner: str, safe_repo: str) -> Path:
+    """Return the git directory of a repository's clone (its mirror with CLONE_LAYOUT=mirror)."""
+    if CLONE_LAYOUT == "mirror":
+        return repo_mirrors.mirror_path(safe_owner, safe_repo)
+    return CLONE_BASE_DIR / safe_owner / safe_repo / ".git"
+
+
+def last_fetched_at(safe_owner: str, safe_repo: str) -> Optional[float]:
+    """When a repository's clone was last fetched (or created), read from git's own files.
+    
+    Uses file modification times, so fetches by other worker processes count too.
+    """
+    git_dir = repository_git_dir(safe_owner, safe_repo)
+    for name in ("FETCH_HEAD", "HEAD"):
+        try:
+            return (git_dir / name).stat().st_mtime
+        except OSError:
+            continue
+    return None
+
+
+def fetched_recently(safe_owner: str, safe_repo: str) -> bool:
+    """Check whether a repository was fetched within its own fetch interval.
+    
+    Only FETCH_HEAD counts: HEAD also changes on clones, checkouts and commits,
+    which say nothing about how current the clone is. The interval is the one
+    the fetch scheduler uses for the repository, or FETCH_MIN_INTERVAL_SECONDS
+    if it is not scheduled yet.
+    """
+    if fetch_scheduler is None:
+        return False
+    try:
+        fetched_at = (repository_git_dir(safe_owner, safe_repo) / "FETCH_HEAD").stat().st_mtime
+    except OSError:
+        return False
+    return time.time() - fetched_at < fetch_scheduler.fetch_interval(safe_owner, safe_repo)
+
+
+async def refresh_repository(full_name: str, owner: str, repo_name: str) -> dict:
+    """Fetch updates for an already cloned repository (used by the fetch scheduler).
+    
+    Args:
+        full_name: The full repository name (e.g., "owner/repo")
+        owner: The repository owner username
+        repo_name: The repository name
+        
+    Returns:
+        Dict with status "updated", "skipped" (not cloned, or busy), or "error"
+    """
+    try:
+        safe_owner = sanitize_path_component(owner)
+        safe_repo = sanitize_path_component(repo_name)
+    except ValueError as e:
+        return {"status": "error", "message": f"Invalid repository path: {e}"}
+    
+    strategy = clone_strategies.for_repository(f"{safe_owner}/{safe_repo}")
+    lock = repository_lock(safe_owner, safe_repo)
+    if not lock.acquire(blocking=False):
+        # A clone job or another worker is already working on it
+        return {"status": "skipped"}
+    try:
+        if last_fetched_at(safe_owner, safe_repo) is None:
+            # Evicted or never cloned; the next event clones it again
+            return {"status": "skipped"}
+        if CLONE_LAYOUT == "mirror":
+            result = await repo_mirrors.sync(full_name, safe_owner, safe_repo, strategy)
+        else:
+            result = await pull_checkout(CLONE_BASE_DIR / safe_owner / safe_repo, strategy)
+        if result["status"] != "error":
+            await asyncio.to_thread(track_disk_usage, safe_owner, safe_repo)
+        return result
+    finally:
+        lock.release()
+
+
+def repository_lock(safe_owner: str, safe_repo: str) -> FileLock:
+    """Return the cross-process lock guarding a repository's clone directory."""
+    return FileLock(CLONE_LOCK_DIR / safe_owner / f"{safe_repo}.lock")
+
+
+async def checkout_worktree(owner: str, repo_name: str, name: str) -> dict:
+    """Create (or reuse) a worktree of a repository's mirror.
+    
+    Args:
+        owner: The repository owner username
+        repo_name: The repository name
+        name: Worktree directory name, e.g. "issue-42"
+        
+    Returns:
+        Dict with status "ready" and the worktree path, or an error
+    """
+    try:
+        safe_owner = sanitize_path_component(owner)
+        safe_repo = sanitize_path_component(repo_name)
+        safe_name = sanitize_path_component(name)
+    except ValueError as e:
+        return {"status": "error", "message": f"Invalid worktree path: {e}"}
+    
+    strategy = clone_strategies.for_repository(f"{safe_owner}/{safe_repo}")
+    lock = repository_lock(safe_owner, safe_repo)
+    if not await lock.acquire_async(timeout=CLONE_LOCK_TIMEOUT_SECONDS):
+        return {"status": "error", "message": f"Timed out waiting for another worker to finish with {owner}/{repo_name}"}
+    try:
+        path = await repo_mirrors.add_worktree(safe_owner, safe_repo, safe_name, sparse_paths=strategy.sparse_paths)
+        await asyncio.to_thread(track_disk_usage, safe_owner, safe_repo)
+    except GitError as e:
+        return {"status": "error", "message": f"Worktree checkout failed: {e}"}
+    finally:
+        lock.release()
+    return {"status": "ready", "path": str(path)}
+
+
+clone_cache = CloneCache(
+    CLONE_BASE_DIR,
+    CLONE_CACHE_INDEX,
+    max_bytes=CLONE_CACHE_MAX_BYTES,
+    max_repos=CLONE_CACHE_MAX_REPOS,
+    lock_for=repository_lock
+) if CLONE_CACHE_MAX_BYTES or CLONE_CACHE_MAX_REPOS else None
+
+
+fetch_scheduler = FetchScheduler(
+    refresh_repository,
+    max_concurrency=FETCH_MAX_CONCURRENCY,
+    min_interval=FETCH_MIN_INTERVAL_SECONDS,
+    max_interval=FETCH_MAX_INTERVAL_SECONDS,
+    jitter=FETCH_JITTER,
+    idle_after=FETCH_IDLE_SECONDS,
+    last_fetched=last_fetched_at
+) if FETCH_SCHEDULER_ENABLED and CLONE_REPOS else None
+
+
+# Worktree checkouts waiting on their clone job, by clone job id
+worktree_tasks: dict[str, asyncio.Task] = {}
+
+
+async def prepare_issue_worktree(job: CloneJob, owner: str, repo_name: str, name: str) -> dict:
+    """Wait for the mirror sync, then check out the issue's worktree."""
+    clone_result = await job.wait()
+    if clone_result["status"] == "error":
+        return {"status": "error", "message": "Mirror sync failed"}
+    
+    result = await checkout_worktree(owner, repo_name, name)
+    log_event(
+        logger,
+        "worktree ready" if result["status"] == "ready" else "worktree checkout failed",
+        level=logging.ERROR if result["status"] == "error" else logging.INFO,
+        event="worktree",
+        repository=job.full_name,
+        worktree=name,
+        path=result.get("path"),
+        message=result.get("message")
+    )
+    return result
+
+
+def schedule_issue_worktree(job: CloneJob, owner: str, repo_name: str, name: str) -> None:
+    """Start preparing an issue worktree in the background once its clone job finishes."""
+    task = asyncio.get_running_loop().create_task(prepare_issue_worktree(job, owner, repo_name, name))
+    worktree_tasks[job.job_id] = task
+    task.add_done_callback(lambda _: worktree_tasks.pop(job.job_id, None))
+
+
+async def pull_checkout(target_path: Path, strategy: CloneStrategy) -> dict:
+    """Pull updates into an existing working copy.
+    
+    Args:
+        target_path: Sanitized clone location
+        strategy: Clone strategy whose depth the pull keeps
+        
+    Returns:
+        Dict with status "updated" and the path, or an error
+    """
+    try:
+        result = await command_runner.run(
+            ["git", "-C", str(target_path), "pull", *strategy.fetch_args()],
+            timeout=60
+        )
+    except OSError as e:
+        return {"status": "error", "message": f"Failed to pull updates: {e}"}
+    if result.ok:
+        return {"status": "updated", "path": str(target_path)}
+    return {"status": "error", "message": f"Failed to pull updates: {result.error_message()}"}
+
+
+async def clone_or_update(full_name: str, target_path: Path, strategy: CloneStrategy, update: bool = False) -> dict:
+    """Clone a repository into target_path, or report or update an existing clone.
+    
+    Args:
+        full_name: The full repository name (e.g., "owner/repo")
+        target_path: Sanitized clone location
+        strategy: Shallow, partial, sparse or reference options for the clone
+        update: Pull an existing clone instead of leaving it as it is
+        
+    Returns:
+        Dict with status and message about the clone operation
+    """
     # Check if repository already exists
     if target_path.exists() and (target_path / ".git").exists():
-        if CLONE_UPDATE_EXISTING:
-            # Pull updates
-            try:
-                result = subprocess.run(
-                    ["git", "-C", str(target_path), "pull"],
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
-                if result.returncode == 0:
-                    return {"status": "updated", "path": str(target_path)}
-                else:
-                    return {"status": "error", "message": f"Failed to pull updates: {result.stderr}"}
-            except subprocess.SubprocessError as e:
-                return {"status": "error", "message": f"Failed to pull updates: {e}"}
-        else:
-            return {"status": "exists", "path": str(target_path)}
+        if update:
+            return await pull_checkout(target_path, strategy)
+        return {"status": "exists", "path": str(target_path)}
     
     # Create parent directory
     target_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Clone the repository
+    # Clone the repository; gh passes options after "--" through to git clone
+    clone_args = strategy.clone_args()
     try:
-        result = subprocess.run(
-            ["gh", "repo", "clone", full_name, str(target_path)],
-            capture_output=True,
-            text=True,
+        result = await command_runner.run(
+            ["gh", "repo", "clone", full_name, str(target_path), *(["--", *clone_args] if clone_args else [])],
             timeout=120
         )
+        if not result.ok:
+            return {"status": "error", "message": f"Clone failed: {result.error_message()}"}
         
-        if result.returncode == 0:
-            return {"status": "cloned", "path": str(target_path)}
-        else:
-            return {"status": "error", "message": f"Clone failed: {result.stderr}"}
-    except subprocess.SubprocessError as e:
+        # A sparse clone starts with only top-level files checked out
+        if strategy.sparse_paths:
+            result = await command_runner.run(
+                ["git", "-C", str(target_path), "sparse-checkout", "set", "--", *strategy.sparse_paths],
+                timeout=120
+            )
+            if not result.ok:
+                return {"status": "error", "message": f"Sparse checkout failed: {result.error_message()}"}
+    except OSError as e:
         return {"status": "error", "message": f"Clone failed: {e}"}
+    
+    clone_result = {"status": "cloned", "path": str(target_path)}
+    if not strategy.is_full:
+        clone_result["strategy"] = strategy.to_dict()
+    return clone_result
 
 
-def verify_signature(payload_body: bytes, signature_header: str) -> bool:
-    """Verify that the payload was sent from GitHub by validating SHA256.
+def report_clone_result(job: CloneJob) -> None:
+    """Log the outcome of a finished clone job."""
+    clone_result = job.result
+    clone_results.labels(clone_result["status"]).inc()
+    if job.origin == "executed" and job.started_at:
+        CLONE_SECONDS.observe(job.finished_at - job.started_at)
+    log_event(
+        logger,
+        "clone finished",
+        level=logging.ERROR if clone_result["status"] == "error" else logging.INFO,
+        kind="clone_result",
+        event="clone",
+        job_id=job.job_id,
+        repository=job.full_name,
+        origin=job.origin,
+        status=clone_result["status"],
+        path=clone_result.get("path"),
+        message=clone_result.get("message"),
+        duration=round(job.finished_at - job.started_at, 3) if job.started_at else None
+    )
+
+
+def save_shared_clone_job(job: dict) -> None:
+    """Write a clone job to the shared worker state; runs on the worker state thread."""
+    try:
+        worker_state.save_job(job)
+    except sqlite3.Error as e:
+        log_event(logger, "clone job not shared", level=logging.WARNING, job_id=job["job_id"], error=str(e))
+
+
+def share_clone_job(job: CloneJob) -> None:
+    """Queue a write of a clone job's current state for the other workers."""
+    worker_state_writer.submit(save_shared_clone_job, job.to_dict())
+
+
+async def flush_shared_clone_jobs() -> None:
+    """Wait until every queued clone job write has reached the shared worker state."""
+    if worker_state_writer:
+        # The writer is a single thread, so this runs after every write queued before it
+        await asyncio.wrap_future(worker_state_writer.submit(lambda: None))
+
+
+clone_pool = ClonePool(
+    clone_repository,
+    max_workers=CLONE_MAX_WORKERS,
+    freshness_seconds=CLONE_FRESHNESS_SECONDS,
+    on_complete=report_clone_result,
+    on_update=share_clone_job if worker_state else None
+)
+
+
+router = EventRouter()
+
+
+@router.on("issues", "opened", fields=("issue", "repository"))
+def handle_issue_opened(payload: dict) -> dict:
+    """Log an opened issue and queue a clone of its repository if enabled.
     
     Args:
-        payload_body: The raw request body bytes
-        signature_header: The X-Hub-Signature-256 header value
+        payload: The parsed issues webhook payload
         
     Returns:
-        True if signature is valid, False otherwise
+        Response body describing the issue's repository and any clone job
     """
-    if not signature_header:
-        return False
+    issue = payload.get("issue", {})
+    repository = payload.get("repository", {})
     
-    # Get the signature from the header (format: sha256=...)
-    hash_algorithm, github_signature = signature_header.split('=')
-    if hash_algorithm != 'sha256':
-        return False
+    # Extract repository information
+    repo_full_name = repository.get("full_name", "")
+    repo_name = repository.get("name", "")
+    repo_owner = repository.get("owner", {}).get("login", "")
+    repo_url = repository.get("html_url", "")
+    repo_private = repository.get("private", False)
+    
+    # Queue a clone job if enabled; the result is reported when it finishes
+    clone_job = None
+    worktree_name = None
+    if CLONE_REPOS and repo_full_name:
+        clone_job = clone_pool.submit(repo_full_name, repo_owner, repo_name)
+        if fetch_scheduler:
+            fetch_scheduler.record_event(repo_full_name, repo_owner, repo_name)
+        if CLONE_LAYOUT == "mirror" and isinstance(issue.get("number"), int):
+            # Each issue gets its own checkout, so concurrent issues never share a working copy
+            worktree_name = f"issue-{issue['number']}"
+            schedule_issue_worktree(clone_job, repo_owner, repo_name, worktree_name)
     
-    # Create our own signature
-    mac = hmac.new(WEBHOOK_SECRET.encode(), msg=payload_body, digestmod=hashlib.sha256)
-    expected_signature = mac.hexdigest()
+    log_event(
+        logger,
+        "issue opened",
+        kind="issue_opened",
+        event="issues.opened",
+        repository=repo_full_name,
+        owner=repo_owner,
+        private=repo_private,
+        repo_url=repo_url,
+        title=issue.get("title"),
+        number=issue.get("number"),
+        author=issue.get("user", {}).get("login"),
+        state=issue.get("state"),
+        issue_url=issue.get("html_url"),
+        created_at=issue.get("created_at"),
+        issue_body=issue.get("body", "No description provided"),
+        clone_job_id=clone_job.job_id if clone_job else None
+    )
     
-    # Compare signatures
-    return hmac.compare_digest(expected_signature, github_signature)
+    response = {
+        "status": "success",
+        "message": "Issue information logged",
+        "repository": {
+            "full_name": repo_full_name,
+            "owner": repo_owner,
+            "private": repo_private,
+            "url": repo_url
+        }
+    }
+    
+    if clone_job:
+        response["clone"] = clone_job.to_dict()
+    if worktree_name:
+        response["worktree"] = worktree_name
+    
+    return response
 
 
-@app.post("/webhook")
-async def github_webhook(request: Request):
-    """Handle GitHub webhook events."""
-    # Get the signature from headers
-    signature_header = request.headers.get("X-Hub-Signature-256")
+def route_event(event_type: Optional[str], body: bytes) -> tuple[Optional[Route], Optional[dict]]:
+    """Find the handler for a delivery and parse only what it needs.
     
-    # Get raw body for signature verification
-    body = await request.body()
+    Routing is decided from the X-GitHub-Event header and the payload's
+    action, read without a full parse, so deliveries nobody handles are
+    never parsed.
     
-    # Verify the signature
-    if not verify_signature(body, signature_header):
-        raise HTTPException(status_code=401, detail="Invalid signature")
+    Args:
+        event_type: The X-GitHub-Event header value
+        body: The raw, verified request body
+        
+    Returns:
+        Tuple of the matching route and its payload, or (None, None) if unhandled
+        
+    Raises:
+        ValueError: If the body is not valid JSON
+    """
+    if not router.handles(event_type):
+        return None, None
     
-    # Get the event type from headers
-    event_type = request.headers.get("X-GitHub-Event")
+    started = time.perf_counter()
+    try:
+        action = peek_action(body)
+        if action is UNKNOWN:
+            payload = json_loads(body)
+            route = router.resolve(event_type, payload.get("action"))
+            return (route, payload) if route else (None, None)
+        
+        route = router.resolve(event_type, action)
+        if route is None:
+            return None, None
+        return route, parse_payload(body, route.fields, json_loads)
+    finally:
+        PARSE_SECONDS.observe(time.perf_counter() - started)
+
+
+async def call_route(route: Route, payload: dict):
+    """Run a route's handler, recording how long it took."""
+    started = time.perf_counter()
+    try:
+        return await route.call(payload)
+    finally:
+        HANDLER_SECONDS.observe(time.perf_counter() - started)
+
+
+async def forget_delivery(delivery_id: Optional[str]) -> None:
+    """Drop a delivery id from the dedup cache so a redelivery of a failed event is processed."""
+    if delivery_cache and delivery_id:
+        await asyncio.to_thread(delivery_cache.forget, delivery_id)
+
+
+async def call_background_route(route: Route, payload: dict, delivery_id: Optional[str]):
+    """Run a background route after the response, forgetting the delivery if it fails."""
+    try:
+        await call_route(route, payload)
+    except Exception:
+        await forget_delivery(delivery_id)
+        raise
+
+
+async def consume_queued_event(event: QueuedEvent) -> None:
+    """Process an event from the durable queue.
     
-    # Parse the JSON payload from the body bytes
-    payload = json.loads(body)
+    The event is only checkpointed once this returns, so it waits for any
+    clone job the event started.
+    """
+    try:
+        route, payload = route_event(event.event_type, event.body)
+    except ValueError as e:
+        raise PermanentEventError(f"Invalid JSON payload: {e}")
     
-    # Handle issue creation events
-    if event_type == "issues" and payload.get("action") == "opened":
-        issue = payload.get("issue", {})
-        repository = payload.get("repository", {})
-        
-        # Extract repository information
-        repo_full_name = repository.get("full_name", "")
-        repo_name = repository.get("name", "")
-        repo_owner = repository.get("owner", {}).get("login", "")
-        repo_url = repository.get("html_url", "")
-        repo_private = repository.get("private", False)
+    if route is None:
+        return
+    
+    # Background handlers run to completion here so the checkpoint covers them
+    response = await call_route(route, payload)
+    
+    clone = response.get("clone") if isinstance(response, dict) else None
+    if clone:
+        job = clone_pool.get(clone["job_id"])
+        if job:
+            await job.wait()
+        worktree_task = worktree_tasks.get(clone["job_id"])
+        if worktree_task:
+            await worktree_task
+
+
+event_queue = EventQueue(EVENT_QUEUE_PATH, max_attempts=EVENT_QUEUE_MAX_ATTEMPTS) if EVENT_QUEUE_ENABLED else None
+event_consumer = QueueConsumer(
+    event_queue,
+    consume_queued_event,
+    retention_seconds=EVENT_QUEUE_RETENTION_SECONDS,
+    lock_path=EVENT_QUEUE_PATH.with_name(f"{EVENT_QUEUE_PATH.name}.consumer.lock")
+) if event_queue else None
+
+
+delivery_cache = DeliveryDedupCache(
+    max_entries=DEDUP_MAX_ENTRIES,
+    max_age_seconds=DEDUP_MAX_AGE_SECONDS,
+    path=Path(DEDUP_PATH) if DEDUP_PATH else None,
+    shared=WEBHOOK_WORKERS > 1
+) if DEDUP_ENABLED else None
+
+
+# Gauges read at scrape time from the components that own the values
+metrics.callback(
+    "ghook_event_queue_depth",
+    "Events waiting in the durable queue.",
+    lambda: event_queue.depth() if event_queue else None
+)
+metrics.callback("ghook_clone_in_flight", "Repositories with a clone or pull queued or running.", lambda: clone_pool.in_flight)
+metrics.callback("ghook_clone_workers_busy", "Clone workers currently running git.", lambda: clone_pool.running)
+metrics.callback("ghook_clone_workers", "Size of the clone worker pool.", lambda: CLONE_MAX_WORKERS)
+metrics.callback(
+    "ghook_background_fetches_total",
+    "Background fetches completed by the fetch scheduler.",
+    lambda: fetch_scheduler.fetches if fetch_scheduler else None,
+    kind="counter"
+)
+metrics.callback(
+    "ghook_background_fetch_failures_total",
+    "Background fetches that failed.",
+    lambda: fetch_scheduler.failures if fetch_scheduler else None,
+    kind="counter"
+)
+metrics.callback(
+    "ghook_clone_cache_bytes",
+    "Bytes used by cached repositories.",
+    lambda: clone_cache.totals()[0] if clone_cache else None
+)
+metrics.callback(
+    "ghook_clone_cache_repositories",
+    "Repositories in the clone cache.",
+    lambda: clone_cache.totals()[1] if clone_cache else None
+)
+metrics.callback(
+    "ghook_duplicate_deliveries_total",
+    "Deliveries answered as duplicates of an earlier delivery id.",
+    lambda: delivery_cache.hits if delivery_cache else None,
+    kind="counter"
+)
+
+
+async def drain_clone_pool() -> None:
+    """Wait for in-flight clones and worktree checkouts, then stop the clone workers.
+    
+    Clones still running after CLONE_DRAIN_TIMEOUT_SECONDS are cancelled, which
+    kills their gh/git process groups.
+    """
+    if clone_pool.in_flight:
+        log_event(logger, "draining clone jobs", in_flight=clone_pool.in_flight)
+    
+    async def drain() -> None:
+        await clone_pool.drain()
+        if worktree_tasks:
+            await asyncio.gather(*worktree_tasks.values(), return_exceptions=True)
+    
+    try:
+        await asyncio.wait_for(drain(), timeout=CLONE_DRAIN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        log_event(
+            logger,
+            "clone jobs still running at shutdown",
+            level=logging.WARNING,
+            in_flight=clone_pool.in_flight
+        )
+        clone_pool.shutdown(wait=False)
+    else:
+        clone_pool.shutdown()
+
+
+async def publish_worker_state() -> None:
+    """Share this worker's metrics and health every WORKER_STATE_INTERVAL_SECONDS."""
+    while True:
+        try:
+            await asyncio.to_thread(worker_state.publish, os.getpid(), metrics.collect(), health_report())
+        except sqlite3.Error as e:
+            log_event(logger, "worker state not published", level=logging.WARNING, error=str(e))
+        await asyncio.sleep(WORKER_STATE_INTERVAL_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the logging pipeline and queue consumer for the lifetime of the server.
+    
+    On shutdown, clones that are already queued or running are given
+    CLONE_DRAIN_TIMEOUT_SECONDS to finish before they are killed.
+    """
+    logging_pipeline = setup_logging(
+        log_format=LOG_FORMAT,
+        level=LOG_LEVEL,
+        max_field_chars=LOG_MAX_FIELD_CHARS,
+        sample_rates=LOG_SAMPLE_RATES
+    )
+    if event_consumer:
+        # Replays anything left pending by a previous run
+        event_consumer.start()
+    if fetch_scheduler:
+        fetch_scheduler.start()
+    publisher = asyncio.get_running_loop().create_task(publish_worker_state()) if worker_state else None
+    yield
+    if publisher:
+        publisher.cancel()
+    if fetch_scheduler:
+        await fetch_scheduler.stop()
+    if event_consumer:
+        await event_consumer.stop()
+        event_queue.close()
+    await drain_clone_pool()
+    if worker_state:
+        # Final clone job updates are written before this worker leaves the shared state
+        clone_pool.on_update = None
+        worker_state_writer.shutdown()
+        worker_state.remove(os.getpid())
+        worker_state.close()
+    if clone_cache:
+        clone_cache.close()
+    if delivery_cache:
+        delivery_cache.close()
+    logging_pipeline.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def parse_signature_header(signature_header: Optional[str]) -> Optional[str]:
+    """Extract the hex digest from an X-Hub-Signature-256 header.
+    
+    Args:
+        signature_header: The header value (format: sha256=<hex digest>)
         
-        print("\n" + "="*60)
-        print("🎉 NEW ISSUE CREATED!")
-        print("="*60)
-        print(f"Repository:  {repo_full_name}")
-        print(f"Owner:       {repo_owner}")
-        print(f"Private:     {repo_private}")
-        print(f"Repo URL:    {repo_url}")
-        print()
-        print("Issue Details:")
-        print(f"Title:       {issue.get('title')}")
-        print(f"Number:      #{issue.get('number')}")
-        print(f"Author:      {issue.get('user', {}).get('login')}")
-        print(f"State:       {issue.get('state')}")
-        print(f"URL:         {issue.get('html_url')}")
-        print(f"Created at:  {issue.get('created_at')}")
-        print(f"\nBody:\n{issue.get('body', 'No description provided')}")
+    Returns:
+        The hex digest, or None if the header is missing or malformed
+    """
+    if not signature_header:
+        return None
+    
+    hash_algorithm, separator, github_signature = signature_header.partition('=')
+    if not separator or hash_algorithm != 'sha256' or len(github_signature) != 64:
+        return None
+    
+    return github_signature
+
+
+async def read_verified_body(request: Request) -> bytes:
+    """Read the request body as a stream while computing its signature.
+    
+    Requests without a well-formed signature are rejected before the body is
+    read, and bodies over WEBHOOK_MAX_BODY_BYTES are rejected as soon as the
+    limit is crossed, so memory per request stays bounded.
+    
+    Args:
+        request: The incoming webhook request
         
-        # Clone repository if enabled
-        clone_result = None
-        if CLONE_REPOS and repo_full_name:
-            print("\nRepository Clone:")
-            clone_result = clone_repository(repo_full_name, repo_owner, repo_name)
-            
-            if clone_result["status"] == "cloned":
-                print(f"✅ Cloned successfully to: {clone_result['path']}")
-            elif clone_result["status"] == "exists":
-                print(f"ℹ️  Repository already exists at: {clone_result['path']}")
-            elif clone_result["status"] == "updated":
-                print(f"🔄 Updated existing repository at: {clone_result['path']}")
-            elif clone_result["status"] == "error":
-                print(f"❌ Clone failed: {clone_result['message']}")
+    Returns:
+        The verified raw body
         
-        print("="*60 + "\n")
+    Raises:
+        HTTPException: 401 for a missing, malformed or wrong signature, 413 for an oversized body
+    """
+    github_signature = parse_signature_header(request.headers.get("X-Hub-Signature-256"))
+    if github_signature is None:
+        MALFORMED_SIGNATURES.inc()
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    
+    content_length = request.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > WEBHOOK_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Payload too large")
+    
+    # Stream through the most recently matched key; other keys are only tried on a mismatch
+    keyring.maybe_reload()
+    preferred_key = keyring.preferred()
+    mac = hmac.new(preferred_key.secret, digestmod=hashlib.sha256)
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > WEBHOOK_MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Payload too large")
+        mac.update(chunk)
+        chunks.append(chunk)
+    body = b"".join(chunks)
+    
+    if hmac.compare_digest(mac.hexdigest(), github_signature):
+        matched_key = preferred_key
+    else:
+        matched_key = keyring.match(body, github_signature, skip=preferred_key)
+        if matched_key is None:
+            MISMATCHED_SIGNATURES.inc()
+            raise HTTPException(status_code=401, detail="Invalid signature")
+    
+    keyring.record_hit(matched_key)
+    return body
+
+
+@app.post("/webhook")
+async def github_webhook(request: Request, background_tasks: BackgroundTasks):
+    """Handle GitHub webhook events."""
+    # Labels for the request counter; event and action are only set once the signature is verified
+    request.state.event = ""
+    request.state.action = ""
+    status_code = 500
+    try:
+        response = await process_webhook(request, background_tasks)
+        status_code = response.status_code if isinstance(response, Response) else 200
+        return response
+    except HTTPException as e:
+        status_code = e.status_code
+        raise
+    finally:
+        webhook_requests.labels(request.state.event, request.state.action, status_code).inc()
+
+
+async def process_webhook(request: Request, background_tasks: BackgroundTasks):
+    """Verify, deduplicate and dispatch a webhook delivery.
+    
+    Args:
+        request: The incoming webhook request
+        background_tasks: Tasks run after the response is sent
         
-        response = {
-            "status": "success",
-            "message": "Issue information printed",
-            "repository": {
-                "full_name": repo_full_name,
-                "owner": repo_owner,
-                "private": repo_private,
-                "url": repo_url
-            }
-        }
+    Returns:
+        The response body, or a JSONResponse for non-200 statuses
+    """
+    # Stream the body through the HMAC and reject bad signatures or oversized bodies
+    started = time.perf_counter()
+    try:
+        body = await read_verified_body(request)
+    finally:
+        VERIFY_SECONDS.observe(time.perf_counter() - started)
+    
+    # Get the event type and delivery id from headers
+    event_type = request.headers.get("X-GitHub-Event")
+    delivery_id = request.headers.get("X-GitHub-Delivery")
+    request.state.event = event_type or ""
+    
+    # Redeliveries of an event we already accepted are answered without processing.
+    # In shared mode this is a SQLite write that can wait on other workers' locks.
+    if delivery_cache and delivery_id and await asyncio.to_thread(delivery_cache.check_and_add, delivery_id):
+        return {"status": "duplicate", "event": event_type, "delivery_id": delivery_id}
+    
+    # With the durable queue enabled, acknowledge as soon as the event is stored
+    if event_queue:
+        try:
+            seq = await asyncio.to_thread(event_queue.append, delivery_id, event_type, body)
+        except Exception:
+            # Not stored: GitHub's redelivery must not be taken for a duplicate
+            await forget_delivery(delivery_id)
+            raise
+        event_consumer.notify()
+        return JSONResponse(
+            status_code=202,
+            content={"status": "queued", "event": event_type, "delivery_id": delivery_id, "seq": seq}
+        )
+    
+    try:
+        # Route on the headers first; the body is only parsed for handled events
+        route, payload = route_event(event_type, body)
+        if route is None:
+            return {"status": "received", "event": event_type}
+        request.state.action = payload.get("action") or ""
         
-        if clone_result:
-            response["clone"] = clone_result
+        if route.mode == "background":
+            background_tasks.add_task(call_background_route, route, payload, delivery_id)
+            return JSONResponse(
+                status_code=202,
+                content={"status": "accepted", "event": event_type, "action": payload.get("action")}
+            )
         
-        return response
+        response = await call_route(route, payload)
+    except Exception:
+        # Let GitHub's redelivery of a failed event through
+        await forget_delivery(delivery_id)
+        raise
+    
+    if "clone" in response:
+        # The job id may be looked up on another worker as soon as it is returned
+        await flush_shared_clone_jobs()
+        return JSONResponse(status_code=202, content=response)
     
-    # Handle other events
-    return {"status": "received", "event": event_type}
+    return response
+
+
+@app.get("/clone/{job_id}")
+async def clone_status(job_id: str):
+    """Report the status and result of a clone job queued by any worker."""
+    job = clone_pool.get(job_id)
+    if job is not None:
+        return job.to_dict()
+    shared_job = await asyncio.to_thread(worker_state.get_job, job_id) if worker_state else None
+    if shared_job is None:
+        raise HTTPException(status_code=404, detail="Unknown clone job")
+    return shared_job
+
+
+def health_report() -> dict:
+    """Describe this worker's health for /health and the shared worker state."""
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "gh_cli": gh_cli_status.to_dict(),
+        "clone": {
+            "enabled": CLONE_REPOS,
+            "in_flight": clone_pool.in_flight,
+            "max_workers": CLONE_MAX_WORKERS,
+            "layout": CLONE_LAYOUT,
+            **({"fetch_scheduler": fetch_scheduler.stats()} if fetch_scheduler else {})
+        },
+        "event_queue": {
+            "enabled": EVENT_QUEUE_ENABLED,
+            **({"consumer_active": event_consumer.active, **event_queue.stats()} if event_queue else {})
+        },
+        "signing_keys": keyring.stats(),
+        "dedup": {
+            "enabled": DEDUP_ENABLED,
+            **(delivery_cache.stats() if delivery_cache else {})
+        }
+    }
+
+
+@app.get("/health")
+async def health():
+    """Report server health, including the cached gh CLI probe.
+    
+    With shared worker state, ``workers`` lists the health of every live worker process.
+    """
+    if gh_cli_status.available is not None and gh_cli_status.is_stale():
+        gh_cli_status.refresh_in_background()
+    report = health_report()
+    if worker_state:
+        peers = await asyncio.to_thread(worker_state.workers, os.getpid())
+        report["workers"] = sorted([dict(report)] + [peer for _, _, peer in peers], key=lambda worker: worker["pid"])
+    return report
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Expose counters, latency histograms and gauges in the Prometheus text format.
+    
+    With shared worker state, the latest samples of every live worker are included,
+    each labelled with its worker's pid.
+    """
+    families = metrics.collect()
+    if worker_state:
+        for _, peer_families, _ in await asyncio.to_thread(worker_state.workers, os.getpid()):
+            families.extend(peer_families)
+    return Response(content=render_families(families), media_type=METRICS_CONTENT_TYPE)
 
 
 def main() -> None:
     """Start the webhook server."""
+    parser = argparse.ArgumentParser(description="GitHub webhook server")
     # Allow port configuration via environment variable for testing
-    port = int(os.getenv("WEBHOOK_PORT", "8080"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("WEBHOOK_PORT", "8080")), help="Port to listen on")
+    parser.add_argument("--host", default=WEBHOOK_HOST, help="Address to bind")
+    parser.add_argument("--workers", type=int, default=WEBHOOK_WORKERS, help="Number of worker processes")
+    args = parser.parse_args()
+    port = args.port
     
     print("🚀 Starting GitHub webhook server...")
-    print(f"📡 Listening on http://0.0.0.0:{port}/webhook")
+    print(f"📡 Listening on http://{args.host}:{port}/webhook")
     print("💡 Configure your GitHub webhook to point to this endpoint")
     
     # Display clone configuration
@@ -269,9 +1244,21 @@ def main() -> None:
         print(f"\n🔄 Repository cloning: ENABLED")
         print(f"📁 Clone directory: {CLONE_BASE_DIR.absolute()}")
         print(f"♻️  Update existing: {CLONE_UPDATE_EXISTING}")
+        if CLONE_LAYOUT == "mirror":
+            print(f"🪞 Layout: bare mirror + worktree per issue (worktrees kept {CLONE_WORKTREE_MAX_AGE_SECONDS:g}s)")
+        print(f"🧵 Clone workers: {CLONE_MAX_WORKERS}")
+        print(f"⏱️  Reuse results for: {CLONE_FRESHNESS_SECONDS:g}s")
+        if not default_clone_strategy.is_full:
+            print(f"🪶 Clone strategy: {' '.join(default_clone_strategy.clone_args())}")
+        if CLONE_STRATEGIES_FILE:
+            print(f"📋 Per-repository strategies: {CLONE_STRATEGIES_FILE}")
+        if fetch_scheduler:
+            print(f"🔁 Background fetches: every {FETCH_MIN_INTERVAL_SECONDS:g}-{FETCH_MAX_INTERVAL_SECONDS:g}s, {FETCH_MAX_CONCURRENCY} at a time")
+        if clone_cache:
+            print(f"💾 Disk quota: {CLONE_CACHE_MAX_BYTES or 'unlimited'} bytes, {CLONE_CACHE_MAX_REPOS or 'unlimited'} repositories")
         
-        # Check gh CLI availability
-        if is_gh_cli_available():
+        # Check gh CLI availability (also warms the cache used by clone jobs)
+        if asyncio.run(gh_cli_status.refresh()):
             print("✅ gh CLI is available")
         else:
             print("⚠️  WARNING: gh CLI is not available - cloning will fail")
@@ -279,9 +1266,36 @@ def main() -> None:
         print("\n⏸️  Repository cloning: DISABLED")
         print("   Set CLONE_REPOS=true in .env to enable")
     
+    print(f"\n🔑 Webhook secrets: {len(keyring.stats())} active")
+    print(f"🧩 JSON backend: {JSON_BACKEND}")
+    
+    if EVENT_QUEUE_ENABLED:
+        print(f"\n📥 Durable event queue: {EVENT_QUEUE_PATH.absolute()}")
+    
+    if args.workers > 1:
+        # The worker count may come from --workers only, so the paths the workers
+        # will use are worked out here rather than taken from this process's settings
+        dedup_path = Path(shared_path("DEDUP_PATH", "./data/deliveries.db", args.workers))
+        worker_state_path = Path(shared_path("WORKER_STATE_PATH", "./data/workers.db", args.workers))
+        print(f"\n👥 Worker processes: {args.workers}")
+        print(f"🗂️  Shared delivery ids: {dedup_path.absolute() if DEDUP_ENABLED else 'dedup disabled'}")
+        print(f"🔒 Clone locks: {CLONE_LOCK_DIR.absolute()}")
+        print(f"📊 Shared clone jobs, metrics and health: {worker_state_path.absolute()}")
+    
     print("\nPress Ctrl+C to stop the server\n")
     
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    if args.workers > 1:
+        # Worker processes import the app by name and read their settings from the environment
+        os.environ["WEBHOOK_WORKERS"] = str(args.workers)
+        uvicorn.run(
+            "webhook:app",
+            host=args.host,
+            port=port,
+            workers=args.workers,
+            app_dir=str(Path(__file__).parent)
+        )
+    else:
+        uvicorn.run(app, host=args.host, port=port)
 
 
 if __name__ == "__main__":
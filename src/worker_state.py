@@ -0,0 +1,123 @@
+"""State shared between webhook worker processes.
+
+With ``--workers N`` every process keeps its own clone jobs, counters and
+health, but requests are spread over the processes by the kernel, so a
+status lookup or a scrape can land on a worker that knows nothing about the
+job or traffic in question. Each worker therefore writes its clone jobs and
+a periodic snapshot of its metrics and health to a SQLite database that all
+of them share, and reads the other workers' entries back when answering.
+
+Snapshots of workers that have exited, or that stopped publishing for
+longer than ``max_age_seconds``, are ignored.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clone_jobs (
+    job_id TEXT PRIMARY KEY,
+    job TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS clone_jobs_updated_at ON clone_jobs (updated_at);
+CREATE TABLE IF NOT EXISTS workers (
+    pid INTEGER PRIMARY KEY,
+    metrics TEXT NOT NULL,
+    health TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists but belongs to another user
+        return True
+    return True
+
+
+class WorkerState:
+    """SQLite store of clone jobs and worker snapshots shared by several processes.
+
+    Args:
+        path: Location of the SQLite database file
+        max_jobs: Number of most recently updated clone jobs kept
+        max_age_seconds: Snapshots older than this are treated as stale
+    """
+
+    def __init__(self, path: Path, max_jobs: int = 1000, max_age_seconds: float = 30):
+        self.path = Path(path)
+        self.max_jobs = max_jobs
+        self.max_age_seconds = max_age_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def save_job(self, job: dict) -> None:
+        """Store the latest state of a clone job (as returned by ``CloneJob.to_dict``)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO clone_jobs (job_id, job, updated_at) VALUES (?, ?, ?)",
+                (job["job_id"], json.dumps(job), time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM clone_jobs WHERE job_id IN "
+                "(SELECT job_id FROM clone_jobs ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_jobs,),
+            )
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Return the stored state of a clone job, or None if no worker has recorded it."""
+        with self._lock:
+            row = self._conn.execute("SELECT job FROM clone_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def publish(self, pid: int, metrics: list, health: dict) -> None:
+        """Replace a worker's snapshot of collected metric families and health."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO workers (pid, metrics, health, updated_at) VALUES (?, ?, ?, ?)",
+                (pid, json.dumps(metrics), json.dumps(health), time.time()),
+            )
+
+    def workers(self, exclude: Optional[int] = None) -> list[tuple[int, list, dict]]:
+        """Return ``(pid, metric families, health)`` for every live worker, ordered by pid.
+
+        Args:
+            exclude: Pid to leave out, normally the caller's own (its live state is fresher)
+        """
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT pid, metrics, health FROM workers WHERE updated_at >= ? ORDER BY pid", (cutoff,)
+            ).fetchall()
+        return [
+            (pid, json.loads(metrics), json.loads(health))
+            for pid, metrics, health in rows
+            if pid != exclude and _process_alive(pid)
+        ]
+
+    def remove(self, pid: int) -> None:
+        """Drop a worker's snapshot, e.g. when it shuts down."""
+        with self._lock:
+            self._conn.execute("DELETE FROM workers WHERE pid = ?", (pid,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -10,33 +10,56 @@
 
 import pytest
 import subprocess
+import sys
 import time
 import os
 import hmac
 import hashlib
 import signal
 import httpx
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Optional
 
+# Make the standalone modules in src/ importable for unit tests
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-@pytest.fixture
-def webhook_server():
-    """Start the webhook server as a subprocess and return its URL."""
+
+@contextmanager
+def run_webhook_server(
+    port: int,
+    extra_env: Optional[dict] = None,
+    args: Optional[list] = None,
+    cwd: Optional[Path] = None
+):
+    """Start the webhook server as a subprocess and yield its connection details.
+    
+    Args:
+        port: Port the server should listen on
+        extra_env: Additional environment variables for the server process
+        args: Command-line arguments for webhook.py
+        cwd: Working directory of the server process (default: the current one)
+        
+    Yields:
+        Dict with the server URL, secret, port and process
+    """
     # Set test environment variables
     test_secret = "test_webhook_secret_12345"
-    test_port = 18080
     
     env = os.environ.copy()
     env["GITHUB_WEBHOOK_SECRET"] = test_secret
-    env["WEBHOOK_PORT"] = str(test_port)
+    env["WEBHOOK_PORT"] = str(port)
+    if extra_env:
+        env.update(extra_env)
     
     # Path to webhook.py
     webhook_path = Path(__file__).parent.parent / "src" / "webhook.py"
     
     # Start the server with modified port using uv run
     process = subprocess.Popen(
-        ["uv", "run", str(webhook_path)],
+        ["uv", "run", str(webhook_path), *(args or [])],
         env=env,
+        cwd=cwd,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
@@ -44,7 +67,7 @@ def webhook_server():
     )
     
     # Wait for server to be ready
-    server_url = f"http://localhost:{test_port}"
+    server_url = f"http://localhost:{port}"
     max_retries = 30
     retry_delay = 0.2
     
@@ -62,20 +85,114 @@ def webhook_server():
                 raise RuntimeError(f"Server failed to start after {max_retries * retry_delay} seconds")
             time.sleep(retry_delay)
     
-    # Yield server URL and secret for tests
-    yield {
-        "url": server_url,
-        "secret": test_secret,
-        "port": test_port
+    try:
+        # Yield server URL and secret for tests
+        yield {
+            "url": server_url,
+            "secret": test_secret,
+            "port": port,
+            "process": process
+        }
+    finally:
+        # Cleanup: terminate the server
+        try:
+            os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+            process.wait()
+
+
+@pytest.fixture
+def webhook_server():
+    """Start the webhook server as a subprocess and return its URL."""
+    with run_webhook_server(18080) as server:
+        yield server
+
+
+@pytest.fixture
+def clone_webhook_server(test_clone_dir):
+    """Start a webhook server with repository cloning enabled."""
+    extra_env = {
+        "CLONE_REPOS": "true",
+        "CLONE_BASE_DIR": str(test_clone_dir),
+    }
+    with run_webhook_server(18081, extra_env) as server:
+        server["clone_dir"] = test_clone_dir
+        yield server
+
+
+@pytest.fixture
+def limited_webhook_server():
+    """Start a webhook server with a small maximum body size."""
+    with run_webhook_server(18083, {"WEBHOOK_MAX_BODY_BYTES": "1024"}) as server:
+        server["max_body_bytes"] = 1024
+        yield server
+
+
+@pytest.fixture
+def rotating_webhook_server(tmp_path):
+    """Start a webhook server that accepts a current and a previous secret."""
+    secrets_file = tmp_path / "webhook-secrets"
+    secrets_file.write_text("# retiring after rotation\nprevious_webhook_secret\n")
+    extra_env = {
+        "GITHUB_WEBHOOK_SECRETS_FILE": str(secrets_file),
+        "GITHUB_WEBHOOK_SECRETS_RELOAD_SECONDS": "0",
+    }
+    with run_webhook_server(18084, extra_env) as server:
+        server["previous_secret"] = "previous_webhook_secret"
+        server["secrets_file"] = secrets_file
+        yield server
+
+
+@pytest.fixture
+def queued_webhook_server(tmp_path):
+    """Start a webhook server with the durable event queue enabled."""
+    extra_env = {
+        "EVENT_QUEUE_ENABLED": "true",
+        "EVENT_QUEUE_PATH": str(tmp_path / "events.db"),
+    }
+    with run_webhook_server(18082, extra_env) as server:
+        yield server
+
+
+@pytest.fixture
+def multi_worker_webhook_server(tmp_path):
+    """Start a webhook server with two worker processes sharing dedup state."""
+    extra_env = {
+        "WEBHOOK_WORKERS": "2",
+        "DEDUP_PATH": str(tmp_path / "deliveries.db"),
+        "WORKER_STATE_PATH": str(tmp_path / "workers.db"),
     }
+    with run_webhook_server(18085, extra_env) as server:
+        yield server
+
+
+@pytest.fixture
+def cli_workers_webhook_server(tmp_path):
+    """Start a webhook server whose worker count is only given as --workers 2.
     
-    # Cleanup: terminate the server
-    try:
-        os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-        process.wait(timeout=2)
-    except subprocess.TimeoutExpired:
-        os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-        process.wait()
+    Runs in tmp_path so the default shared databases under ./data are created there.
+    """
+    # Unbuffered so the startup banner can be read while the server runs
+    with run_webhook_server(18087, {"PYTHONUNBUFFERED": "1"}, args=["--workers", "2"], cwd=tmp_path) as server:
+        server["cwd"] = tmp_path
+        yield server
+
+
+@pytest.fixture
+def multi_worker_clone_webhook_server(tmp_path, test_clone_dir):
+    """Start a webhook server with two worker processes and repository cloning enabled."""
+    extra_env = {
+        "WEBHOOK_WORKERS": "2",
+        "DEDUP_PATH": str(tmp_path / "deliveries.db"),
+        "WORKER_STATE_PATH": str(tmp_path / "workers.db"),
+        "WORKER_STATE_INTERVAL_SECONDS": "0.2",
+        "CLONE_REPOS": "true",
+        "CLONE_BASE_DIR": str(test_clone_dir),
+    }
+    with run_webhook_server(18086, extra_env) as server:
+        yield server
 
 
 def generate_signature(payload: bytes, secret: str) -> str:
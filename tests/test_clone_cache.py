@@ -0,0 +1,88 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+from clone_cache import CloneCache
+from file_lock import FileLock
+
+
+def make_repo(base_dir, key: str, size: int):
+    """Create a fake clone of the given size and return its path."""
+    path = base_dir / key
+    (path / ".git").mkdir(parents=True)
+    (path / "data.bin").write_bytes(b"x" * size)
+    return path
+
+
+def test_least_recently_used_repositories_are_evicted(tmp_path):
+    """Test that exceeding the byte quota deletes the least recently used clones first."""
+    base_dir = tmp_path / "repos"
+    cache = CloneCache(base_dir, base_dir / ".cache-index.db", max_bytes=2500)
+    
+    for key in ("a/one", "a/two", "b/three"):
+        cache.record(*key.split("/"), [make_repo(base_dir, key, 1000)])
+    # Using "a/one" again makes "a/two" the least recently used
+    cache.record("a", "one", [base_dir / "a" / "one"])
+    
+    evicted = cache.enforce(keep="b/three")
+    
+    assert [entry.key for entry in evicted] == ["a/two"]
+    assert not (base_dir / "a" / "two").exists()
+    assert (base_dir / "a" / "one").exists()
+    assert cache.totals() == (2000, 2)
+    assert [eviction["repository"] for eviction in cache.evictions()] == ["a/two"]
+
+
+def test_repository_count_quota_and_kept_repository(tmp_path):
+    """Test that the count quota applies and the repository just used is never evicted."""
+    base_dir = tmp_path / "repos"
+    cache = CloneCache(base_dir, base_dir / ".cache-index.db", max_repos=1)
+    cache.record("a", "old", [make_repo(base_dir, "a/old", 10)])
+    cache.record("a", "new", [make_repo(base_dir, "a/new", 10)])
+    
+    # Even the oldest entry survives when it is the one being kept
+    assert [entry.key for entry in cache.enforce(keep="a/old")] == ["a/new"]
+    assert [entry.key for entry in cache.entries()] == ["a/old"]
+
+
+def test_locked_repositories_are_not_evicted(tmp_path):
+    """Test that a repository whose lock is held elsewhere is skipped."""
+    base_dir = tmp_path / "repos"
+    lock_dir = tmp_path / "locks"
+    cache = CloneCache(
+        base_dir,
+        base_dir / ".cache-index.db",
+        max_repos=1,
+        lock_for=lambda owner, repo: FileLock(lock_dir / owner / f"{repo}.lock")
+    )
+    cache.record("a", "busy", [make_repo(base_dir, "a/busy", 10)])
+    cache.record("a", "idle", [make_repo(base_dir, "a/idle", 10)])
+    cache.record("a", "current", [make_repo(base_dir, "a/current", 10)])
+    
+    busy_lock = FileLock(lock_dir / "a" / "busy.lock")
+    busy_lock.acquire()
+    evicted = cache.enforce(keep="a/current")
+    busy_lock.release()
+    
+    assert [entry.key for entry in evicted] == ["a/idle"]
+    assert (base_dir / "a" / "busy").exists()
+
+
+def test_touch_updates_last_access_without_measuring(tmp_path):
+    """Test that touching an indexed repository keeps its recorded size and refreshes its use."""
+    base_dir = tmp_path / "repos"
+    cache = CloneCache(base_dir, base_dir / ".cache-index.db")
+    path = make_repo(base_dir, "a/one", 1000)
+    entry = cache.record("a", "one", [path])
+    (path / "more.bin").write_bytes(b"x" * 500)
+    
+    assert cache.touch("a", "one") is True
+    assert cache.touch("a", "unknown") is False
+    
+    [touched] = cache.entries()
+    assert touched.size_bytes == 1000
+    assert touched.last_access >= entry.last_access
@@ -0,0 +1,122 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import asyncio
+
+import pytest
+
+from clone_pool import ClonePool
+
+
+def make_slow_clone(calls: list, release: asyncio.Event, status: str = "cloned"):
+    """Create a clone coroutine function that waits until released and records each call."""
+    async def clone(full_name, owner, repo_name):
+        calls.append(full_name)
+        await asyncio.wait_for(release.wait(), timeout=5)
+        if status == "error":
+            return {"status": "error", "message": "Clone failed"}
+        return {"status": status, "path": f"repos/{owner}/{repo_name}"}
+    return clone
+
+
+def test_concurrent_jobs_for_same_repository_share_one_clone():
+    """Test that jobs submitted while a clone is in flight join it instead of cloning again."""
+    calls = []
+    release = asyncio.Event()
+    pool = ClonePool(make_slow_clone(calls, release), max_workers=2)
+
+    async def scenario():
+        jobs = [pool.submit("octocat/Hello-World", "octocat", "Hello-World") for _ in range(3)]
+        other = pool.submit("octocat/Spoon-Knife", "octocat", "Spoon-Knife")
+        assert pool.in_flight == 2
+        release.set()
+        await pool.drain()
+        return jobs, other
+
+    jobs, other = asyncio.run(scenario())
+    pool.shutdown()
+
+    assert sorted(calls) == ["octocat/Hello-World", "octocat/Spoon-Knife"]
+    assert [job.origin for job in jobs] == ["executed", "coalesced", "coalesced"]
+    assert all(job.status == "done" for job in jobs)
+    assert all(job.result == jobs[0].result for job in jobs)
+    assert other.result["path"] == "repos/octocat/Spoon-Knife"
+
+
+def test_fresh_result_is_reused_without_running_git():
+    """Test that a job within the freshness window reuses the previous result."""
+    calls = []
+    release = asyncio.Event()
+    release.set()
+    pool = ClonePool(make_slow_clone(calls, release), freshness_seconds=60)
+
+    async def scenario():
+        first = pool.submit("octocat/Hello-World", "octocat", "Hello-World")
+        await pool.drain()
+        second = pool.submit("octocat/Hello-World", "octocat", "Hello-World")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    pool.shutdown()
+
+    assert calls == ["octocat/Hello-World"]
+    assert second.origin == "cached"
+    assert second.status == "done"
+    assert second.result == first.result
+
+
+def test_failed_result_is_not_reused():
+    """Test that errors are retried rather than served from the freshness window."""
+    calls = []
+    release = asyncio.Event()
+    release.set()
+    pool = ClonePool(make_slow_clone(calls, release, status="error"), freshness_seconds=60)
+
+    async def scenario():
+        pool.submit("octocat/Hello-World", "octocat", "Hello-World")
+        await pool.drain()
+        retry = pool.submit("octocat/Hello-World", "octocat", "Hello-World")
+        await pool.drain()
+        return retry
+
+    retry = asyncio.run(scenario())
+    pool.shutdown()
+
+    assert len(calls) == 2
+    assert retry.origin == "executed"
+
+
+def test_every_status_change_is_reported():
+    """Test that on_update sees each job queued, running and done."""
+    calls = []
+    release = asyncio.Event()
+    release.set()
+    updates = []
+    pool = ClonePool(
+        make_slow_clone(calls, release),
+        on_update=lambda job: updates.append((job.job_id, job.status))
+    )
+
+    async def scenario():
+        job = pool.submit("octocat/Hello-World", "octocat", "Hello-World")
+        await pool.drain()
+        return job
+
+    job = asyncio.run(scenario())
+    pool.shutdown()
+
+    assert updates == [(job.job_id, "queued"), (job.job_id, "running"), (job.job_id, "done")]
+
+
+def test_blocking_clone_function_is_rejected():
+    """Test that the pool only accepts coroutine functions, so no clone ties up a thread."""
+    def blocking_clone(full_name, owner, repo_name):
+        return {"status": "cloned"}
+
+    with pytest.raises(TypeError, match="coroutine function"):
+        ClonePool(blocking_clone)
@@ -0,0 +1,64 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import json
+
+import pytest
+
+from clone_strategy import CloneStrategies, CloneStrategy
+
+
+def test_default_strategy_is_a_full_clone():
+    """Test that the default strategy adds no git options."""
+    strategy = CloneStrategy()
+    
+    assert strategy.is_full
+    assert strategy.clone_args() == []
+    assert strategy.fetch_args() == []
+
+
+def test_strategy_builds_git_clone_options():
+    """Test that shallow, partial, sparse and reference options map onto git clone flags."""
+    strategy = CloneStrategy(depth=1, filter="blob:none", sparse_paths=("services/api",), reference="/srv/objects")
+    
+    assert strategy.clone_args() == [
+        "--depth=1",
+        "--filter=blob:none",
+        "--sparse",
+        "--reference-if-able",
+        "/srv/objects",
+    ]
+    assert strategy.fetch_args() == ["--depth=1"]
+
+
+@pytest.mark.parametrize("options", [
+    {"depth": -1},
+    {"filter": "blob:all; rm -rf /"},
+    {"sparse_paths": ["../outside"]},
+    {"sparse_paths": ["--option"]},
+    {"unknown": True},
+])
+def test_invalid_options_are_rejected(options):
+    """Test that invalid or unknown strategy options raise ValueError."""
+    with pytest.raises(ValueError):
+        CloneStrategy().merged(options)
+
+
+def test_repository_overrides_take_precedence(tmp_path):
+    """Test that exact overrides beat owner overrides, which beat the global default."""
+    strategies_file = tmp_path / "clone-strategies.json"
+    strategies_file.write_text(json.dumps({
+        "octo-org/monorepo": {"filter": "blob:none", "sparse_paths": "services/api, docs/"},
+        "octo-org/*": {"filter": "tree:0"},
+    }))
+    strategies = CloneStrategies.from_file(strategies_file, CloneStrategy(depth=1))
+    
+    monorepo = strategies.for_repository("octo-org/monorepo")
+    assert monorepo == CloneStrategy(depth=1, filter="blob:none", sparse_paths=("services/api", "docs"))
+    assert strategies.for_repository("octo-org/other").filter == "tree:0"
+    assert strategies.for_repository("someone/else") == CloneStrategy(depth=1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import time
+
+from delivery_dedup import DeliveryDedupCache
+
+
+def test_least_recently_seen_ids_are_evicted_first():
+    """Test that the cache stays bounded and keeps recently seen ids."""
+    cache = DeliveryDedupCache(max_entries=2)
+    
+    assert cache.check_and_add("a") is False
+    assert cache.check_and_add("b") is False
+    assert cache.check_and_add("a") is True  # touch "a" so "b" is least recent
+    assert cache.check_and_add("c") is False
+    
+    assert cache.stats()["size"] == 2
+    assert cache.check_and_add("a") is True
+    assert cache.check_and_add("b") is False
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_ids_expire_after_max_age():
+    """Test that ids older than the max age are no longer treated as duplicates."""
+    cache = DeliveryDedupCache(max_age_seconds=0.05)
+    
+    assert cache.check_and_add("a") is False
+    time.sleep(0.1)
+    assert cache.check_and_add("a") is False
+
+
+def test_ids_survive_restart_when_persisted(tmp_path):
+    """Test that a persistent cache recognises ids seen before a restart."""
+    path = tmp_path / "deliveries.db"
+    cache = DeliveryDedupCache(path=path)
+    cache.check_and_add("a")
+    cache.check_and_add("b")
+    cache.forget("b")
+    cache.close()
+    
+    restarted = DeliveryDedupCache(path=path)
+    
+    assert restarted.check_and_add("a") is True
+    assert restarted.check_and_add("b") is False
+
+
+def test_shared_cache_sees_ids_from_other_workers(tmp_path):
+    """Test that caches sharing a database agree on which delivery was seen first."""
+    db_path = tmp_path / "deliveries.db"
+    worker_a = DeliveryDedupCache(path=db_path, shared=True)
+    worker_b = DeliveryDedupCache(path=db_path, shared=True)
+    
+    assert worker_a.check_and_add("delivery-1") is False
+    assert worker_b.check_and_add("delivery-1") is True
+    
+    # A failed delivery forgotten by one worker is accepted again by the other
+    worker_a.forget("delivery-1")
+    assert worker_b.check_and_add("delivery-1") is False
+    assert worker_a.check_and_add("delivery-1") is True
+    
+    worker_a.close()
+    worker_b.close()
@@ -0,0 +1,101 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import asyncio
+
+from event_queue import EventQueue, PermanentEventError, QueueConsumer
+
+
+def run_consumer_until_empty(queue: EventQueue, handler) -> None:
+    """Run a consumer until the queue has no pending events."""
+    async def scenario():
+        consumer = QueueConsumer(queue, handler, poll_interval=0.01)
+        consumer.start()
+        for _ in range(200):
+            if queue.depth() == 0:
+                break
+            await asyncio.sleep(0.01)
+        await consumer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_unprocessed_events_are_replayed_after_restart(tmp_path):
+    """Test that events appended before a crash are processed by the next consumer."""
+    db_path = tmp_path / "events.db"
+    queue = EventQueue(db_path)
+    queue.append("delivery-1", "issues", b'{"action": "opened"}')
+    queue.append("delivery-2", "push", b'{}')
+    queue.close()
+    
+    # Simulate a restart by reopening the database
+    queue = EventQueue(db_path)
+    assert queue.depth() == 2
+    
+    seen = []
+    async def handler(event):
+        seen.append(event.delivery_id)
+    
+    run_consumer_until_empty(queue, handler)
+    
+    assert seen == ["delivery-1", "delivery-2"]
+    assert queue.stats() == {"pending": 0, "done": 2, "failed": 0}
+
+
+def test_failed_events_are_retried_then_given_up(tmp_path):
+    """Test that transient failures are retried and permanent failures are not."""
+    queue = EventQueue(tmp_path / "events.db", max_attempts=3)
+    queue.append("flaky", "issues", b'{}')
+    queue.append("poison", "issues", b'not json')
+    
+    attempts = {"flaky": 0, "poison": 0}
+    async def handler(event):
+        attempts[event.delivery_id] += 1
+        if event.delivery_id == "poison":
+            raise PermanentEventError("Invalid JSON payload")
+        if attempts["flaky"] < 2:
+            raise RuntimeError("temporary failure")
+    
+    run_consumer_until_empty(queue, handler)
+    
+    assert attempts == {"flaky": 2, "poison": 1}
+    assert queue.stats() == {"pending": 0, "done": 1, "failed": 1}
+
+
+def test_only_the_lock_holder_drains_a_shared_queue(tmp_path):
+    """Test that a consumer waits while another process holds the queue's consumer lock."""
+    from file_lock import FileLock
+    
+    queue = EventQueue(tmp_path / "events.db")
+    queue.append("delivery-1", "issues", b'{}')
+    lock_path = tmp_path / "events.db.consumer.lock"
+    
+    seen = []
+    async def handler(event):
+        seen.append(event.delivery_id)
+    
+    async def scenario():
+        other_worker = FileLock(lock_path)
+        assert other_worker.acquire(blocking=False)
+        consumer = QueueConsumer(queue, handler, poll_interval=0.01, lock_path=lock_path)
+        consumer.start()
+        await asyncio.sleep(0.1)
+        assert seen == [] and not consumer.active
+        
+        # Take over once the other worker goes away
+        other_worker.release()
+        for _ in range(200):
+            if seen:
+                break
+            await asyncio.sleep(0.01)
+        assert consumer.active
+        await consumer.stop()
+    
+    asyncio.run(scenario())
+    
+    assert seen == ["delivery-1"]
@@ -0,0 +1,73 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import asyncio
+
+import pytest
+
+from event_router import EventRouter
+
+
+def test_specific_action_takes_precedence_over_catch_all():
+    """Test that (event, action) handlers win over an event's catch-all handler."""
+    router = EventRouter()
+    
+    @router.on("issues", "opened")
+    def opened(payload):
+        return "opened"
+    
+    @router.on("issues")
+    def any_issue(payload):
+        return "any"
+    
+    assert router.resolve("issues", "opened").handler is opened
+    assert router.resolve("issues", "closed").handler is any_issue
+    assert router.resolve("push", None) is None
+
+
+def test_handles_reports_only_registered_events():
+    """Test that unregistered events can be skipped before parsing the payload."""
+    router = EventRouter()
+    
+    @router.on("issues", "opened")
+    def opened(payload):
+        return {}
+    
+    assert router.handles("issues") is True
+    assert router.handles("push") is False
+    assert router.handles(None) is False
+
+
+def test_route_call_supports_sync_and_async_handlers():
+    """Test that Route.call awaits coroutine handlers and returns plain results."""
+    router = EventRouter()
+    
+    @router.on("push", mode="background")
+    async def on_push(payload):
+        return payload["ref"]
+    
+    @router.on("issue_comment", "created")
+    def on_comment(payload):
+        return payload["comment"]
+    
+    push_route = router.resolve("push", None)
+    assert push_route.mode == "background"
+    assert asyncio.run(push_route.call({"ref": "refs/heads/main"})) == "refs/heads/main"
+    assert asyncio.run(router.resolve("issue_comment", "created").call({"comment": "hi"})) == "hi"
+
+
+def test_invalid_registrations_are_rejected():
+    """Test that unknown modes and duplicate registrations raise ValueError."""
+    router = EventRouter()
+    
+    with pytest.raises(ValueError):
+        router.on("issues", "opened", mode="later")
+    
+    router.on("issues", "opened")(lambda payload: {})
+    with pytest.raises(ValueError):
+        router.on("issues", "opened")(lambda payload: {})
@@ -0,0 +1,153 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import asyncio
+import threading
+import time
+
+from fetch_scheduler import FetchScheduler
+
+
+def make_refresh(calls: list, status: str = "updated", delay: float = 0.0):
+    """Create a refresh function that records each call and returns the given status."""
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def refresh(full_name, owner, repo_name):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        calls.append(full_name)
+        time.sleep(delay)
+        with lock:
+            active[0] -= 1
+        if status == "error":
+            return {"status": "error", "message": "fetch failed"}
+        return {"status": status}
+
+    refresh.peak = peak
+    return refresh
+
+
+def test_interval_follows_event_rate_within_bounds():
+    """Test that the fetch interval is half the gap between events, clamped to the configured range."""
+    scheduler = FetchScheduler(make_refresh([]), min_interval=10, max_interval=100, jitter=0)
+    scheduler.record_event("octocat/Hello-World", "octocat", "Hello-World")
+    schedule = scheduler.schedules()[0]
+
+    # A single event gives no rate yet
+    assert scheduler.interval(schedule) == 100
+
+    schedule.mean_gap = 60
+    assert scheduler.interval(schedule) == 30
+    schedule.mean_gap = 4
+    assert scheduler.interval(schedule) == 10
+    schedule.mean_gap = 1000
+    assert scheduler.interval(schedule) == 100
+
+
+def test_fetch_interval_uses_the_repository_schedule():
+    """Test that a scheduled repository reports its own interval and others the minimum."""
+    scheduler = FetchScheduler(make_refresh([]), min_interval=10, max_interval=100, jitter=0)
+    scheduler.record_event("octocat/Hello-World", "octocat", "Hello-World")
+    scheduler.schedules()[0].mean_gap = 60
+
+    assert scheduler.fetch_interval("octocat", "Hello-World") == 30
+    assert scheduler.fetch_interval("octocat", "Spoon-Knife") == 10
+
+
+def test_busier_repository_is_fetched_sooner():
+    """Test that a second event pulls the next fetch forward to the shorter interval."""
+    scheduler = FetchScheduler(make_refresh([]), min_interval=1, max_interval=100, jitter=0)
+    scheduler.record_event("octocat/Hello-World", "octocat", "Hello-World")
+    schedule = scheduler.schedules()[0]
+    schedule.last_event -= 10
+
+    scheduler.record_event("octocat/Hello-World", "octocat", "Hello-World")
+
+    assert 9 <= schedule.mean_gap <= 11
+    assert schedule.next_due - time.time() <= 6
+
+
+def test_due_repositories_are_fetched_with_bounded_concurrency():
+    """Test that due repositories are refreshed in the background, at most max_concurrency at a time."""
+    calls = []
+    refresh = make_refresh(calls, delay=0.1)
+    scheduler = FetchScheduler(refresh, max_concurrency=2, min_interval=60, max_interval=60, jitter=0)
+
+    async def scenario():
+        for name in ("one", "two", "three", "four"):
+            scheduler.record_event(f"octocat/{name}", "octocat", name)
+        for schedule in scheduler.schedules():
+            schedule.next_due = 0
+        scheduler.start()
+        for _ in range(100):
+            if scheduler.fetches == 4:
+                break
+            await asyncio.sleep(0.02)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert sorted(calls) == ["octocat/four", "octocat/one", "octocat/three", "octocat/two"]
+    assert refresh.peak[0] == 2
+    assert scheduler.stats()["fetches"] == 4
+    # Each repository is scheduled again a full interval later
+    assert all(schedule.next_due > time.time() + 50 for schedule in scheduler.schedules())
+
+
+def test_recently_fetched_repository_is_skipped():
+    """Test that a repository fetched elsewhere within half its interval is not fetched again."""
+    calls = []
+    scheduler = FetchScheduler(
+        make_refresh(calls),
+        min_interval=60,
+        max_interval=60,
+        jitter=0,
+        last_fetched=lambda owner, repo_name: time.time() - 5
+    )
+
+    async def scenario():
+        scheduler.record_event("octocat/Hello-World", "octocat", "Hello-World")
+        scheduler.schedules()[0].next_due = 0
+        scheduler.start()
+        for _ in range(100):
+            if scheduler.skipped:
+                break
+            await asyncio.sleep(0.02)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert calls == []
+    assert scheduler.stats()["skipped"] == 1
+
+
+def test_failures_are_counted_and_idle_repositories_dropped():
+    """Test that failed fetches are counted and repositories without recent events leave the schedule."""
+    scheduler = FetchScheduler(make_refresh([], status="error"), min_interval=60, max_interval=60, jitter=0, idle_after=30)
+
+    async def scenario():
+        scheduler.record_event("octocat/Hello-World", "octocat", "Hello-World")
+        scheduler.record_event("octocat/Spoon-Knife", "octocat", "Spoon-Knife")
+        hello, spoon = sorted(scheduler.schedules(), key=lambda schedule: schedule.repo_name)
+        hello.next_due = 0
+        spoon.last_event -= 100
+        scheduler.start()
+        for _ in range(100):
+            if scheduler.failures:
+                break
+            await asyncio.sleep(0.02)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert scheduler.stats()["failures"] == 1
+    assert [schedule.repo_name for schedule in scheduler.schedules()] == ["Hello-World"]
+    assert scheduler.schedules()[0].last_status == "error"
@@ -0,0 +1,41 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import threading
+import time
+
+from file_lock import FileLock
+
+
+def test_lock_is_exclusive_until_released(tmp_path):
+    """Test that a second holder cannot take the lock until the first releases it."""
+    lock_path = tmp_path / "locks" / "owner" / "repo.lock"
+    first = FileLock(lock_path)
+    second = FileLock(lock_path)
+    
+    assert first.acquire(blocking=False)
+    assert second.acquire(blocking=False) is False
+    assert second.acquire(timeout=0.05) is False
+    
+    first.release()
+    assert second.acquire(blocking=False)
+    assert second.held
+    second.release()
+
+
+def test_waiting_holder_gets_the_lock_after_release(tmp_path):
+    """Test that a blocking acquire succeeds once the current holder releases."""
+    lock_path = tmp_path / "repo.lock"
+    first = FileLock(lock_path, poll_interval=0.01)
+    first.acquire()
+    threading.Timer(0.05, first.release).start()
+    
+    started = time.monotonic()
+    with FileLock(lock_path, poll_interval=0.01) as second:
+        assert second.held
+    assert time.monotonic() - started >= 0.04
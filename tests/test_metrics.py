@@ -0,0 +1,85 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import pytest
+
+from metrics import Registry, render_families
+
+
+def test_counter_renders_labelled_samples():
+    """Test that counters render one sample per label combination with escaped values."""
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ("event", "status"))
+    requests.labels("issues", 200).inc()
+    requests.labels("issues", 200).inc()
+    requests.labels('we"ird', 401).inc()
+    
+    text = registry.render()
+    
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{event="issues",status="200"} 2' in text
+    assert 'requests_total{event="we\\"ird",status="401"} 1' in text
+
+
+def test_labels_returns_the_same_child():
+    """Test that repeated label lookups reuse the child created on first use."""
+    registry = Registry()
+    counter = registry.counter("hits_total", "Hits.", ("reason",))
+    
+    assert counter.labels("mismatch") is counter.labels("mismatch")
+    with pytest.raises(ValueError):
+        counter.labels("mismatch", "extra")
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets count observations at or below each bound."""
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("phase",), buckets=(0.1, 1.0))
+    child = latency.labels("verify")
+    for value in (0.05, 0.1, 0.5, 2.0):
+        child.observe(value)
+    
+    text = registry.render()
+    
+    assert 'latency_seconds_bucket{phase="verify",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{phase="verify",le="1"} 3' in text
+    assert 'latency_seconds_bucket{phase="verify",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{phase="verify"} 4' in text
+    assert 'latency_seconds_sum{phase="verify"} 2.65' in text
+
+
+def test_callback_metric_is_read_at_render_time():
+    """Test that callback gauges report the current value and can be omitted."""
+    registry = Registry()
+    depth = {"value": 3}
+    registry.callback("queue_depth", "Depth.", lambda: depth["value"])
+    registry.callback("disabled", "Disabled.", lambda: None)
+    
+    assert "queue_depth 3" in registry.render()
+    depth["value"] = 7
+    text = registry.render()
+    assert "queue_depth 7" in text
+    assert "disabled" not in text
+
+
+def test_worker_families_are_merged_under_one_header():
+    """Test that families from per-worker registries render once with a pid label on each sample."""
+    workers = [Registry(const_labels={"pid": pid}) for pid in (101, 102)]
+    for registry, count in zip(workers, (1, 2)):
+        registry.counter("requests_total", "Requests.", ("status",)).labels(200).inc(count)
+        registry.histogram("latency_seconds", "Latency.", buckets=(1.0,)).observe(0.5)
+        registry.callback("queue_depth", "Depth.", lambda: 3)
+    
+    text = render_families(family for registry in workers for family in registry.collect())
+    
+    assert text.count("# TYPE requests_total counter") == 1
+    assert 'requests_total{status="200",pid="101"} 1' in text
+    assert 'requests_total{status="200",pid="102"} 2' in text
+    assert 'latency_seconds_bucket{pid="101",le="1"} 1' in text
+    assert 'latency_seconds_count{pid="102"} 1' in text
+    assert 'queue_depth{pid="101"} 3' in text
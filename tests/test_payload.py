@@ -0,0 +1,77 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import json
+
+import pytest
+
+from payload import UNKNOWN, extract_fields, peek_action, select_backend
+
+
+def test_peek_action_reads_leading_action():
+    """Test that the action is read from the start of the body without parsing it."""
+    assert peek_action(b'{"action": "opened", "issue": {}}') == "opened"
+    assert peek_action(b'{\n  "action":"closed"') == "closed"
+
+
+def test_peek_action_without_action_key():
+    """Test that payloads without a leading action (e.g. push) report None."""
+    assert peek_action(b'{"ref": "refs/heads/main", "commits": []}') is None
+
+
+def test_peek_action_finds_action_that_is_not_the_first_key():
+    """Test that a payload whose keys are in another order still reports its action."""
+    body = json.dumps({"zen": "Keep it simple.", "issue": {"number": 1}, "action": "opened"}).encode()
+
+    assert peek_action(body) == "opened"
+
+
+def test_peek_action_unknown_for_unrecognised_bodies():
+    """Test that bodies that cannot be peeked fall back to a full parse."""
+    assert peek_action(b'{ invalid json content') is UNKNOWN
+    assert peek_action(b'[]') is UNKNOWN
+
+
+def test_extract_fields_returns_only_requested_fields():
+    """Test that only the declared top-level fields are decoded."""
+    body = json.dumps({
+        "action": "opened",
+        "issue": {"number": 1},
+        "repository": {"full_name": "octocat/Hello-World"},
+        "sender": {"login": "octocat"},
+    }).encode()
+    
+    assert extract_fields(body, ["action", "repository"]) == {
+        "action": "opened",
+        "repository": {"full_name": "octocat/Hello-World"},
+    }
+
+
+def test_extract_fields_stops_before_unneeded_trailing_data():
+    """Test that scanning stops once every requested field has been found."""
+    # The trailing garbage would fail a full parse
+    body = b'{"action": "opened", "issue": {"number": 1}, "commits": [oops'
+    
+    assert extract_fields(body, ["action", "issue"]) == {"action": "opened", "issue": {"number": 1}}
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(body)
+
+
+def test_extract_fields_rejects_non_objects():
+    """Test that non-object payloads raise JSONDecodeError."""
+    with pytest.raises(json.JSONDecodeError):
+        extract_fields(b'[1, 2]', ["action"])
+
+
+def test_select_backend_falls_back_to_stdlib():
+    """Test that the stdlib backend is always available and unknown names are rejected."""
+    name, loads = select_backend("json")
+    assert name == "json"
+    assert loads(b'{"a": 1}') == {"a": 1}
+    with pytest.raises(ValueError):
+        select_backend("simdjson")
@@ -0,0 +1,92 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+
+from clone_strategy import CloneStrategy
+from repo_mirror import RepoMirrors
+
+
+def git(*args, cwd=None):
+    """Run a git command in a test repository."""
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """Create a local repository standing in for GitHub."""
+    repo = tmp_path / "upstream"
+    (repo / "src").mkdir(parents=True)
+    (repo / "docs").mkdir()
+    (repo / "src" / "app.py").write_text("print('hello')\n")
+    (repo / "docs" / "guide.md").write_text("# Guide\n")
+    git("init", "-q", "-b", "main", str(repo))
+    git("add", "-A", cwd=repo)
+    git("commit", "-q", "-m", "initial", cwd=repo)
+    return repo
+
+
+@pytest.fixture
+def mirrors(tmp_path, upstream):
+    """RepoMirrors that clone from the local upstream instead of GitHub."""
+    def clone_command(full_name, target, git_args):
+        return ["git", "clone", "-q", *git_args, upstream.as_uri(), str(target)]
+    return RepoMirrors(tmp_path / "repos", clone_command=clone_command)
+
+
+def test_mirror_is_cloned_then_fetched(mirrors, upstream):
+    """Test that the first sync creates a bare mirror and later syncs fetch new commits."""
+    result = asyncio.run(mirrors.sync("test/repo", "test", "repo"))
+    
+    assert result["status"] == "cloned"
+    assert (mirrors.mirror_path("test", "repo") / "HEAD").exists()
+    
+    (upstream / "src" / "app.py").write_text("print('updated')\n")
+    git("commit", "-q", "-am", "update", cwd=upstream)
+    assert asyncio.run(mirrors.sync("test/repo", "test", "repo"))["status"] == "updated"
+    
+    worktree = asyncio.run(mirrors.add_worktree("test", "repo", "issue-1"))
+    assert (worktree / "src" / "app.py").read_text() == "print('updated')\n"
+
+
+def test_worktrees_are_independent_and_sparse(mirrors):
+    """Test that each issue gets its own checkout and sparse paths limit what is checked out."""
+    asyncio.run(mirrors.sync("test/repo", "test", "repo", CloneStrategy(filter="blob:none")))
+    
+    first = asyncio.run(mirrors.add_worktree("test", "repo", "issue-1"))
+    second = asyncio.run(mirrors.add_worktree("test", "repo", "issue-2", sparse_paths=("src",)))
+    (first / "src" / "app.py").write_text("edited in issue 1\n")
+    
+    assert first == mirrors.worktree_path("test", "repo", "issue-1")
+    assert (second / "src" / "app.py").read_text() == "print('hello')\n"
+    assert not (second / "docs").exists()
+    assert asyncio.run(mirrors.add_worktree("test", "repo", "issue-1")) == first
+    assert [path.name for path in mirrors.worktrees("test", "repo")] == ["issue-1", "issue-2"]
+
+
+def test_gc_removes_stale_worktrees(mirrors):
+    """Test that worktrees unused for longer than the max age are removed."""
+    asyncio.run(mirrors.sync("test/repo", "test", "repo"))
+    stale = asyncio.run(mirrors.add_worktree("test", "repo", "issue-1"))
+    asyncio.run(mirrors.add_worktree("test", "repo", "issue-2"))
+    old = time.time() - 3600
+    os.utime(stale, (old, old))
+    
+    assert asyncio.run(mirrors.gc("test", "repo", max_age_seconds=60)) == ["issue-1"]
+    assert not stale.exists()
+    assert [path.name for path in mirrors.worktrees("test", "repo")] == ["issue-2"]
+    # The mirror forgets the removed worktree, so the name can be reused
+    assert asyncio.run(mirrors.add_worktree("test", "repo", "issue-1")).exists()
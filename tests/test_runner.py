@@ -0,0 +1,193 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from runner import CommandRunner, OutputBuffer, run_command
+
+
+def python(code: str) -> list[str]:
+    """Build a command that runs a Python snippet."""
+    return [sys.executable, "-c", code]
+
+
+def process_alive(pid: int) -> bool:
+    """Check whether a process still exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_output_and_exit_status_are_captured():
+    """Test that stdout, stderr, the exit code and timing are recorded."""
+    result = asyncio.run(run_command(python("import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)")))
+
+    assert result.returncode == 3
+    assert not result.ok
+    assert result.stdout == "out\n"
+    assert result.stderr == "err\n"
+    assert result.error_message() == "err"
+    assert result.duration > 0
+    assert result.to_dict()["program"] == os.path.basename(sys.executable)
+
+
+def test_output_is_streamed_to_callbacks():
+    """Test that output chunks reach the callbacks while being captured."""
+    chunks = []
+    result = asyncio.run(run_command(
+        python("import sys\nfor i in range(3): print(i, flush=True)"),
+        on_stdout=chunks.append
+    ))
+
+    assert result.ok
+    assert "".join(chunks) == result.stdout == "0\n1\n2\n"
+
+
+def test_output_is_capped_keeping_start_and_end():
+    """Test that output beyond the cap is dropped from the middle."""
+    result = asyncio.run(run_command(
+        python("print('START' + 'x' * 100000 + 'END', end='')"),
+        max_output_bytes=100
+    ))
+
+    assert result.stdout_bytes == 100008
+    assert result.stdout.startswith("START")
+    assert result.stdout.endswith("END")
+    assert "[99908 bytes omitted]" in result.stdout
+
+
+def test_buffer_without_limit_keeps_everything():
+    """Test that a limit of 0 keeps the whole stream."""
+    buffer = OutputBuffer(limit=0)
+    for _ in range(10):
+        buffer.append(b"abc")
+
+    assert buffer.text() == "abc" * 10
+    assert buffer.dropped == 0
+
+
+def test_timeout_kills_the_whole_process_group(tmp_path):
+    """Test that a timed out command and the processes it started are killed."""
+    pid_file = tmp_path / "child.pid"
+    code = (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "time.sleep(60)\n"
+    )
+    start = time.monotonic()
+    result = asyncio.run(run_command(python(code), timeout=1, kill_grace=1))
+
+    assert result.timed_out
+    assert not result.ok
+    assert "timed out" in result.error_message()
+    assert time.monotonic() - start < 10
+    child_pid = int(pid_file.read_text())
+    for _ in range(50):
+        if not process_alive(child_pid):
+            break
+        time.sleep(0.1)
+    assert not process_alive(child_pid)
+
+
+def test_cancellation_kills_the_command():
+    """Test that cancelling the caller stops the command instead of leaving it running."""
+    async def scenario():
+        started = asyncio.Event()
+        pids = []
+
+        def on_stdout(text):
+            pids.append(int(text.split()[0]))
+            started.set()
+
+        task = asyncio.create_task(run_command(
+            python("import os, time; print(os.getpid(), flush=True); time.sleep(60)"),
+            on_stdout=on_stdout
+        ))
+        await asyncio.wait_for(started.wait(), timeout=10)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return pids[0]
+
+    pid = asyncio.run(scenario())
+
+    assert not process_alive(pid)
+
+
+def test_missing_program_raises():
+    """Test that a program that cannot be started raises instead of returning a result."""
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(run_command(["ghook-no-such-program"]))
+
+
+def test_runner_applies_defaults_and_keeps_records():
+    """Test that CommandRunner passes its defaults, records timings and reports each result."""
+    finished = []
+    runner = CommandRunner(timeout=5, max_output_bytes=10, history=2, on_finish=finished.append)
+
+    async def scenario():
+        for i in range(3):
+            await runner.run(python(f"print('{i}' * 50)"))
+
+    asyncio.run(scenario())
+
+    assert len(finished) == 3
+    assert all(result.stdout_bytes == 51 and "omitted" in result.stdout for result in finished)
+    assert len(runner.records) == 2
+    assert all(record["returncode"] == 0 for record in runner.records)
+
+
+def test_measured_command_reports_cpu_time_and_peak_memory():
+    """Test that measure=True records the CPU time and peak RSS of the command and its children."""
+    code = (
+        "import subprocess, sys, time\n"
+        "subprocess.run([sys.executable, '-c', 'x = bytearray(64 * 1024 * 1024); sum(range(3000000))'])\n"
+        "print('done'); sys.exit(4)\n"
+    )
+    result = asyncio.run(run_command(python(code), measure=True))
+
+    assert result.returncode == 4
+    assert result.stdout == "done\n"
+    assert result.usage.cpu_time > 0
+    assert result.usage.max_rss_kb > 64 * 1024
+    assert result.to_dict()["usage"]["max_rss_kb"] == result.usage.max_rss_kb
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(run_command(["ghook-no-such-program"], measure=True))
+
+
+def test_measured_command_that_times_out_still_reports_usage():
+    """Test that the usage of a timed out command is read back without blocking the event loop."""
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await run_command(python("import time; time.sleep(30)"), timeout=0.5, kill_grace=0.5, measure=True)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+
+    assert result.timed_out
+    assert result.usage.max_rss_kb > 0
+    # The loop kept running while the command was measured
+    assert ticks > 10
@@ -0,0 +1,506 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from sdlc import (
+    CONTINUE_ON_FAILURE,
+    Checkpoint,
+    CopilotUsage,
+    LineSplitter,
+    LogWriter,
+    Stage,
+    StageScheduler,
+    StageOutputScanner,
+    StageResponse,
+    WorkflowOrchestrator,
+    collect_stage_stats,
+    format_batch_summary,
+    parse_duration,
+    read_events,
+    render_log,
+    run_batch,
+    stats_main,
+)
+from stage_cache import StageCache
+
+
+def python(code: str) -> list[str]:
+    """Build a command that runs a Python snippet in place of copilot."""
+    return [sys.executable, "-c", code]
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    """WorkflowOrchestrator writing its logs under a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    orchestrator = WorkflowOrchestrator("test1234", "add a feature", echo=False)
+    yield orchestrator
+    orchestrator.close()
+
+
+def test_line_splitter_reassembles_chunks_and_bounds_long_lines():
+    """Test that chunks are split into lines and overlong partial lines are passed on in pieces."""
+    lines = []
+    splitter = LineSplitter(lines.append, max_line_chars=5)
+
+    splitter.feed("one\ntw")
+    splitter.feed("o\nabcdefghij")
+    splitter.feed("kl")
+    splitter.close()
+
+    assert lines == ["one", "two", "abcde", "fghij", "kl"]
+
+
+def test_scanner_keeps_first_spec_path_and_branch_name():
+    """Test that the scanner detects the spec path, branch name and implementation activity line by line."""
+    scanner = StageOutputScanner()
+    for line in [
+        "● Reading the prompt",
+        "✓ Create specs/add-logging.md (+40)",
+        "Created and checked out branch: `feature/add-logging`",
+        "See also specs/other.md and branch: other",
+        "✓ Create src/tool.py",
+    ]:
+        scanner.scan(line)
+
+    assert scanner.spec_path == "specs/add-logging.md"
+    assert scanner.branch_name == "feature/add-logging"
+    assert scanner.implementation_patterns == [r'Create src/[\w.-]+\.py', '✓ Create src/']
+
+
+def test_parsers_fall_back_to_stored_output():
+    """Test that StageResponse parsers still work on output that was not scanned."""
+    response = StageResponse(
+        stage_name="Feature Planning",
+        success=True,
+        stdout="done\n`specs/feature.md`\nbranch: feature/x\n"
+    )
+
+    assert response.parse_spec_path() == "specs/feature.md"
+    assert response.parse_branch_name() == "feature/x"
+
+
+def test_stage_output_is_streamed_to_log_and_scanned(orchestrator):
+    """Test that a stage's output reaches the log and its spec path is detected while it streams."""
+    command = python(
+        "import sys\n"
+        "print('working', flush=True)\n"
+        "print('x' * 400000)\n"
+        "print('Created specs/streamed-feature.md', flush=True)\n"
+        "print('Total duration (API): 1s', file=sys.stderr)\n"
+    )
+
+    response = asyncio.run(orchestrator.run_stage("Feature Planning", command))
+
+    assert response.success
+    assert response.spec_path == "specs/streamed-feature.md"
+    # Only a bounded amount of output is kept in memory
+    assert len(response.stdout) < 300 * 1024
+    assert "bytes omitted" in response.stdout
+    assert response.stderr == "Total duration (API): 1s\n"
+    log = orchestrator.log_file.read_text()
+    assert "x" * 400000 in log
+    assert "**Output:**\n```\nworking\n" in log
+    assert "Created specs/streamed-feature.md\n```\n\n" in log
+    # Stderr is streamed into its own block before the stage ends, not copied again at the end
+    assert "**Errors:**\n```\nTotal duration (API): 1s\n```\n\n**Status:** ✓ Success" in log
+    assert log.count("**Errors:**") == 1
+
+
+def test_failed_stage_is_logged(orchestrator):
+    """Test that a failing command produces an unsuccessful response and a failed log entry."""
+    response = asyncio.run(orchestrator.run_stage("Implementation", python("import sys; sys.exit(2)")))
+
+    assert not response.success
+    assert "**Status:** ✗ Failed" in orchestrator.log_file.read_text()
+
+
+def test_log_writer_buffers_output_until_a_flush_point(tmp_path, monkeypatch):
+    """Test that streamed output is buffered, flushed on a timer and synced at the end of a stage."""
+    syncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: syncs.append(fd) or real_fsync(fd))
+    log_file = tmp_path / "log.md"
+    writer = LogWriter(log_file, flush_interval=0.05)
+
+    async def scenario():
+        writer.write_stage_start("Build")
+        writer.write_command(["copilot", "-p", "build"])
+        writer.write_output_chunk("first line\n")
+        buffered = log_file.read_text()
+        await asyncio.sleep(0.2)
+        return buffered, log_file.read_text()
+
+    buffered, after_timer = asyncio.run(scenario())
+
+    assert "**Command:**" in buffered
+    assert "first line" not in buffered
+    assert after_timer.endswith("first line\n")
+    assert syncs == []
+
+    writer.write_result("", True, 1.5)
+    writer.write_stage_end("Build", True)
+    assert "**Build ✓ Completed**" in log_file.read_text()
+    assert len(syncs) == 1
+
+    writer.close()
+    writer.close()
+
+
+def test_scanner_parses_copilot_usage_from_stderr():
+    """Test that copilot's usage summary lines are collected from error output."""
+    scanner = StageOutputScanner()
+    for line in [
+        "",
+        "Total usage est:       3 Premium requests",
+        "Total duration (API):  1m 6.9s",
+        "Total duration (wall): 1m 30.7s",
+        "Usage by model:",
+        "    claude-haiku-4.5     0 input, 74.0k output (Est. 2 Premium requests)",
+    ]:
+        scanner.scan_stderr(line)
+
+    assert scanner.usage == {
+        "Total usage est": "3 Premium requests",
+        "Total duration (API)": "1m 6.9s",
+        "Total duration (wall)": "1m 30.7s",
+    }
+
+
+def test_events_are_recorded_and_markdown_is_rendered_from_them(orchestrator, tmp_path):
+    """Test that a run writes a JSONL event stream from which the markdown log can be rebuilt."""
+    command = python(
+        "import sys\n"
+        "print('Created specs/event-log.md')\n"
+        "print('Total duration (API):  2.5s', file=sys.stderr)\n"
+    )
+
+    async def scenario():
+        orchestrator.events.emit("workflow_start", workflow_id="test1234", user_input="add a feature")
+        await orchestrator.run_stage("Feature Planning", command)
+        orchestrator.events.emit("workflow_end", success=True)
+
+    asyncio.run(scenario())
+    orchestrator.close()
+
+    events = read_events(orchestrator.event_file)
+    kinds = [event["event"] for event in events]
+    # Output arrives in however many chunks the pipe delivers
+    assert [kind for i, kind in enumerate(kinds) if kind != "output" or kinds[i - 1] != "output"] == [
+        "workflow_start", "stage_start", "command", "output", "stage_end", "workflow_end"
+    ]
+    outputs = [event for event in events if event["event"] == "output"]
+    assert "".join(event["text"] for event in outputs if event.get("stream", "stdout") == "stdout") == "Created specs/event-log.md\n"
+    assert "".join(event["text"] for event in outputs if event.get("stream") == "stderr") == "Total duration (API):  2.5s\n"
+    assert all(later["monotonic"] >= earlier["monotonic"] for earlier, later in zip(events, events[1:]))
+    stage_end = events[-2]
+    assert stage_end["exit_code"] == 0
+    assert stage_end["stdout_bytes"] == len("Created specs/event-log.md\n")
+    assert stage_end["spec_path"] == "specs/event-log.md"
+    assert stage_end["usage"] == {"Total duration (API)": "2.5s"}
+    assert "stderr" not in stage_end
+
+    rendered = tmp_path / "rendered.md"
+    render_log(orchestrator.event_file, rendered)
+    assert rendered.read_text() == orchestrator.log_file.read_text()
+
+
+def test_copilot_usage_summary_is_parsed_into_numbers():
+    """Test that durations and premium request counts from copilot's summary become typed fields."""
+    usage = CopilotUsage.from_summary({
+        "Total usage est": "3 Premium requests",
+        "Total duration (API)": "1m 6.9s",
+        "Total duration (wall)": "1h 2m 3s",
+    })
+
+    assert usage.premium_requests == 3
+    assert usage.api_duration == pytest.approx(66.9)
+    assert usage.wall_duration == 3723
+    assert CopilotUsage.from_summary({"Premium requests": "1.5"}).premium_requests == 1.5
+    assert CopilotUsage.from_summary({}) == CopilotUsage()
+    assert parse_duration("unknown") is None
+
+
+def test_stage_records_resource_usage_and_stats_aggregate_it(orchestrator, tmp_path, capsys):
+    """Test that a stage records CPU time, peak RSS and premium requests, and stats summarises them by stage."""
+    command = python(
+        "import sys\n"
+        "sum(range(1000000))\n"
+        "print('Total usage est:       2 Premium requests', file=sys.stderr)\n"
+        "print('Total duration (API):  4.5s', file=sys.stderr)\n"
+    )
+
+    response = asyncio.run(orchestrator.run_stage("Feature Planning", command))
+    asyncio.run(orchestrator.run_stage("Feature Planning", python("import sys; sys.exit(1)")))
+    orchestrator.close()
+
+    assert response.cpu_time > 0
+    assert response.max_rss_kb > 0
+    assert response.copilot == CopilotUsage(premium_requests=2, api_duration=4.5)
+    assert "premium requests" in orchestrator.log_file.read_text()
+
+    [stage] = collect_stage_stats(tmp_path / "logs")
+    assert stage["stage"] == "Feature Planning"
+    assert stage["runs"] == 2
+    assert stage["failures"] == 1
+    assert stage["p50_seconds"] <= stage["p95_seconds"]
+    assert stage["premium_requests"] == 2
+    assert stage["premium_requests_per_run"] == 2
+
+    assert stats_main(["--logs", str(tmp_path / "logs")]) == 0
+    assert "Feature Planning" in capsys.readouterr().out
+
+
+FAKE_COPILOT = """
+import pathlib, sys
+prompt = sys.argv[sys.argv.index('-p') + 1]
+with open('calls.txt', 'a') as calls:
+    calls.write(prompt.split('.github/prompts/')[1].split('.')[0] + '\\n')
+print('Created specs/resume-test.md')
+print('Created and checked out branch: feature/resume-test')
+if 'pr.prompt' in prompt and pathlib.Path('fail_pr').exists():
+    sys.exit(1)
+"""
+
+
+def test_workflow_resumes_from_checkpoint(tmp_path, monkeypatch):
+    """Test that a resumed workflow skips completed stages and --from-stage re-runs later ones."""
+    monkeypatch.chdir(tmp_path)
+    script = tmp_path / "copilot.py"
+    script.write_text(FAKE_COPILOT)
+    (tmp_path / "fail_pr").touch()
+
+    def run(from_stage=None):
+        orchestrator = WorkflowOrchestrator("resume01", "add a feature", echo=False, from_stage=from_stage)
+        orchestrator.command_builder.base_command = [sys.executable, str(script)]
+        try:
+            return asyncio.run(orchestrator.run_workflow()), orchestrator
+        finally:
+            orchestrator.close()
+
+    def calls():
+        return (tmp_path / "calls.txt").read_text().split()
+
+    run()
+    assert calls() == ["feature", "branch", "build", "document", "pr"]
+    checkpoint = Checkpoint.load(tmp_path / "logs" / "resume01" / "checkpoint.json")
+    assert checkpoint.spec_path == "specs/resume-test.md"
+    assert checkpoint.branch_name == "feature/resume-test"
+    assert checkpoint.stages["Pull Request"]["exit_code"] == 1
+    assert not checkpoint.completed("Pull Request")
+    assert len(checkpoint.stages["Feature Planning"]["stdout_sha256"]) == 64
+
+    (tmp_path / "fail_pr").unlink()
+    success, orchestrator = run()
+    assert success
+    assert calls()[5:] == ["pr"]
+    assert orchestrator.spec_path == "specs/resume-test.md"
+    assert "**Skipped:** completed in an earlier run" in orchestrator.log_file.read_text()
+    assert Checkpoint.load(orchestrator.checkpoint.path).completed("Pull Request")
+
+    run(from_stage="Documentation")
+    assert calls()[6:] == ["document", "pr"]
+
+
+def fake_stage(name, log, outcomes=None, depends_on=(), **options):
+    """Build a stage that records when it runs and succeeds or fails as listed in outcomes."""
+    outcomes = list(outcomes or [True])
+
+    async def run(_orchestrator):
+        log.append(("start", name))
+        await asyncio.sleep(0.05)
+        log.append(("end", name))
+        return StageResponse(stage_name=name, success=outcomes.pop(0) if len(outcomes) > 1 else outcomes[0])
+
+    return Stage(name.lower(), name, run, depends_on=depends_on, **options)
+
+
+def run_scheduler(scheduler):
+    """Run a scheduler with stages that take no orchestrator."""
+    return asyncio.run(scheduler.run(lambda stage: stage.run(None)))
+
+
+def test_scheduler_runs_independent_stages_concurrently():
+    """Test that ready stages run in parallel up to the limit and dependents wait for their dependencies."""
+    log = []
+    scheduler = StageScheduler([
+        fake_stage("Plan", log),
+        fake_stage("Docs", log, depends_on=("Plan",)),
+        fake_stage("Notes", log, depends_on=("Plan",)),
+        fake_stage("Draft", log, depends_on=("Plan",)),
+        fake_stage("Ship", log, depends_on=("Docs", "Notes", "Draft")),
+    ], max_parallel=2)
+
+    results = run_scheduler(scheduler)
+
+    assert all(response.success for response in results.values())
+    assert log[:3] == [("start", "Plan"), ("end", "Plan"), ("start", "Docs")]
+    assert log[3] == ("start", "Notes")
+    running = peak = 0
+    for kind, _ in log:
+        running += 1 if kind == "start" else -1
+        peak = max(peak, running)
+    assert peak == 2
+    assert log[-2:] == [("start", "Ship"), ("end", "Ship")]
+
+
+def test_scheduler_applies_failure_policies_and_retries():
+    """Test that a retried stage can recover, continue-on-failure lets dependents run and fail-fast stops the graph."""
+    log = []
+    scheduler = StageScheduler([
+        fake_stage("Flaky", log, outcomes=[False, True], retries=2),
+        fake_stage("Optional", log, outcomes=[False], depends_on=("Flaky",), policy=CONTINUE_ON_FAILURE),
+        fake_stage("Required", log, outcomes=[False], depends_on=("Optional",)),
+        fake_stage("Never", log, depends_on=("Required",)),
+    ])
+
+    results = run_scheduler(scheduler)
+
+    assert [name for kind, name in log if kind == "start"] == ["Flaky", "Flaky", "Optional", "Required"]
+    assert results["Flaky"].success
+    assert not results["Optional"].success
+    assert scheduler.failed_stage == "Required"
+    assert "Never" not in results
+    assert scheduler.dependents("Optional") == ["Optional", "Required", "Never"]
+
+
+def test_scheduler_rejects_invalid_graphs():
+    """Test that unknown dependencies and cycles are reported when the graph is built."""
+    log = []
+    with pytest.raises(ValueError, match="unknown"):
+        StageScheduler([fake_stage("A", log, depends_on=("Missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        StageScheduler([fake_stage("A", log, depends_on=("B",)), fake_stage("B", log, depends_on=("A",))])
+
+
+def test_log_labels_output_of_concurrent_stages(tmp_path):
+    """Test that output and status of a stage other than the last one started are labelled with its name."""
+    writer = LogWriter(tmp_path / "log.md")
+    for event in [
+        {"event": "stage_start", "stage": "Docs"},
+        {"event": "stage_start", "stage": "Notes"},
+        {"event": "output", "stage": "Docs", "text": "docs\n"},
+        {"event": "output", "stage": "Notes", "text": "notes\n"},
+        {"event": "stage_end", "stage": "Docs", "success": True},
+    ]:
+        writer.handle({"time": 0, **event})
+    writer.close()
+
+    log = (tmp_path / "log.md").read_text()
+    assert "**Output (Docs):**\n```\ndocs\n```\n\n**Output:**\n```\nnotes\n```\n\n**Status (Docs):** ✓ Success" in log
+
+
+GIT = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+
+
+def make_repo(tmp_path, monkeypatch):
+    """Create a git repository with one commit, change into it and put a fake copilot on PATH."""
+    repo = tmp_path / "repo"
+    (repo / ".github" / "prompts").mkdir(parents=True)
+    (repo / ".github" / "prompts" / "feature.prompt.md").write_text("Plan the feature.\n")
+    subprocess.run(GIT + ["init", "-q"], cwd=repo, check=True)
+    subprocess.run(GIT + ["add", "."], cwd=repo, check=True)
+    subprocess.run(GIT + ["commit", "-q", "-m", "init"], cwd=repo, check=True)
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    copilot = bin_dir / "copilot"
+    copilot.write_text(
+        f"#!{sys.executable}\n" + FAKE_COPILOT +
+        "if 'broken' in prompt:\n    sys.exit(1)\n"
+        "if 'stuck' in prompt:\n    import time\n    time.sleep(60)\n"
+        "if 'feature.prompt' in prompt:\n"
+        "    pathlib.Path('specs').mkdir(exist_ok=True)\n"
+        "    pathlib.Path('specs/resume-test.md').write_text('# Spec\\n')\n"
+    )
+    copilot.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.chdir(repo)
+    return repo
+
+
+def test_batch_runs_each_workflow_in_its_own_worktree(tmp_path, monkeypatch, capsys):
+    """Test that batch mode isolates workflows in worktrees, removes successful ones on cleanup and summarises outcomes."""
+    repo = make_repo(tmp_path, monkeypatch)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    rows = asyncio.run(run_batch(["add a", "broken thing", "add c", "stuck thing"], max_concurrent=2, cleanup=True, stage_timeout=2))
+    output = capsys.readouterr().out
+
+    assert [row["status"] for row in rows] == ["success", "failed", "success", "failed"]
+    assert rows[1]["failed_stage"] == "Feature Planning"
+    # A stuck stage is killed instead of holding its slot
+    assert rows[3]["failed_stage"] == "Feature Planning"
+    assert rows[3]["duration"] < 30
+    # Concurrent workflows' progress lines can be told apart
+    ids = [row["workflow_id"] for row in rows]
+    assert all(any(workflow_id in line for workflow_id in ids) for line in output.splitlines() if line)
+    assert "=" * 60 not in output
+    assert rows[0]["branch_name"] == "feature/resume-test"
+    assert rows[0]["worktree"] is None
+    failed_worktree = tmp_path / "cache" / "ghook" / "worktrees" / f"repo-{rows[1]['workflow_id']}"
+    assert rows[1]["worktree"] == str(failed_worktree.resolve())
+    assert (failed_worktree / "calls.txt").read_text().split() == ["feature"]
+    assert not (repo / "calls.txt").exists()
+    # Nothing created by the batch shows up in the checkout itself
+    status = subprocess.run(GIT + ["status", "--porcelain"], cwd=repo, capture_output=True, text=True, check=True)
+    assert status.stdout.split() == ["??", "logs/"]
+    assert len(set(ids)) == 4
+    summary = format_batch_summary(rows)
+    assert "2 of 4 workflows succeeded" in summary
+    assert rows[1]["workflow_id"] in summary
+
+
+def test_feature_stage_is_restored_from_cache(tmp_path, monkeypatch):
+    """Test that an unchanged feature request reuses the cached spec and output, and that dirty trees and bypass skip the cache."""
+    repo = make_repo(tmp_path, monkeypatch)
+    cache = StageCache(tmp_path / "cache")
+
+    def feature(workflow_id, **options):
+        orchestrator = WorkflowOrchestrator(workflow_id, "add a feature", echo=False, cache=cache, **options)
+        try:
+            return asyncio.run(orchestrator.run_feature_stage()), orchestrator
+        finally:
+            orchestrator.close()
+
+    def calls():
+        return (repo / "calls.txt").read_text().split()
+
+    first, _ = feature("cache001")
+    assert not first.cached
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+
+    (repo / "specs" / "resume-test.md").unlink()
+    second, orchestrator = feature("cache002")
+    assert second.cached and second.success
+    assert calls() == ["feature"]
+    assert orchestrator.spec_path == "specs/resume-test.md"
+    assert (repo / "specs" / "resume-test.md").read_text() == "# Spec\n"
+    assert second.stdout_digest == first.stdout_digest
+    log = orchestrator.log_file.read_text()
+    assert "Created specs/resume-test.md" in log
+    assert "**Cached:**" in log
+    assert collect_stage_stats(repo / "logs")[0]["runs"] == 1
+
+    feature("cache003", bypass_cache=True)
+    assert calls() == ["feature", "feature"]
+
+    (repo / ".github" / "prompts" / "feature.prompt.md").write_text("Plan differently.\n")
+    subprocess.run(GIT + ["commit", "-q", "-am", "new prompt"], cwd=repo, check=True)
+    changed, _ = feature("cache004")
+    assert not changed.cached
+
+    (repo / ".github" / "prompts" / "feature.prompt.md").write_text("Uncommitted.\n")
+    dirty, _ = feature("cache005")
+    assert not dirty.cached
+    assert calls() == ["feature"] * 4
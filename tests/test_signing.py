@@ -0,0 +1,69 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import hashlib
+import hmac
+
+import pytest
+
+from signing import WebhookKeyring
+
+
+def sign(body: bytes, secret: str) -> str:
+    """Return the hex HMAC-SHA256 digest GitHub would send."""
+    return hmac.new(secret.encode(), msg=body, digestmod=hashlib.sha256).hexdigest()
+
+
+def test_match_finds_any_active_secret():
+    """Test that a body signed with a non-preferred secret still matches."""
+    keyring = WebhookKeyring(["new-secret", "old-secret"])
+    body = b'{"action": "opened"}'
+    
+    preferred = keyring.preferred()
+    old_key = keyring.match(body, sign(body, "old-secret"))
+    
+    assert old_key is not None
+    assert old_key is not preferred
+    assert keyring.match(body, sign(body, "old-secret"), skip=old_key) is None
+    assert keyring.match(body, sign(body, "unknown")) is None
+
+
+def test_record_hit_moves_key_to_front():
+    """Test that the most recently matched key is tried first."""
+    keyring = WebhookKeyring(["new-secret", "old-secret"])
+    body = b"{}"
+    old_key = keyring.match(body, sign(body, "old-secret"))
+    
+    keyring.record_hit(old_key)
+    
+    assert keyring.preferred() is old_key
+    assert keyring.stats()[0]["hits"] == 1
+
+
+def test_secrets_file_is_reloaded_and_counters_survive(tmp_path):
+    """Test that file changes take effect and existing keys keep their hit counts."""
+    secrets_file = tmp_path / "secrets"
+    secrets_file.write_text("# comment\nfile-secret\n")
+    keyring = WebhookKeyring(["env-secret"], secrets_file=secrets_file, reload_interval=0)
+    body = b"{}"
+    file_key = keyring.match(body, sign(body, "file-secret"))
+    keyring.record_hit(file_key)
+    
+    secrets_file.write_text("file-secret\nnewer-secret\n")
+    keyring._file_mtime = None  # force the change to be noticed regardless of mtime resolution
+    keyring.maybe_reload()
+    
+    assert len(keyring.stats()) == 3
+    assert keyring.match(body, sign(body, "newer-secret")) is not None
+    assert keyring.match(body, sign(body, "file-secret")).hits == 1
+
+
+def test_empty_keyring_is_rejected():
+    """Test that a keyring without any secret raises ValueError."""
+    with pytest.raises(ValueError):
+        WebhookKeyring([""])
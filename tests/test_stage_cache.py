@@ -0,0 +1,52 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import os
+import time
+
+from stage_cache import StageCache, cache_key
+
+
+def test_cache_key_depends_on_every_input_but_not_their_order():
+    """Test that keys match for the same inputs and differ when any input changes."""
+    key = cache_key(prompt="plan it", model="m", tree="abc")
+
+    assert key == cache_key(tree="abc", model="m", prompt="plan it")
+    assert key != cache_key(prompt="plan it", model="m", tree="abd")
+    assert key != cache_key(prompt="plan it", model="m", tree="abc", prompt_file=None)
+
+
+def test_entries_round_trip_and_bad_entries_miss(tmp_path):
+    """Test that a stored entry is returned and a missing or corrupt one is a miss."""
+    cache = StageCache(tmp_path / "cache")
+    cache.put("k1", {"spec_path": "specs/a.md", "stdout": "done\n"})
+    (tmp_path / "cache" / "k2.json").write_text("{not json")
+
+    assert cache.get("k1") == {"spec_path": "specs/a.md", "stdout": "done\n"}
+    assert cache.get("k2") is None
+    assert cache.get("missing") is None
+
+
+def test_least_recently_used_entries_are_evicted_above_the_size_bound(tmp_path):
+    """Test that storing past max_bytes evicts the entries used longest ago, never the new one."""
+    cache = StageCache(tmp_path, max_bytes=2500)
+    now = time.time()
+    for age, key in [(30, "old"), (20, "used"), (10, "recent")]:
+        cache.put(key, {"stdout": "x" * 1000})
+        os.utime(tmp_path / f"{key}.json", (now - age, now - age))
+    # Reading refreshes an entry's last use
+    cache.get("used")
+
+    cache.put("new", {"stdout": "y" * 1000})
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["new", "used"]
+    assert cache.size() <= 2500
+
+    small = StageCache(tmp_path / "small", max_bytes=10)
+    small.put("big", {"stdout": "z" * 100})
+    assert small.get("big") is not None
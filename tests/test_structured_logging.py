@@ -0,0 +1,90 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import io
+import json
+import logging
+
+import pytest
+
+from structured_logging import (
+    BannerFormatter,
+    JsonFormatter,
+    SamplingFilter,
+    log_event,
+    parse_sample_rates,
+    setup_logging,
+)
+
+
+def make_record(message: str, level: int = logging.INFO, **fields) -> logging.LogRecord:
+    """Create a log record carrying structured fields."""
+    record = logging.LogRecord("ghook.test", level, __file__, 1, message, None, None)
+    record.fields = fields
+    return record
+
+
+def test_json_formatter_truncates_long_fields():
+    """Test that large string fields are truncated and other fields kept as-is."""
+    formatter = JsonFormatter(max_field_chars=10)
+    
+    line = formatter.format(make_record("issue opened", issue_body="x" * 50, number=42))
+    entry = json.loads(line)
+    
+    assert entry["msg"] == "issue opened"
+    assert entry["level"] == "info"
+    assert entry["number"] == 42
+    assert entry["issue_body"].startswith("x" * 10)
+    assert "truncated 40 chars" in entry["issue_body"]
+
+
+def test_banner_formatter_renders_issue_banner():
+    """Test that the optional banner formatter keeps the human-readable output."""
+    formatter = BannerFormatter()
+    
+    text = formatter.format(make_record(
+        "issue opened", kind="issue_opened", repository="octocat/Hello-World", number=42, issue_body="Hello"
+    ))
+    
+    assert "🎉 NEW ISSUE CREATED!" in text
+    assert "Repository:  octocat/Hello-World" in text
+    assert "Number:      #42" in text
+    assert "Body:\nHello" in text
+
+
+def test_sampling_filter_drops_sampled_events_but_keeps_warnings():
+    """Test that sampling applies per event and never drops warnings."""
+    sampling = SamplingFilter({"push": 0.0})
+    
+    assert sampling.filter(make_record("push received", event="push")) is False
+    assert sampling.filter(make_record("issue opened", event="issues.opened")) is True
+    assert sampling.filter(make_record("push failed", level=logging.WARNING, event="push")) is True
+
+
+def test_parse_sample_rates():
+    """Test parsing of the LOG_SAMPLE_RATES format."""
+    assert parse_sample_rates("push=0.1, workflow_run=0") == {"push": 0.1, "workflow_run": 0.0}
+    assert parse_sample_rates("") == {}
+    with pytest.raises(ValueError):
+        parse_sample_rates("push=2")
+    with pytest.raises(ValueError):
+        parse_sample_rates("push")
+
+
+def test_pipeline_writes_from_background_thread():
+    """Test that records logged through the queue reach the output once flushed."""
+    stream = io.StringIO()
+    pipeline = setup_logging(log_format="json", stream=stream)
+    
+    log_event(logging.getLogger("ghook.test"), "clone finished", status="cloned")
+    pipeline.stop()
+    
+    entry = json.loads(stream.getvalue().strip())
+    assert entry["logger"] == "ghook.test"
+    assert entry["status"] == "cloned"
+    assert pipeline.dropped == 0
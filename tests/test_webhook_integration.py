@@ -13,6 +13,8 @@ import httpx
 import json
 import os
 import shutil
+import sqlite3
+import time
 from pathlib import Path
 from tests.conftest import generate_signature, create_issue_payload
 
@@ -49,6 +51,30 @@ def test_valid_webhook_with_correct_signature(webhook_server):
     assert data["repository"]["full_name"] == "test/test-repo"
 
 
+def test_issue_with_reordered_keys_is_handled(webhook_server):
+    """Test that an issues.opened delivery is handled even when "action" is not its first key."""
+    server = webhook_server
+    
+    payload = create_issue_payload()
+    reordered = {"zen": "Keep it logically awesome.", **{k: v for k, v in payload.items() if k != "action"}, "action": "opened"}
+    payload_bytes = json.dumps(reordered).encode()
+    signature = generate_signature(payload_bytes, server["secret"])
+    
+    response = httpx.post(
+        f"{server['url']}/webhook",
+        content=payload_bytes,
+        headers={
+            "X-Hub-Signature-256": signature,
+            "X-GitHub-Event": "issues",
+            "Content-Type": "application/json"
+        },
+        timeout=5.0
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+
+
 def test_invalid_signature_returns_401(webhook_server):
     """Test that a webhook request with invalid signature returns 401."""
     server = webhook_server
@@ -320,3 +346,430 @@ def test_path_traversal_prevention(webhook_server):
     if "clone" in data:
         assert data["clone"]["status"] == "error"
         assert "Invalid" in data["clone"]["message"]
+
+
+def test_clone_job_is_queued_and_reports_result(clone_webhook_server):
+    """Test that cloning returns 202 with a job id and the result is available later."""
+    server = clone_webhook_server
+    
+    # Invalid repository path fails fast without touching gh or the network
+    payload = create_issue_payload(
+        repository={
+            "name": "../../etc/passwd",
+            "full_name": "malicious/../../../etc/passwd",
+            "owner": {
+                "login": "../../../etc"
+            }
+        }
+    )
+    payload_bytes = json.dumps(payload).encode()
+    signature = generate_signature(payload_bytes, server["secret"])
+    
+    response = httpx.post(
+        f"{server['url']}/webhook",
+        content=payload_bytes,
+        headers={
+            "X-Hub-Signature-256": signature,
+            "X-GitHub-Event": "issues",
+            "Content-Type": "application/json"
+        },
+        timeout=5.0
+    )
+    
+    # The webhook answers before the clone runs
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "success"
+    job_id = data["clone"]["job_id"]
+    assert data["clone"]["status"] in ["queued", "running", "done"]
+    
+    # Poll the status endpoint until the job finishes
+    for _ in range(50):
+        status = httpx.get(f"{server['url']}/clone/{job_id}", timeout=5.0)
+        assert status.status_code == 200
+        job = status.json()
+        if job["status"] == "done":
+            break
+        time.sleep(0.1)
+    
+    assert job["status"] == "done"
+    assert job["result"]["status"] == "error"
+    assert "Invalid" in job["result"]["message"]
+
+
+def test_unknown_clone_job_returns_404(webhook_server):
+    """Test that the clone status endpoint returns 404 for unknown job ids."""
+    server = webhook_server
+    
+    response = httpx.get(f"{server['url']}/clone/does-not-exist", timeout=5.0)
+    
+    assert response.status_code == 404
+
+
+def test_health_endpoint_reports_gh_cli_status(clone_webhook_server):
+    """Test that the health endpoint exposes the cached gh CLI probe."""
+    server = clone_webhook_server
+    
+    response = httpx.get(f"{server['url']}/health", timeout=5.0)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    # Startup check warms the cache when cloning is enabled
+    assert data["gh_cli"]["available"] == bool(shutil.which("gh"))
+    assert data["gh_cli"]["checked_at"] is not None
+    assert data["clone"]["enabled"] is True
+
+
+def test_queued_event_is_acknowledged_then_processed(queued_webhook_server):
+    """Test that the durable queue acknowledges with 202 and processes the event afterwards."""
+    server = queued_webhook_server
+    
+    payload = create_issue_payload()
+    payload_bytes = json.dumps(payload).encode()
+    signature = generate_signature(payload_bytes, server["secret"])
+    
+    response = httpx.post(
+        f"{server['url']}/webhook",
+        content=payload_bytes,
+        headers={
+            "X-Hub-Signature-256": signature,
+            "X-GitHub-Event": "issues",
+            "X-GitHub-Delivery": "72d3162e-cc78-11e3-81ab-4c9367dc0958",
+            "Content-Type": "application/json"
+        },
+        timeout=5.0
+    )
+    
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "queued"
+    assert data["delivery_id"] == "72d3162e-cc78-11e3-81ab-4c9367dc0958"
+    
+    # The consumer drains the queue in the background
+    for _ in range(50):
+        queue_stats = httpx.get(f"{server['url']}/health", timeout=5.0).json()["event_queue"]
+        if queue_stats["done"] == 1:
+            break
+        time.sleep(0.1)
+    
+    assert queue_stats["enabled"] is True
+    assert queue_stats["done"] == 1
+    assert queue_stats["pending"] == 0
+
+
+def test_event_that_could_not_be_queued_is_accepted_on_redelivery(queued_webhook_server, tmp_path):
+    """Test that a delivery whose queue write failed is not answered as a duplicate when redelivered."""
+    server = queued_webhook_server
+    
+    payload_bytes = json.dumps(create_issue_payload()).encode()
+    headers = {
+        "X-Hub-Signature-256": generate_signature(payload_bytes, server["secret"]),
+        "X-GitHub-Event": "issues",
+        "X-GitHub-Delivery": "queue-write-fails",
+        "Content-Type": "application/json"
+    }
+    
+    # Hold the queue's write lock so the append times out ("database is locked")
+    blocker = sqlite3.connect(tmp_path / "events.db", isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+    try:
+        failed = httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=30.0)
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+    
+    assert failed.status_code == 500
+    
+    redelivered = httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=5.0)
+    assert redelivered.status_code == 202
+    assert redelivered.json()["status"] == "queued"
+
+
+def test_redelivered_event_is_short_circuited(webhook_server):
+    """Test that a delivery id seen before returns a cheap duplicate response."""
+    server = webhook_server
+    
+    payload = create_issue_payload()
+    payload_bytes = json.dumps(payload).encode()
+    signature = generate_signature(payload_bytes, server["secret"])
+    headers = {
+        "X-Hub-Signature-256": signature,
+        "X-GitHub-Event": "issues",
+        "X-GitHub-Delivery": "5a7c2f4e-0d7a-11ef-8f4c-d2a1b3c4e5f6",
+        "Content-Type": "application/json"
+    }
+    
+    first = httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=5.0)
+    second = httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=5.0)
+    
+    assert first.status_code == 200
+    assert first.json()["status"] == "success"
+    assert second.status_code == 200
+    assert second.json()["status"] == "duplicate"
+    assert second.json()["delivery_id"] == "5a7c2f4e-0d7a-11ef-8f4c-d2a1b3c4e5f6"
+    
+    # The duplicate is counted
+    dedup = httpx.get(f"{server['url']}/health", timeout=5.0).json()["dedup"]
+    assert dedup["duplicates"] == 1
+    assert dedup["unique"] == 1
+
+
+def test_duplicate_check_happens_after_signature_verification(webhook_server):
+    """Test that an unsigned request cannot poison the delivery cache."""
+    server = webhook_server
+    
+    payload_bytes = json.dumps(create_issue_payload()).encode()
+    headers = {
+        "X-GitHub-Event": "issues",
+        "X-GitHub-Delivery": "0b1c2d3e-0d7a-11ef-8f4c-d2a1b3c4e5f6",
+        "Content-Type": "application/json"
+    }
+    
+    forged = httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=5.0)
+    assert forged.status_code == 401
+    
+    headers["X-Hub-Signature-256"] = generate_signature(payload_bytes, server["secret"])
+    genuine = httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=5.0)
+    assert genuine.status_code == 200
+    assert genuine.json()["status"] == "success"
+
+
+@pytest.mark.parametrize("signature", ["sha256", "sha256=abc=def", "sha1=" + "0" * 40, "garbage"])
+def test_malformed_signature_header_returns_401(webhook_server, signature):
+    """Test that malformed signature headers are rejected with 401 instead of a server error."""
+    server = webhook_server
+    
+    payload_bytes = json.dumps(create_issue_payload()).encode()
+    
+    response = httpx.post(
+        f"{server['url']}/webhook",
+        content=payload_bytes,
+        headers={
+            "X-Hub-Signature-256": signature,
+            "X-GitHub-Event": "issues",
+            "Content-Type": "application/json"
+        },
+        timeout=5.0
+    )
+    
+    assert response.status_code == 401
+
+
+def test_oversized_body_returns_413(limited_webhook_server):
+    """Test that bodies over the configured limit are rejected with 413."""
+    server = limited_webhook_server
+    
+    payload = create_issue_payload(issue={"body": "x" * 4096})
+    payload_bytes = json.dumps(payload).encode()
+    signature = generate_signature(payload_bytes, server["secret"])
+    headers = {
+        "X-Hub-Signature-256": signature,
+        "X-GitHub-Event": "issues",
+        "Content-Type": "application/json"
+    }
+    
+    # Rejected from the Content-Length header
+    response = httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=5.0)
+    assert response.status_code == 413
+    
+    # Rejected while streaming a chunked body with no Content-Length
+    def chunked_body():
+        for i in range(0, len(payload_bytes), 512):
+            yield payload_bytes[i:i + 512]
+    
+    response = httpx.post(f"{server['url']}/webhook", content=chunked_body(), headers=headers, timeout=5.0)
+    assert response.status_code == 413
+
+
+def test_body_under_limit_is_accepted(limited_webhook_server):
+    """Test that a streamed body within the limit verifies and is processed."""
+    server = limited_webhook_server
+    
+    payload_bytes = json.dumps(create_issue_payload(issue={"body": "short"})).encode()
+    assert len(payload_bytes) < server["max_body_bytes"]
+    signature = generate_signature(payload_bytes, server["secret"])
+    
+    response = httpx.post(
+        f"{server['url']}/webhook",
+        content=payload_bytes,
+        headers={
+            "X-Hub-Signature-256": signature,
+            "X-GitHub-Event": "issues",
+            "Content-Type": "application/json"
+        },
+        timeout=5.0
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+
+
+def test_rotated_secrets_are_accepted_and_counted(rotating_webhook_server):
+    """Test that deliveries signed with any active secret verify and are counted per key."""
+    server = rotating_webhook_server
+    
+    payload_bytes = json.dumps(create_issue_payload()).encode()
+    
+    def send(secret):
+        return httpx.post(
+            f"{server['url']}/webhook",
+            content=payload_bytes,
+            headers={
+                "X-Hub-Signature-256": generate_signature(payload_bytes, secret),
+                "X-GitHub-Event": "issues",
+                "Content-Type": "application/json"
+            },
+            timeout=5.0
+        )
+    
+    assert send(server["secret"]).status_code == 200
+    assert send(server["previous_secret"]).status_code == 200
+    assert send(server["previous_secret"]).status_code == 200
+    
+    keys = httpx.get(f"{server['url']}/health", timeout=5.0).json()["signing_keys"]
+    assert sorted(key["hits"] for key in keys) == [1, 2]
+    assert {key["source"] for key in keys} == {"env", "file"}
+    # The most recently matched key is tried first
+    assert keys[0]["source"] == "file"
+    assert all("secret" not in key for key in keys)
+    
+    # Retiring the previous secret takes effect without a restart
+    server["secrets_file"].write_text("")
+    time.sleep(0.05)
+    assert send(server["previous_secret"]).status_code == 401
+    assert send(server["secret"]).status_code == 200
+
+
+def test_metrics_endpoint(webhook_server):
+    """Test that /metrics reports request counts, signature failures and phase latencies."""
+    server = webhook_server
+    
+    payload_bytes = json.dumps(create_issue_payload()).encode()
+    headers = {"X-GitHub-Event": "issues", "Content-Type": "application/json"}
+    
+    ok = httpx.post(
+        f"{server['url']}/webhook",
+        content=payload_bytes,
+        headers={**headers, "X-Hub-Signature-256": generate_signature(payload_bytes, server["secret"])},
+        timeout=5.0
+    )
+    assert ok.status_code == 200
+    bad = httpx.post(
+        f"{server['url']}/webhook",
+        content=payload_bytes,
+        headers={**headers, "X-Hub-Signature-256": "sha256=" + "0" * 64},
+        timeout=5.0
+    )
+    assert bad.status_code == 401
+    
+    response = httpx.get(f"{server['url']}/metrics", timeout=5.0)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'ghook_webhook_requests_total{event="issues",action="opened",status="200"}' in text
+    assert 'ghook_webhook_requests_total{event="",action="",status="401"}' in text
+    assert 'ghook_signature_failures_total{reason="mismatch"}' in text
+    assert 'ghook_phase_duration_seconds_count{phase="verify"}' in text
+    assert 'ghook_phase_duration_seconds_count{phase="handler"}' in text
+    assert 'ghook_clone_results_total{status="cloned"} 0' in text
+    assert "ghook_clone_in_flight 0" in text
+
+
+def test_multi_worker_deduplicates_across_workers(multi_worker_webhook_server):
+    """Test that a redelivery is recognised whichever worker process receives it."""
+    server = multi_worker_webhook_server
+    
+    payload_bytes = json.dumps(create_issue_payload()).encode()
+    headers = {
+        "X-Hub-Signature-256": generate_signature(payload_bytes, server["secret"]),
+        "X-GitHub-Event": "issues",
+        "X-GitHub-Delivery": "multi-worker-delivery",
+        "Content-Type": "application/json"
+    }
+    
+    statuses = []
+    for _ in range(6):
+        # A fresh connection per request lets the kernel spread them over the workers
+        response = httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=5.0)
+        assert response.status_code == 200
+        statuses.append(response.json()["status"])
+    
+    assert statuses == ["success"] + ["duplicate"] * 5
+    assert httpx.get(f"{server['url']}/health", timeout=5.0).json()["dedup"]["shared"] is True
+
+
+def test_multi_worker_clone_status_and_metrics_cover_every_worker(multi_worker_clone_webhook_server):
+    """Test that clone jobs, /health and /metrics are answered for all workers by any worker."""
+    server = multi_worker_clone_webhook_server
+    
+    # Invalid repository path fails fast without touching gh or the network
+    payload = create_issue_payload(
+        repository={"name": "../../etc/passwd", "full_name": "malicious/../../../etc/passwd", "owner": {"login": "../../../etc"}}
+    )
+    payload_bytes = json.dumps(payload).encode()
+    response = httpx.post(
+        f"{server['url']}/webhook",
+        content=payload_bytes,
+        headers={
+            "X-Hub-Signature-256": generate_signature(payload_bytes, server["secret"]),
+            "X-GitHub-Event": "issues",
+            "Content-Type": "application/json"
+        },
+        timeout=5.0
+    )
+    assert response.status_code == 202
+    job_id = response.json()["clone"]["job_id"]
+    
+    # A fresh connection per request lets the kernel spread them over the workers
+    for _ in range(10):
+        status = httpx.get(f"{server['url']}/clone/{job_id}", timeout=5.0)
+        assert status.status_code == 200
+        assert status.json()["job_id"] == job_id
+    
+    # Every worker publishes its health and metrics shortly after starting
+    pids = []
+    for _ in range(50):
+        pids = [worker["pid"] for worker in httpx.get(f"{server['url']}/health", timeout=5.0).json()["workers"]]
+        if len(pids) == 2:
+            break
+        time.sleep(0.1)
+    assert len(pids) == 2
+    
+    text = httpx.get(f"{server['url']}/metrics", timeout=5.0).text
+    assert text.count("# TYPE ghook_clone_in_flight gauge") == 1
+    for pid in pids:
+        assert f'ghook_clone_in_flight{{pid="{pid}"}}' in text
+
+
+def test_workers_given_only_on_the_command_line_share_default_databases(cli_workers_webhook_server):
+    """Test that --workers alone picks the shared database paths the banner reports."""
+    server = cli_workers_webhook_server
+    
+    banner = []
+    for line in server["process"].stdout:
+        banner.append(line)
+        if "Press Ctrl+C" in line:
+            break
+    banner = "".join(banner)
+    data_dir = server["cwd"] / "data"
+    assert f"Shared delivery ids: {data_dir / 'deliveries.db'}" in banner
+    assert f"Shared clone jobs, metrics and health: {data_dir / 'workers.db'}" in banner
+    
+    payload_bytes = json.dumps(create_issue_payload()).encode()
+    headers = {
+        "X-Hub-Signature-256": generate_signature(payload_bytes, server["secret"]),
+        "X-GitHub-Event": "issues",
+        "X-GitHub-Delivery": "cli-workers-delivery",
+        "Content-Type": "application/json"
+    }
+    statuses = [
+        httpx.post(f"{server['url']}/webhook", content=payload_bytes, headers=headers, timeout=5.0).json()["status"]
+        for _ in range(4)
+    ]
+    
+    assert statuses == ["success"] + ["duplicate"] * 3
+    assert httpx.get(f"{server['url']}/health", timeout=5.0).json()["dedup"]["shared"] is True
+    assert (data_dir / "deliveries.db").exists()
+    assert (data_dir / "workers.db").exists()
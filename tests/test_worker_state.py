@@ -0,0 +1,50 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pytest",
+# ]
+# ///
+
+import os
+import subprocess
+import sys
+
+from worker_state import WorkerState
+
+
+def test_clone_jobs_are_visible_to_other_processes(tmp_path):
+    """Test that a job saved through one connection is read back through another."""
+    writer = WorkerState(tmp_path / "workers.db", max_jobs=2)
+    reader = WorkerState(tmp_path / "workers.db")
+
+    for job_id in ("a", "b", "c"):
+        writer.save_job({"job_id": job_id, "status": "queued"})
+    writer.save_job({"job_id": "c", "status": "done"})
+
+    assert reader.get_job("c") == {"job_id": "c", "status": "done"}
+    # Only the max_jobs most recently updated jobs are kept
+    assert reader.get_job("a") is None
+    writer.close()
+    reader.close()
+
+
+def test_workers_skips_exited_and_excluded_processes(tmp_path):
+    """Test that snapshots are only returned for live workers other than the caller."""
+    state = WorkerState(tmp_path / "workers.db")
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    exited_pid = int(exited.stdout)
+
+    state.publish(os.getpid(), [["up", "Up.", "gauge", ["up 1"]]], {"status": "ok"})
+    state.publish(os.getppid(), [], {"status": "ok"})
+    state.publish(exited_pid, [], {"status": "ok"})
+
+    assert [pid for pid, _, _ in state.workers()] == sorted([os.getpid(), os.getppid()])
+    assert [pid for pid, _, _ in state.workers(exclude=os.getpid())] == [os.getppid()]
+    pid, metrics, health = state.workers(exclude=os.getppid())[0]
+    assert metrics == [["up", "Up.", "gauge", ["up 1"]]]
+    assert health == {"status": "ok"}
+
+    state.remove(os.getpid())
+    assert [pid for pid, _, _ in state.workers()] == [os.getppid()]
+    state.close()